@@ -93,9 +93,58 @@ Path(MEDIA_ROOT).mkdir(parents=True, exist_ok=True)
 # Tamaño máximo de archivo permitido (ejemplo: 100MB)
 # DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
 # FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
-# [JV] For now change to 500MB to allow video uploads
-DATA_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 500 * 1024 * 1024  # 500MB
+
+# Subidas de imágenes por partes (prevcad/uploads/): las partes se escriben en este
+# directorio temporal a medida que llegan, sin pasar por DATA_UPLOAD_MAX_MEMORY_SIZE
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, 'uploads_tmp')
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 5 * 1024 * 1024  # 5MB por parte
+CHUNKED_UPLOAD_MAX_SIZE = 50 * 1024 * 1024  # 50MB por imagen
+
+# Los archivos grandes (videos) van por multipart y sobre FILE_UPLOAD_MAX_MEMORY_SIZE
+# se escriben a un temporal en disco; el resto del cuerpo se mantiene en memoria, así
+# que se limita a unas pocas partes (incluye el margen de imágenes en base64 antiguas)
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * CHUNKED_UPLOAD_MAX_CHUNK_SIZE  # 10MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = CHUNKED_UPLOAD_MAX_CHUNK_SIZE  # 5MB
+
+# Procesamiento de imágenes en segundo plano (prevcad.media_pipeline): miniaturas
+# con la orientación corregida. Con MEDIA_PIPELINE_SYNC se procesa en el mismo request.
+MEDIA_PIPELINE_WORKERS = 1
+MEDIA_PIPELINE_SYNC = False
+
+# Ingesta write-behind de registros de actividad (prevcad.activity_buffer): las
+# acciones se acumulan en memoria y se escriben en lote cada FLUSH_INTERVAL
+# segundos, al llegar a FLUSH_THRESHOLD acciones o al terminar el proceso.
+ACTIVITY_LOG_WRITE_BEHIND = False
+ACTIVITY_LOG_FLUSH_INTERVAL = 5
+ACTIVITY_LOG_FLUSH_THRESHOLD = 500
+# Máximo de acciones en el buffer; lleno, los requests escriben directamente
+ACTIVITY_LOG_BUFFER_LIMIT = 50000
+
+# Eventos de actividad (ActivityEvent): los meses más antiguos que RETENTION_MONTHS
+# se exportan a ARCHIVE_DIR y se eliminan con `archive_activity_events`. Los
+# resúmenes diarios (AppActivityLog) se conservan.
+ACTIVITY_EVENT_RETENTION_MONTHS = 13
+ACTIVITY_EVENT_ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive', 'activity_events')
+
+# Auditoría (ActionLog de log_action y doctor_required, ver prevcad.audit_sink): los
+# registros se encolan y un hilo los escribe en lote cada FLUSH_INTERVAL segundos o
+# al juntar BATCH_SIZE. Con la cola llena se descartan, salvo denegaciones y errores.
+AUDIT_LOG_SYNC = False
+AUDIT_LOG_QUEUE_SIZE = 10000
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FLUSH_INTERVAL = 2
+# Espera antes de reintentar un lote fallido (p. ej. base de datos bloqueada)
+AUDIT_LOG_RETRY_DELAY = 0.5
+# Accesos rutinarios como contadores por (usuario, ruta, tipo, hora) en ActionLogCounter;
+# las filas completas quedan para denegaciones, errores, cambios de datos y subidas.
+# Desactivado: cada acceso se guarda como fila de ActionLog.
+AUDIT_LOG_AGGREGATE = False
+
+# Retención de ActionLog (prevcad.audit_archive): `archive_action_logs` mueve los
+# registros más antiguos que RETENTION_DAYS a archivos mensuales comprimidos en
+# ARCHIVE_DIR, con un manifiesto y checksums. Se pueden buscar desde el admin.
+ACTION_LOG_RETENTION_DAYS = 180
+ACTION_LOG_ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive', 'action_logs')
 
 
 
@@ -165,6 +214,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'prevcad.tracing.RequestTracingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -367,6 +417,14 @@ LOGGING = {
 }
 
 
+# Caché de fragmentos de CategoryTemplate en HealthCategorySerializer (prevcad.template_cache).
+# Cada proceso mantiene una copia local; con un alias de CACHES se comparten entre procesos.
+TEMPLATE_FRAGMENT_CACHE_ALIAS = None
+
+# Trazas por request (prevcad.tracing): spans con tiempos y consultas por vista y
+# método de serializer, resumidos en el logger prevcad.tracing y en Server-Timing.
+REQUEST_TRACING_ENABLED = False
+
 
 # Admin reorder
 # https://stackoverflow.com/questions/31352496/how-to-group-models-in-django-admink
@@ -0,0 +1,190 @@
+"""
+Ingesta write-behind de AppActivityLog.
+
+Con `ACTIVITY_LOG_WRITE_BEHIND = True`, AppActivityLogView.create valida las
+acciones y las agrega a un buffer en memoria agrupado por (usuario, fecha), sin
+tocar la base de datos. Un hilo escribe el buffer con
+AppActivityLog.bulk_add_actions (una transacción por descarga):
+
+- cada `ACTIVITY_LOG_FLUSH_INTERVAL` segundos,
+- antes si se acumulan `ACTIVITY_LOG_FLUSH_THRESHOLD` acciones,
+- al terminar el proceso (atexit),
+- y para un usuario antes de leer sus registros (ver flush(user_id)).
+
+Cada acción se combina una sola vez: la descarga toma el buffer completo bajo
+lock y, si la escritura falla, lo devuelve al buffer (lo que llegó entretanto
+tiene prioridad). La combinación es por timestamp, así que reintentar una
+descarga no duplica acciones. Lo que está en el buffer se pierde si el proceso
+termina abruptamente (sin atexit), por eso la respuesta no lo confirma: lo
+devuelve como `pending` y la app lo conserva y reenvía.
+
+El buffer y su watermark son por proceso: `stored_watermark` es el mayor
+timestamp que este proceso escribió para (usuario, fecha), y flush(user_id) solo
+descarga el buffer de este proceso (otros workers pueden tener acciones del
+mismo usuario aún sin escribir). Como la app reenvía todo lo no confirmado en
+cada request, cada acción enviada queda en `pending` de la respuesta o ya fue
+escrita por este proceso.
+
+El buffer admite hasta `ACTIVITY_LOG_BUFFER_LIMIT` acciones: si está lleno (por
+ejemplo, porque la base de datos falla y los lotes vuelven al buffer), add()
+las rechaza y el request las escribe directamente.
+
+Con `ACTIVITY_LOG_FLUSH_INTERVAL = 0` no se inicia el hilo: el umbral descarga
+en el mismo request (tests, comandos de mantenimiento).
+"""
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# {(user_id, fecha): {timestamp: acción}}
+_pending = {}
+_pending_count = 0
+# {(user_id, fecha): mayor timestamp escrito por este proceso}, acotado a STORED_KEYS
+_stored = OrderedDict()
+STORED_KEYS = 10000
+_lock = threading.Lock()
+# Una descarga a la vez: quien lee después de flush() ve lo que otra descarga estaba escribiendo
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_stopping = threading.Event()
+_worker_thread = None
+
+
+def is_enabled():
+    return getattr(settings, 'ACTIVITY_LOG_WRITE_BEHIND', False)
+
+
+def _count(batch):
+    return sum(len(actions) for actions in batch.values())
+
+
+def add(user_id, date, actions):
+    """
+    Agrega acciones ya normalizadas (AppActivityLog.normalize_actions) al buffer.
+
+    Returns:
+        bool: False si el buffer está lleno (las acciones no se agregaron).
+    """
+    global _pending_count
+    with _lock:
+        bucket = _pending.get((user_id, date), {})
+        added = len(actions.keys() - bucket.keys())
+        if added and _pending_count + added > getattr(settings, 'ACTIVITY_LOG_BUFFER_LIMIT', 50000):
+            return False
+        _pending[(user_id, date)] = {**bucket, **actions}
+        _pending_count += added
+        threshold_reached = _pending_count >= getattr(settings, 'ACTIVITY_LOG_FLUSH_THRESHOLD', 500)
+
+    if getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 5):
+        _ensure_worker()
+        if threshold_reached:
+            _wakeup.set()
+    elif threshold_reached:
+        flush()
+    return True
+
+
+def pending(user_id, date):
+    """Acciones aún no escritas de un usuario en una fecha"""
+    with _lock:
+        return dict(_pending.get((user_id, date), {}))
+
+
+def stored_watermark(user_id, date):
+    """Mayor timestamp de (usuario, fecha) escrito por este proceso, o None"""
+    with _lock:
+        return _stored.get((user_id, date))
+
+
+def _mark_stored(batch):
+    with _lock:
+        for key, actions in batch.items():
+            if actions:
+                _stored[key] = max(max(actions), _stored.get(key, ''))
+                _stored.move_to_end(key)
+        while len(_stored) > STORED_KEYS:
+            _stored.popitem(last=False)
+
+
+def _take(user_id=None):
+    global _pending, _pending_count
+    with _lock:
+        if user_id is None:
+            batch, _pending = _pending, {}
+        else:
+            batch = {key: _pending.pop(key) for key in [key for key in _pending if key[0] == user_id]}
+        _pending_count = _count(_pending)
+    return batch
+
+
+def _requeue(batch):
+    # Puede superar ACTIVITY_LOG_BUFFER_LIMIT por un lote como máximo: mientras
+    # tanto add() rechaza acciones nuevas, así que el buffer no crece sin límite
+    global _pending_count
+    with _lock:
+        for key, actions in batch.items():
+            # Lo que llegó después de tomar el lote tiene prioridad
+            _pending[key] = {**actions, **_pending.get(key, {})}
+        _pending_count = _count(_pending)
+
+
+def flush(user_id=None):
+    """
+    Escribe lo pendiente (todo, o solo de `user_id`).
+
+    Returns:
+        int: registros (usuario, fecha) escritos; 0 si no había nada o falló.
+    """
+    from prevcad.models import AppActivityLog
+
+    with _flush_lock:
+        batch = _take(user_id)
+        if not batch:
+            return 0
+        try:
+            AppActivityLog.bulk_add_actions(batch)
+            _mark_stored(batch)
+        except Exception as e:
+            _requeue(batch)
+            logger.error(f"Error escribiendo registros de actividad ({len(batch)} pendientes): {str(e)}")
+            return 0
+    return len(batch)
+
+
+def _worker():
+    while not _stopping.is_set():
+        _wakeup.wait(getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 5))
+        _wakeup.clear()
+        close_old_connections()
+        flush()
+
+
+def _ensure_worker():
+    global _worker_thread
+    with _lock:
+        if _worker_thread is not None:
+            return
+        _worker_thread = threading.Thread(target=_worker, name='activity-log-flush', daemon=True)
+        _worker_thread.start()
+
+
+def shutdown(timeout=10):
+    """Detiene el hilo y escribe lo pendiente (se registra con atexit)"""
+    global _worker_thread
+    with _lock:
+        worker, _worker_thread = _worker_thread, None
+    if worker is not None:
+        _stopping.set()
+        _wakeup.set()
+        worker.join(timeout)
+        _stopping.clear()
+    flush()
+
+
+atexit.register(shutdown)
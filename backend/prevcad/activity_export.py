@@ -0,0 +1,227 @@
+"""
+Exportación columnar de datos de actividad para investigación.
+
+Dos conjuntos de datos, con columnas tipadas:
+
+- `app_activity`: una fila por acción de AppActivityLog (el JSON diario se
+  expande en filas usuario/fecha/hora/acción).
+- `action_log`: una fila por ActionLog; `extra_data` se escribe como texto JSON.
+
+Las filas se leen con `.iterator()` y se escriben en lotes de `batch_size`
+(un row group de Parquet o un record batch de Arrow por lote), así que la
+memoria usada no depende del tamaño del periodo exportado.
+
+Parquet y Arrow IPC requieren pyarrow (extra opcional `export` del proyecto:
+`poetry install -E export`); sin pyarrow pedirlos lanza FormatUnavailable en
+lugar de cambiar de formato sin avisar. CSV no requiere dependencias.
+"""
+import csv
+import datetime
+import io
+import json
+
+from django.utils import timezone
+
+from prevcad.models import ActionLog, ActivityEvent, AppActivityLog
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+
+FORMATS = ['parquet', 'arrow', 'csv']
+EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow', 'csv': 'csv'}
+CONTENT_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'csv': 'text/csv',
+}
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _timestamp_type():
+    return pa.timestamp('s', tz=timezone.get_current_timezone_name())
+
+
+# {conjunto: [(columna, tipo de pyarrow)]}; los tipos se resuelven al exportar
+SCHEMAS = {
+    'app_activity': [
+        ('log_id', lambda: pa.int64()),
+        ('user_id', lambda: pa.int64()),
+        ('username', lambda: pa.string()),
+        ('date', lambda: pa.date32()),
+        ('time', lambda: pa.string()),
+        ('timestamp', _timestamp_type),
+        ('action', lambda: pa.string()),
+    ],
+    'action_log': [
+        ('id', lambda: pa.int64()),
+        ('timestamp', _timestamp_type),
+        ('user_id', lambda: pa.int64()),
+        ('username', lambda: pa.string()),
+        ('action_type', lambda: pa.string()),
+        ('description', lambda: pa.string()),
+        ('ip_address', lambda: pa.string()),
+        ('user_agent', lambda: pa.string()),
+        ('extra_data', lambda: pa.string()),
+    ],
+}
+DATASETS = list(SCHEMAS)
+
+
+class FormatUnavailable(Exception):
+    """Formato pedido que requiere una dependencia no instalada (pyarrow)"""
+
+
+def check_format(fmt):
+    """Verifica que el formato se pueda escribir en este entorno"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    if fmt != 'csv' and pa is None:
+        raise FormatUnavailable(
+            f"El formato {fmt} requiere pyarrow (instale el extra 'export'); use CSV"
+        )
+    return fmt
+
+
+def default_queryset(dataset, since=None, until=None):
+    """Registros de un conjunto, opcionalmente en [since, until) (fechas)"""
+    if dataset == 'app_activity':
+        queryset = AppActivityLog.objects.all()
+        if since:
+            queryset = queryset.filter(date__gte=since)
+        if until:
+            queryset = queryset.filter(date__lt=until)
+        return queryset
+    queryset = ActionLog.objects.all()
+    if since:
+        queryset = queryset.filter(timestamp__date__gte=since)
+    if until:
+        queryset = queryset.filter(timestamp__date__lt=until)
+    return queryset
+
+
+def _app_activity_rows(queryset, batch_size):
+    logs = queryset.select_related('user').only(
+        'id', 'user_id', 'user__username', 'date', 'actions'
+    ).order_by('date', 'user_id')
+    for log in logs.iterator(chunk_size=batch_size):
+        date = log.date
+        for time, action in sorted((log.actions or {}).items()):
+            yield (
+                log.id,
+                log.user_id,
+                log.user.username,
+                date,
+                time,
+                ActivityEvent.to_datetime(date, time),
+                action,
+            )
+
+
+def _action_log_rows(queryset, batch_size):
+    logs = queryset.select_related('user').order_by('timestamp', 'id')
+    for log in logs.iterator(chunk_size=batch_size):
+        yield (
+            log.id,
+            log.timestamp,
+            log.user_id,
+            log.user.username if log.user else None,
+            log.action_type,
+            log.description,
+            log.ip_address,
+            log.user_agent,
+            json.dumps(log.extra_data, ensure_ascii=False) if log.extra_data else None,
+        )
+
+
+ROWS = {
+    'app_activity': _app_activity_rows,
+    'action_log': _action_log_rows,
+}
+
+
+def iter_batches(dataset, queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """Filas del conjunto agrupadas en columnas: {columna: [valores]} de hasta batch_size filas"""
+    names = [name for name, _ in SCHEMAS[dataset]]
+    batch = []
+    for row in ROWS[dataset](queryset, batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield dict(zip(names, map(list, zip(*batch))))
+            batch = []
+    if batch:
+        yield dict(zip(names, map(list, zip(*batch))))
+
+
+class CsvBatchWriter:
+    def __init__(self, output, dataset):
+        self.names = [name for name, _ in SCHEMAS[dataset]]
+        self.text = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(self.names)
+
+    def write(self, columns):
+        for row in zip(*(columns[name] for name in self.names)):
+            self.writer.writerow([
+                value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+                for value in row
+            ])
+
+    def close(self):
+        self.text.flush()
+        # El archivo de salida pertenece a quien llama
+        self.text.detach()
+
+
+class ArrowBatchWriter:
+    def __init__(self, output, dataset, fmt):
+        self.schema = pa.schema([(name, type_()) for name, type_ in SCHEMAS[dataset]])
+        if fmt == 'parquet':
+            self.writer = pa.parquet.ParquetWriter(output, self.schema, compression='zstd')
+        else:
+            self.writer = pa.ipc.new_file(output, self.schema)
+
+    def write(self, columns):
+        batch = pa.record_batch(
+            [pa.array(columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+
+
+def export(dataset, output, fmt='parquet', queryset=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Escribe el conjunto en `output` (archivo binario abierto).
+
+    Args:
+        dataset: 'app_activity' o 'action_log'.
+        fmt: 'parquet', 'arrow' o 'csv' (ver check_format).
+        queryset: registros a exportar (por defecto, todos).
+
+    Returns:
+        tuple: (formato, filas escritas).
+
+    Raises:
+        FormatUnavailable: Parquet o Arrow sin pyarrow instalado.
+    """
+    if dataset not in SCHEMAS:
+        raise ValueError(f"Conjunto desconocido: {dataset}")
+    check_format(fmt)
+    if queryset is None:
+        queryset = default_queryset(dataset)
+
+    writer = CsvBatchWriter(output, dataset) if fmt == 'csv' else ArrowBatchWriter(output, dataset, fmt)
+    rows = 0
+    try:
+        for columns in iter_batches(dataset, queryset, batch_size):
+            writer.write(columns)
+            rows += len(next(iter(columns.values())))
+    finally:
+        writer.close()
+    return fmt, rows
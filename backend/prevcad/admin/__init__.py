@@ -7,10 +7,12 @@ from .filters import HealthStatusFilter
 
 from .appointment import AppointmentAdmin
 from .user import CustomUserAdmin
-from .action_log import ActionLogAdmin
+from .action_log import ActionLogAdmin, ActionLogCounterAdmin
 from ..models import UserProfile
 from .text_recommendation import TextRecomendationAdmin
 from .app_activity_log import AppActivityLogAdmin
+from .activity_event import ActivityActionAdmin, ActivityEventAdmin
+from .activity_rollup import ActivityRollupAdmin
 from .user_recommendation_interaction import UserRecommendationInteractionAdmin
 from .downloads import DownloadableContentAdmin, DownloadByUserAdmin
 from .system_document import SystemDocumentAdmin
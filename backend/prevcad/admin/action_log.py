@@ -1,11 +1,21 @@
 from django.contrib import admin
-from ..models import ActionLog
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from ..models import ActionLog, ActionLogCounter
+from .. import audit_archive
+from .exports import export_action
 
 @admin.register(ActionLog)
 class ActionLogAdmin(admin.ModelAdmin):
     list_display = ['timestamp', 'user', 'action_type', 'description', 'ip_address']
     list_filter = ['action_type', 'timestamp', 'user']
     search_fields = ['description', 'user__username', 'ip_address']
+    actions = [
+        export_action('action_log'),
+        export_action('action_log', 'csv', 'Exportar seleccionados (CSV)'),
+    ]
+    change_list_template = 'admin/actionlog/change_list.html'
     readonly_fields = [
         'timestamp', 
         'user', 
@@ -23,4 +33,69 @@ class ActionLogAdmin(admin.ModelAdmin):
         return False
 
     def has_delete_permission(self, request, obj=None):
-        return False 
\ No newline at end of file
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                'archive/',
+                self.admin_site.admin_view(self.archive_view),
+                name='prevcad_actionlog_archive',
+            ),
+        ]
+        return custom_urls + urls
+
+    def archive_view(self, request):
+        """Búsqueda de solo lectura en los meses archivados (ver prevcad.audit_archive)"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        months = audit_archive.load_manifest()['months']
+        month = request.GET.get('month') or ''
+        filters = {
+            'query': request.GET.get('q', '').strip(),
+            'action_type': request.GET.get('action_type') or None,
+            'username': request.GET.get('username', '').strip() or None,
+        }
+        results, truncated, error = [], False, None
+        if month:
+            try:
+                results, truncated = audit_archive.search(month, **filters)
+            except audit_archive.ArchiveError as e:
+                error = str(e)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Archivo de registros de acciones',
+            'opts': self.model._meta,
+            'app_label': self.model._meta.app_label,
+            'months': [(key, months[key]) for key in sorted(months, reverse=True)],
+            'month': month,
+            'filters': filters,
+            'action_types': sorted(
+                {action_type for action_type, _ in ActionLog.ACTION_TYPES}
+                | {'ACCESS_ATTEMPT', 'ACCESS_GRANTED', 'ACCESS_DENIED', 'ERROR'}
+            ),
+            'results': results,
+            'truncated': truncated,
+            'error': error,
+        }
+        return TemplateResponse(request, 'admin/actionlog/archive.html', context)
+
+@admin.register(ActionLogCounter)
+class ActionLogCounterAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'user', 'action_type', 'path', 'count']
+    list_filter = ['action_type', 'hour']
+    search_fields = ['user__username', 'path']
+    list_select_related = ['user']
+    readonly_fields = ['hour', 'user', 'action_type', 'path', 'count']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
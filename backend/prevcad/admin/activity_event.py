@@ -0,0 +1,32 @@
+from django.contrib import admin
+from ..models import ActivityAction, ActivityEvent
+
+@admin.register(ActivityAction)
+class ActivityActionAdmin(admin.ModelAdmin):
+    list_display = ['code', 'created_date']
+    search_fields = ['code']
+    readonly_fields = ['code', 'created_date']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'user', 'action']
+    list_filter = ['action']
+    list_select_related = ['user', 'action']
+    search_fields = ['user__username']
+    date_hierarchy = 'timestamp'
+    readonly_fields = ['timestamp', 'user', 'action']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
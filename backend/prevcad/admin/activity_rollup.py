@@ -0,0 +1,70 @@
+import datetime
+
+from django.contrib import admin
+from ..models import ActivityRollup
+
+@admin.register(ActivityRollup)
+class ActivityRollupAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/activityrollup/change_list.html'
+    list_display = ['start', 'period', 'active_users', 'n_logins', 'n_entries', 'time_in_app_str', 'source_updated']
+    list_filter = ['period']
+    ordering = ['-start']
+    readonly_fields = [
+        'period',
+        'start',
+        'active_users',
+        'n_entries',
+        'n_logins',
+        'time_in_app',
+        'top_actions',
+        'source_updated',
+    ]
+    # Periodos mostrados en el panel
+    DASHBOARD_PERIODS = 12
+    DASHBOARD_TOP_ACTIONS = 5
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def time_in_app_str(self, obj):
+        return str(datetime.timedelta(seconds=obj.time_in_app))
+
+    time_in_app_str.short_description = 'Tiempo en la Aplicación'
+
+    def dashboard_rows(self, period):
+        """Últimos periodos con promedios y las acciones más frecuentes (solo lee los resúmenes)"""
+        rows = []
+        for rollup in ActivityRollup.objects.filter(period=period).order_by('-start')[:self.DASHBOARD_PERIODS]:
+            actions = sorted(
+                (
+                    (count, screen, name)
+                    for screen, items in rollup.top_actions.items()
+                    for name, count in items
+                ),
+                key=lambda item: -item[0],
+            )[:self.DASHBOARD_TOP_ACTIONS]
+            rows.append({
+                'rollup': rollup,
+                'time_in_app': str(datetime.timedelta(seconds=rollup.time_in_app)),
+                'time_per_user': str(datetime.timedelta(seconds=rollup.time_in_app_per_user)),
+                'top_actions': [f'{screen} · {name} ({count})' for count, screen, name in actions],
+            })
+        return rows
+
+    def changelist_view(self, request, extra_context=None):
+        period = request.GET.get('period__exact')
+        if period not in dict(ActivityRollup.PERIOD_CHOICES):
+            period = ActivityRollup.WEEK
+        extra_context = {
+            **(extra_context or {}),
+            'dashboard_period': dict(ActivityRollup.PERIOD_CHOICES)[period],
+            'dashboard_rows': self.dashboard_rows(period),
+            'watermark': ActivityRollup.watermark(),
+        }
+        return super().changelist_view(request, extra_context=extra_context)
@@ -4,6 +4,7 @@ from django.forms import widgets
 from django.contrib import admin
 from django.db.models import JSONField
 from ..models import AppActivityLog
+from .exports import export_action
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,10 @@ class AppActivityLogAdmin(admin.ModelAdmin):
     ]
     list_filter = ["user", "date", "updated_date", "created_date"]
     search_fields = ["user__username"]
+    actions = [
+        export_action("app_activity", "parquet", "Exportar acciones seleccionadas (Parquet)"),
+        export_action("app_activity", "csv", "Exportar acciones seleccionadas (CSV)"),
+    ]
 
     # In detail view, show all fields and a custom one with get_summary object function
     readonly_fields = [
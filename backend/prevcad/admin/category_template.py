@@ -476,46 +476,19 @@ class CategoryTemplateAdmin(admin.ModelAdmin):
             image = request.FILES.get('image')
             video = request.FILES.get('video')
 
-            # Directorio de almacenamiento
+            # Guardar los archivos en el almacén de media (por hash de contenido)
             import os
-            from django.conf import settings
+            from prevcad.media_store import store_file
 
-            training_images_dir = os.path.join(settings.MEDIA_ROOT, 'training_images')
-            os.makedirs(training_images_dir, exist_ok=True)
-
-            # Procesar la imagen si existe
-            if image:
-                # Generar un nombre de archivo único
-                from django.utils.crypto import get_random_string
-                filename = f"{get_random_string(10)}_{image.name}"
-                filepath = os.path.join(training_images_dir, filename)
-
-                # Guardar la imagen
-                with open(filepath, 'wb+') as destination:
-                    for chunk in image.chunks():
-                        destination.write(chunk)
-
-                # Actualizar la URL de la imagen en los nodos
-                for node in training_nodes:
-                    if node.get('media_pending') and node.get('media_url') == image.name:
-                        node['media_url'] = f'training_images/{filename}'
-                        node.pop('media_pending', None)
-
-            # Procesar el video si existe (similar a la imagen)
-            if video:
-                training_videos_dir = os.path.join(settings.MEDIA_ROOT, 'training_videos')
-                os.makedirs(training_videos_dir, exist_ok=True)
-                
-                filename = f"{get_random_string(10)}_{video.name}"
-                filepath = os.path.join(training_videos_dir, filename)
-
-                with open(filepath, 'wb+') as destination:
-                    for chunk in video.chunks():
-                        destination.write(chunk)
+            for media_file in (image, video):
+                if not media_file:
+                    continue
+                media_path, _ = store_file(media_file, os.path.splitext(media_file.name)[1])
 
+                # Actualizar la URL del archivo en los nodos
                 for node in training_nodes:
-                    if node.get('media_pending') and node.get('media_url') == video.name:
-                        node['media_url'] = f'training_videos/{filename}'
+                    if node.get('media_pending') and node.get('media_url') == media_file.name:
+                        node['media_url'] = media_path
                         node.pop('media_pending', None)
 
             # Actualizar el formulario de entrenamiento
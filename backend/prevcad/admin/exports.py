@@ -0,0 +1,37 @@
+import tempfile
+
+from django.contrib import messages
+from django.http import FileResponse
+from django.utils import timezone
+
+from prevcad import activity_export
+
+
+def export_action(dataset, fmt='parquet', description='Exportar seleccionados (Parquet)'):
+    """
+    Acción de admin que exporta los registros seleccionados en `fmt`. El archivo
+    se escribe por lotes en un temporal que se elimina al terminar la descarga.
+    Si el formato no está disponible (Parquet/Arrow sin pyarrow) se informa el
+    error en lugar de descargar otro formato.
+    """
+
+    def export_selected(modeladmin, request, queryset):
+        try:
+            activity_export.check_format(fmt)
+        except activity_export.FormatUnavailable as e:
+            modeladmin.message_user(request, str(e), level=messages.ERROR)
+            return None
+        output = tempfile.TemporaryFile()
+        activity_export.export(dataset, output, fmt, queryset=queryset)
+        output.seek(0)
+        filename = f"{dataset}_{timezone.localdate():%Y%m%d}.{activity_export.EXTENSIONS[fmt]}"
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type=activity_export.CONTENT_TYPES[fmt],
+        )
+
+    export_selected.short_description = description
+    export_selected.__name__ = f'export_{dataset}' if fmt == 'parquet' else f'export_{dataset}_{fmt}'
+    return export_selected
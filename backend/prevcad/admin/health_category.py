@@ -284,17 +284,15 @@ class HealthCategoryAdmin(admin.ModelAdmin):
             evaluation_type = obj.template.evaluation_type
 
             # Intentar obtener o crear el form si no existe
-            from prevcad.models import EvaluationForm
+            from prevcad.models import EvaluationForm, QuestionNodesSnapshot
 
             evaluation_form, created = EvaluationForm.objects.get_or_create(
                 health_category=obj,
                 defaults={
                     "responses": {},
                     "professional_responses": {},
-                    "question_nodes": (
-                        obj.template.evaluation_form.get("question_nodes", [])
-                        if obj.template.evaluation_form
-                        else []
+                    "question_nodes_snapshot": QuestionNodesSnapshot.get_for_template(
+                        obj.template
                     ),
                 },
             )
@@ -390,6 +388,8 @@ class HealthCategoryAdmin(admin.ModelAdmin):
                 processed_response["answer"]["selected_texts"] = [
                     options[idx] for idx in selected if idx < len(options)
                 ]
+            elif response.get("type") == "IMAGE_QUESTION":
+                processed_response["images"] = self.get_response_images(response)
             processed_responses[node_id] = processed_response
 
         context = {"responses": processed_responses}
@@ -399,6 +399,28 @@ class HealthCategoryAdmin(admin.ModelAdmin):
 
     get_detailed_responses.short_description = "Detalle de Respuestas"
 
+    def get_response_images(self, response):
+        """
+        Imágenes de una respuesta IMAGE_QUESTION como {"url", "thumbnail"}. Acepta
+        las guardadas por el servidor (lista de dicts con miniatura) y las antiguas
+        ({"images": [url, ...]}), que se muestran sin miniatura.
+        """
+        answer = response.get("answer")
+        if isinstance(answer, dict):
+            answer = answer.get("images", [])
+        images = []
+        for image in answer or []:
+            if isinstance(image, dict) and image.get("url"):
+                images.append(
+                    {
+                        "url": image["url"],
+                        "thumbnail": image.get("thumbnail_url") or image["url"],
+                    }
+                )
+            elif isinstance(image, str):
+                images.append({"url": image, "thumbnail": image})
+        return images
+
     def save_formset(self, request, form, formset, change):
         instances = formset.save(commit=False)
         for instance in instances:
@@ -0,0 +1,241 @@
+"""
+Retención de ActionLog: archivo mensual comprimido.
+
+`archive_action_logs` mueve los registros más antiguos que
+`ACTION_LOG_RETENTION_DAYS` a `ACTION_LOG_ARCHIVE_DIR`:
+
+- un archivo por mes, `action_log_YYYY-MM.jsonl.gz`, con una fila JSON por
+  registro (mismas columnas que ActionLog, usuario como id y nombre);
+- `manifest.json` con, por mes: archivo, filas, sha256 y tamaño del archivo,
+  rango de fechas y el mayor id archivado.
+
+Orden de cada mes: se escribe el archivo, se actualiza el manifiesto (escritura
+atómica) y recién entonces se eliminan las filas en transacciones de
+`chunk_size`. El manifiesto guarda, por mes, el mayor id archivado y el corte
+usado: las filas archivadas son exactamente las de id <= ese id y fecha anterior
+a ese corte, así que repetir un mes interrumpido no duplica filas y solo se
+eliminan filas que están en el archivo. Si un mes recibe filas más tarde (el
+corte cae a mitad de mes) se agregan al mismo archivo como otro miembro gzip y
+se recalcula el checksum: las de id nuevo y también las de fecha posterior al
+corte anterior, que pueden tener un id menor (el sink de auditoría asigna la
+fecha al encolar y el id al escribir el lote).
+
+Antes de agregar a un mes o buscar en él se verifica su checksum: si una
+ejecución se interrumpió escribiendo el archivo, el mes queda detenido (las
+filas siguen en la base de datos) hasta revisarlo a mano.
+
+La búsqueda (search) recorre el archivo de un mes bajo demanda.
+
+El mismo esquema (archive_rows) archiva ActivityEvent en su propio directorio.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from prevcad.models import ActionLog
+
+MANIFEST = 'manifest.json'
+
+
+class ArchiveError(Exception):
+    """Archivo o manifiesto inconsistente: no se archiva ni se busca en ese mes"""
+
+
+def archive_dir():
+    return settings.ACTION_LOG_ARCHIVE_DIR
+
+
+def month_key(year, month):
+    return f'{year:04d}-{month:02d}'
+
+
+def load_manifest(directory=None):
+    path = os.path.join(directory or archive_dir(), MANIFEST)
+    if not os.path.exists(path):
+        return {'months': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, directory=None):
+    directory = directory or archive_dir()
+    path = os.path.join(directory, MANIFEST)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify(entry, directory=None):
+    """Verifica que el archivo de un mes coincida con el manifiesto"""
+    path = os.path.join(directory or archive_dir(), entry['file'])
+    if not os.path.exists(path):
+        raise ArchiveError(f"No existe el archivo {entry['file']}")
+    if file_checksum(path) != entry['sha256']:
+        raise ArchiveError(f"El checksum de {entry['file']} no coincide con el manifiesto")
+    return path
+
+
+def serialize(log):
+    return {
+        'id': log.id,
+        'timestamp': log.timestamp.isoformat(),
+        'user_id': log.user_id,
+        'username': log.user.username if log.user else None,
+        'action_type': log.action_type,
+        'description': log.description,
+        'ip_address': log.ip_address,
+        'user_agent': log.user_agent,
+        'extra_data': log.extra_data,
+    }
+
+
+def month_range(year, month):
+    start = timezone.make_aware(datetime.datetime(year, month, 1))
+    following = (start.replace(tzinfo=None) + datetime.timedelta(days=32)).replace(day=1)
+    return start, timezone.make_aware(following)
+
+
+def archive_rows(rows, key, file_name, serialize, cutoff, directory, chunk_size=1000):
+    """
+    Archiva en `file_name` (entrada `key` del manifiesto de `directory`) las
+    filas de `rows` anteriores a `cutoff` y las elimina. `rows` son las filas
+    de un mes (con `id` y `timestamp`); `serialize` arma la fila JSON.
+
+    Lo usan los archivos de ActionLog y de ActivityEvent.
+
+    Returns:
+        int: filas archivadas en esta ejecución.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    entry = manifest['months'].get(key, {'file': file_name, 'rows': 0, 'last_id': 0})
+    path = os.path.join(directory, entry['file'])
+    if entry['rows']:
+        verify(entry, directory)
+
+    previous_cutoff = datetime.datetime.fromisoformat(entry['cutoff']) if entry.get('cutoff') else None
+    # El corte de un mes nunca retrocede (las filas ya archivadas no vuelven a la base)
+    until = max(filter(None, [cutoff, previous_cutoff]))
+    logs = rows.filter(timestamp__lt=until)
+
+    count, first, last = 0, None, None
+    pending = Q(id__gt=entry['last_id'])
+    if previous_cutoff:
+        pending |= Q(timestamp__gte=previous_cutoff)
+    pending = logs.filter(pending).order_by('id')
+    if pending.exists():
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for log in pending.iterator(chunk_size=chunk_size):
+                archive.write(json.dumps(serialize(log), ensure_ascii=False) + '\n')
+                entry['last_id'] = max(entry['last_id'], log.id)
+                first = log.timestamp if first is None else min(first, log.timestamp)
+                last = log.timestamp if last is None else max(last, log.timestamp)
+                count += 1
+
+        entry['rows'] += count
+        entry['sha256'] = file_checksum(path)
+        entry['size'] = os.path.getsize(path)
+        entry['first'] = min(filter(None, [entry.get('first'), first.isoformat()]))
+        entry['last'] = max(filter(None, [entry.get('last'), last.isoformat()]))
+        entry['archived_at'] = timezone.now().isoformat()
+    if count or key in manifest['months']:
+        entry['cutoff'] = until.isoformat()
+        manifest['months'][key] = entry
+        save_manifest(manifest, directory)
+
+    # Solo lo que ya está en el archivo (incluye una ejecución anterior interrumpida)
+    archived = logs.filter(id__lte=entry['last_id'])
+    while True:
+        ids = list(archived.values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            rows.model.objects.filter(id__in=ids).delete()
+    return count
+
+
+def archive_month(year, month, cutoff, directory=None, chunk_size=1000):
+    """
+    Archiva los registros del mes anteriores a `cutoff` y los elimina.
+
+    Returns:
+        int: registros archivados en esta ejecución.
+    """
+    key = month_key(year, month)
+    start, end = month_range(year, month)
+    rows = ActionLog.objects.filter(timestamp__gte=start, timestamp__lt=end).select_related('user')
+    return archive_rows(
+        rows, key, f'action_log_{key}.jsonl.gz', serialize, min(end, cutoff),
+        directory or archive_dir(), chunk_size
+    )
+
+
+def archive_older_than(cutoff, directory=None, chunk_size=1000):
+    """
+    Archiva por mes todos los registros anteriores a `cutoff`.
+
+    Returns:
+        dict: {'YYYY-MM': registros archivados}
+    """
+    oldest = ActionLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp').first()
+    if oldest is None:
+        return {}
+    first = timezone.localtime(oldest.timestamp)
+    last = timezone.localtime(cutoff)
+    results = {}
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        results[month_key(year, month)] = archive_month(year, month, cutoff, directory, chunk_size)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return results
+
+
+def search(month, query='', action_type=None, username=None, limit=200, directory=None):
+    """
+    Busca en el archivo de un mes ('YYYY-MM').
+
+    Returns:
+        tuple: (registros encontrados, hasta `limit`; hay más resultados).
+    """
+    directory = directory or archive_dir()
+    entry = load_manifest(directory)['months'].get(month)
+    if entry is None:
+        raise ArchiveError(f'No hay archivo para {month}')
+    path = verify(entry, directory)
+
+    query = (query or '').lower()
+    results = []
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            # Filtro barato sobre el texto antes de decodificar
+            if query and query not in line.lower():
+                continue
+            row = json.loads(line)
+            if query and query not in ' '.join(str(value) for value in row.values()).lower():
+                continue
+            if action_type and row['action_type'] != action_type:
+                continue
+            if username and row['username'] != username:
+                continue
+            if len(results) == limit:
+                return results, True
+            results.append(row)
+    return results, False
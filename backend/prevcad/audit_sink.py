@@ -0,0 +1,198 @@
+"""
+Escritura asíncrona y por lotes de ActionLog (auditoría de log_action y
+doctor_required).
+
+El request solo arma el registro y lo encola; un hilo lo escribe con
+bulk_create cada `AUDIT_LOG_FLUSH_INTERVAL` segundos, o antes si se juntan
+`AUDIT_LOG_BATCH_SIZE` registros. Al terminar el proceso (atexit) se escribe
+todo lo encolado. Cada lote se escribe en una transacción; si falla (por
+ejemplo, la base de datos está bloqueada) se reintenta una vez tras
+`AUDIT_LOG_RETRY_DELAY` segundos. Si vuelve a fallar, los registros que se
+guardan como fila completa (ActionLog.keeps_full_row: denegaciones, errores,
+cambios de datos) vuelven a la cola para el siguiente lote y el resto se
+descarta y se cuenta; los reencolados solo se pierden si la cola está llena.
+
+La cola tiene capacidad `AUDIT_LOG_QUEUE_SIZE`. Si se llena (la base de datos
+no da abasto), los registros de denegaciones y errores (`SYNC_ON_OVERFLOW`) se
+escriben en el mismo request y el resto se descarta y se cuenta (ver dropped()).
+
+Con `AUDIT_LOG_AGGREGATE = True` solo las denegaciones, errores y acciones que
+modifican datos (ActionLog.keeps_full_row) se guardan como filas; el resto
+(ACCESS_ATTEMPT, ACCESS_GRANTED, VIEW...) suma a ActionLogCounter por
+(usuario, ruta, tipo, hora), con un upsert por lote.
+
+Con `AUDIT_LOG_SYNC = True` cada registro se escribe en el mismo request (tests,
+comandos de mantenimiento).
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Tipos de acción que no se descartan aunque la cola esté llena
+SYNC_ON_OVERFLOW = {'ACCESS_DENIED', 'ERROR'}
+
+_queue = None
+_queue_lock = threading.Lock()
+_worker_thread = None
+# Un lote a la vez: quien llama a flush() espera el lote que el hilo está escribiendo
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_stopping = threading.Event()
+_dropped = 0
+
+
+def _get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = queue.Queue(maxsize=getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10000))
+        return _queue
+
+
+def dropped():
+    """Registros descartados (cola llena o lote fallido) desde que inició el proceso"""
+    return _dropped
+
+
+def _write_batch(records):
+    from prevcad.models import ActionLog, ActionLogCounter
+
+    with transaction.atomic():
+        if getattr(settings, 'AUDIT_LOG_AGGREGATE', False):
+            counted = [record for record in records if not ActionLog.keeps_full_row(record.action_type)]
+            ActionLogCounter.add_records(counted)
+            records = [record for record in records if ActionLog.keeps_full_row(record.action_type)]
+            ActionLog.objects.bulk_create(records, batch_size=500)
+            return len(records) + len(counted)
+        ActionLog.objects.bulk_create(records, batch_size=500)
+        return len(records)
+
+
+def _count_dropped(n):
+    global _dropped
+    with _queue_lock:
+        _dropped += n
+        return _dropped
+
+
+def _requeue(records):
+    """Devuelve registros a la cola; retorna cuántos no cupieron"""
+    pending = _get_queue()
+    for index, record in enumerate(records):
+        try:
+            pending.put_nowait(record)
+        except queue.Full:
+            return len(records) - index
+    return 0
+
+
+def _write(records):
+    from prevcad.models import ActionLog
+
+    delay = getattr(settings, 'AUDIT_LOG_RETRY_DELAY', 0.5)
+    for attempt in (1, 2):
+        try:
+            return _write_batch(records)
+        except Exception as e:
+            logger.error(f"Error escribiendo {len(records)} registros de auditoría (intento {attempt}): {e}")
+        if attempt == 1 and delay:
+            # Un bloqueo de la base de datos suele liberarse en poco tiempo
+            time.sleep(delay)
+
+    # Las filas completas (denegaciones, errores, cambios) se reintentan en el siguiente lote
+    kept = [record for record in records if ActionLog.keeps_full_row(record.action_type)]
+    lost = len(records) - len(kept) + _requeue(kept)
+    if lost:
+        count = _count_dropped(lost)
+        logger.warning(f"Lote de auditoría descartado: {count} registros descartados en total")
+    return 0
+
+
+def submit(record):
+    """Encola un ActionLog sin guardar"""
+    if getattr(settings, 'AUDIT_LOG_SYNC', False):
+        _write([record])
+        return
+
+    _ensure_worker()
+    pending = _get_queue()
+    try:
+        pending.put_nowait(record)
+        if pending.qsize() >= getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 200):
+            _wakeup.set()
+    except queue.Full:
+        if record.action_type in SYNC_ON_OVERFLOW:
+            _write([record])
+            return
+        count = _count_dropped(1)
+        # Evita inundar el log: avisa en el primero y luego cada 1000
+        if count == 1 or count % 1000 == 0:
+            logger.warning(f"Cola de auditoría llena: {count} registros descartados")
+
+
+def _drain(limit=None):
+    records = []
+    pending = _get_queue()
+    while limit is None or len(records) < limit:
+        try:
+            records.append(pending.get_nowait())
+        except queue.Empty:
+            break
+    return records
+
+
+def flush():
+    """
+    Escribe todo lo encolado en este momento.
+
+    Returns:
+        int: registros escritos.
+    """
+    with _flush_lock:
+        records = _drain()
+        return _write(records) if records else 0
+
+
+def _worker():
+    while not _stopping.is_set():
+        _wakeup.wait(getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2))
+        _wakeup.clear()
+        if _stopping.is_set():
+            # shutdown() escribe lo pendiente
+            break
+        close_old_connections()
+        flush()
+
+
+def _ensure_worker():
+    global _worker_thread
+    if _worker_thread is not None:
+        return
+    with _queue_lock:
+        if _worker_thread is not None:
+            return
+        _worker_thread = threading.Thread(target=_worker, name='audit-log-writer', daemon=True)
+        _worker_thread.start()
+
+
+def shutdown(timeout=10):
+    """Detiene el hilo y escribe lo pendiente (se registra con atexit)"""
+    global _worker_thread
+    with _queue_lock:
+        worker, _worker_thread = _worker_thread, None
+    if worker is not None:
+        _stopping.set()
+        _wakeup.set()
+        worker.join(timeout)
+        _stopping.clear()
+    flush()
+
+
+atexit.register(shutdown)
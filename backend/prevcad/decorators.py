@@ -1,16 +1,24 @@
 from functools import wraps
+from datetime import datetime
+import hashlib
 from django.http import JsonResponse
 from django.utils.translation import gettext as _
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 import logging
 from .models.action_log import ActionLog
+from . import audit_sink
 
 logger = logging.getLogger(__name__)
 
 def log_action_to_db(user, action_type, description, request=None, extra_data=None):
-    """Función auxiliar para registrar acciones en la base de datos"""
+    """
+    Función auxiliar para registrar acciones en la base de datos. El registro se
+    escribe en segundo plano (ver prevcad.audit_sink).
+    """
     try:
-        ActionLog.objects.create(
+        audit_sink.submit(ActionLog(
             timestamp=timezone.now(),
             user=user if user and user.is_authenticated else None,
             action_type=action_type,
@@ -18,7 +26,7 @@ def log_action_to_db(user, action_type, description, request=None, extra_data=No
             ip_address=request.META.get('REMOTE_ADDR') if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None,
             extra_data=extra_data or {}
-        )
+        ))
     except Exception as e:
         logger.error(f"Error registrando acción: {e}")
 
@@ -79,7 +87,7 @@ def doctor_required(view_func):
                 action_type='ACCESS_GRANTED',
                 description=f"Acceso exitoso a vista protegida: {request.path}",
                 request=request,
-                extra_data={'user_roles': user_roles}
+                extra_data={'user_roles': user_roles, 'path': request.path}
             )
 
             return view_func(request, *args, **kwargs)
@@ -144,6 +152,66 @@ def log_action(action_type, description=None):
         return wrapper
     return decorator
 
+def build_version_stamp(request, stamp):
+    """
+    Construye el ETag y Last-Modified a partir de los valores de versión.
+
+    El ETag depende del usuario, de la URL completa (incluye query string) y de
+    los valores entregados por la función de versión. Last-Modified es el datetime
+    más reciente dentro de esos valores, si existe alguno.
+    """
+    user_id = getattr(request.user, 'id', None)
+    raw = repr((user_id, request.build_absolute_uri(), tuple(stamp)))
+    etag = '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    dates = [value for value in stamp if isinstance(value, datetime)]
+    last_modified = int(max(dates).timestamp()) if dates else None
+    return etag, last_modified
+
+def conditional_get(stamp_func):
+    """
+    Decorador para respuestas condicionales (ETag / Last-Modified) en vistas GET.
+
+    `stamp_func(request)` debe retornar una tupla de valores baratos de obtener
+    (conteos, fechas de actualización) que cambien cuando cambia el contenido.
+    Si el cliente ya tiene esa versión se responde 304 sin ejecutar la vista ni
+    los serializers. Soporta vistas basadas en función (aplicar bajo @api_view,
+    para que la autenticación ya esté resuelta) y métodos de vistas basadas en clase.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            if len(args) > 0 and hasattr(args[0], 'request'):
+                request = args[0].request
+            else:
+                request = args[0]
+
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(*args, **kwargs)
+
+            try:
+                etag, last_modified = build_version_stamp(request, stamp_func(request))
+            except Exception as e:
+                logger.error(f"Error calculando versión para {request.path}: {e}")
+                return view_func(*args, **kwargs)
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view_func(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+            # Los datos son por usuario: el cliente debe revalidar siempre
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
 # Ejemplo de uso:
 """
 @doctor_required
@@ -154,4 +222,9 @@ def update_medical_profile(request):
 @log_action('VIEW', 'Visualización de historial médico')
 def view_medical_history(request):
     # ... código de la vista ...
+
+@api_view(['GET'])
+@conditional_get(lambda request: (request.user.profile.updated_at,))
+def get_medical_profile(request):
+    # ... código de la vista ...
 """
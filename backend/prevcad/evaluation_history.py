@@ -0,0 +1,150 @@
+"""
+Historial compacto de evaluaciones (HealthCategory.evaluation_history).
+
+Lista append-only con una entrada por cada cambio en las respuestas del
+formulario o en el color de estado de la recomendación:
+
+    {"version": 4, "at": "...", "snapshot": {...}}        estado completo
+    {"version": 5, "at": "...", "diff": {...}}            cambios desde la entrada anterior
+    {"version": 5, "at": "...", "status_color": "rojo"}   el color solo se anota si cambió
+
+El estado es {"responses": {...}, "professional_responses": {...}} y los diffs
+son JSON Merge Patch (ver merge_patch), así que una respuesta con valor null no
+se distingue de una eliminada. Cada SNAPSHOT_INTERVAL entradas con cambios se
+guarda el estado completo: reconstruir cualquier versión aplica a lo más
+SNAPSHOT_INTERVAL - 1 diffs.
+
+`version` es la de EvaluationForm al guardar (0 si el formulario no existe).
+"""
+from django.utils import timezone
+
+SNAPSHOT_INTERVAL = 10
+
+
+def merge_patch(target, patch):
+    """
+    JSON Merge Patch (RFC 7386): los objetos se combinan recursivamente, `null`
+    elimina la clave y cualquier otro valor reemplaza al existente.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def empty_state():
+    return {'responses': {}, 'professional_responses': {}}
+
+
+def form_state(evaluation_form):
+    """Estado registrado en el historial para un formulario"""
+    return {
+        'responses': evaluation_form.responses or {},
+        'professional_responses': evaluation_form.professional_responses or {},
+    }
+
+
+def diff_patch(old, new):
+    """Merge patch que lleva de `old` a `new` ({} si son iguales)"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old.keys() - new.keys()}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = diff_patch(old[key], value) if isinstance(value, dict) else value
+    return patch
+
+
+def reconstruct(history, index=None):
+    """Estado tras la entrada `index` (por defecto, la última)"""
+    if index is None:
+        index = len(history) - 1
+    start = index
+    while start >= 0 and 'snapshot' not in history[start]:
+        start -= 1
+    state = history[start]['snapshot'] if start >= 0 else empty_state()
+    for entry in history[start + 1:index + 1]:
+        if 'diff' in entry:
+            state = merge_patch(state, entry['diff'])
+    return state
+
+
+def find_version(history, version):
+    """Índice de la última entrada con `version`, o None"""
+    for index in range(len(history) - 1, -1, -1):
+        if history[index].get('version') == version:
+            return index
+    return None
+
+
+def status_color_at(history, index=None):
+    """Último color de estado anotado hasta la entrada `index`, o None"""
+    if index is None:
+        index = len(history) - 1
+    for entry in reversed(history[:index + 1]):
+        if 'status_color' in entry:
+            return entry['status_color']
+    return None
+
+
+def build_entry(history, state=None, version=None, status_color=None):
+    """
+    Entrada a agregar a `history`, o None si no hay nada nuevo.
+
+    Args:
+        state (dict): estado actual (form_state); None si las respuestas no cambiaron.
+        version (int): versión del formulario; por defecto, la de la última entrada.
+        status_color (str): color actual de la recomendación, si se conoce.
+    """
+    if version is None:
+        version = history[-1]['version'] if history else 0
+    entry = {'version': version, 'at': timezone.now().isoformat()}
+
+    if status_color is not None and status_color != status_color_at(history):
+        entry['status_color'] = status_color
+
+    if state is not None:
+        diff = diff_patch(reconstruct(history), state)
+        if diff:
+            changes = 0
+            for previous in reversed(history):
+                if 'snapshot' in previous:
+                    break
+                changes += 'diff' in previous
+            if changes + 1 >= SNAPSHOT_INTERVAL:
+                entry['snapshot'] = state
+            else:
+                entry['diff'] = diff
+
+    if len(entry) == 2:
+        return None
+    return entry
+
+
+def describe(entry):
+    """Resumen de una entrada sin los valores de las respuestas"""
+    summary = {'version': entry['version'], 'at': entry['at']}
+    if 'status_color' in entry:
+        summary['status_color'] = entry['status_color']
+    if 'snapshot' in entry:
+        summary['kind'] = 'snapshot'
+    elif 'diff' in entry:
+        summary['kind'] = 'diff'
+        summary['changed_nodes'] = sorted(entry['diff'].get('responses') or {})
+        summary['professional_changed'] = 'professional_responses' in entry['diff']
+    return summary
+
+
+def status_trend(history):
+    """Puntos [{version, at, status_color}] con cada cambio de color"""
+    return [
+        {'version': entry['version'], 'at': entry['at'], 'status_color': entry['status_color']}
+        for entry in history if 'status_color' in entry
+    ]
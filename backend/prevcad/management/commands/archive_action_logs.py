@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from prevcad import audit_archive
+
+class Command(BaseCommand):
+    help = 'Move action logs older than the retention horizon to monthly gzip JSONL archives and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ACTION_LOG_RETENTION_DAYS,
+            help='Days of action logs kept in the database'
+        )
+        parser.add_argument('--output', default=settings.ACTION_LOG_ARCHIVE_DIR, help='Archive directory')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows deleted per transaction')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        try:
+            results = audit_archive.archive_older_than(cutoff, options['output'], options['chunk_size'])
+        except audit_archive.ArchiveError as e:
+            raise CommandError(str(e))
+        for month, count in results.items():
+            if count:
+                self.stdout.write(f'{month}: {count} action logs')
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {sum(results.values())} action logs older than {cutoff:%Y-%m-%d}'
+        ))
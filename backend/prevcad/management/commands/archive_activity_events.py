@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from prevcad import audit_archive
+from prevcad.models import ActivityEvent
+
+class Command(BaseCommand):
+    help = 'Export activity events of months past the retention window to gzip JSONL files and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=settings.ACTIVITY_EVENT_RETENTION_MONTHS,
+            help='Months to keep, counting the current one'
+        )
+        parser.add_argument(
+            '--output', default=settings.ACTIVITY_EVENT_ARCHIVE_DIR, help='Directory for the monthly archives'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        # First month that is kept
+        index = today.year * 12 + today.month - 1 - (options['months'] - 1)
+        cutoff, _ = ActivityEvent.month_range(index // 12, index % 12 + 1)
+
+        oldest = ActivityEvent.objects.filter(timestamp__lt=cutoff).order_by('timestamp').first()
+        total = 0
+        if oldest is not None:
+            first = timezone.localtime(oldest.timestamp)
+            for month_index in range(first.year * 12 + first.month - 1, index):
+                year, month = month_index // 12, month_index % 12 + 1
+                try:
+                    count = ActivityEvent.archive_month(year, month, options['output'])
+                except audit_archive.ArchiveError as e:
+                    raise CommandError(str(e))
+                if count:
+                    self.stdout.write(f'{year:04d}-{month:02d}: {count} events')
+                total += count
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} activity events'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from prevcad.models import ActivityEvent
+
+class Command(BaseCommand):
+    help = 'Append the actions of existing daily activity logs to the activity event table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Daily logs per bulk insert')
+
+    def handle(self, *args, **options):
+        count = ActivityEvent.backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recorded {count} activity events'))
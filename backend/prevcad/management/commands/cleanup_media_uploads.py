@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from prevcad.models import MediaUpload
+
+class Command(BaseCommand):
+    help = 'Delete chunked image uploads that were never attached to an evaluation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Minimum hours without activity')
+
+    def handle(self, *args, **options):
+        count = MediaUpload.cleanup_expired(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired uploads'))
@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from prevcad.models import SyncOperation
+
+class Command(BaseCommand):
+    help = 'Delete idempotency keys of synced operations older than the retry window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Days to keep applied operation keys')
+
+    def handle(self, *args, **options):
+        count = SyncOperation.cleanup_expired(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} sync operation keys'))
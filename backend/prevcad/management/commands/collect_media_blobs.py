@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from prevcad.media_store import collect_garbage
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media blobs that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Minimum hours without references')
+
+    def handle(self, *args, **options):
+        count = collect_garbage(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} unreferenced blobs'))
@@ -0,0 +1,38 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from prevcad import activity_export
+
+class Command(BaseCommand):
+    help = (
+        'Export app activity (one row per action) or action logs to a columnar file. '
+        'Parquet and Arrow need pyarrow (the "export" extra)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=activity_export.DATASETS)
+        parser.add_argument('--format', choices=activity_export.FORMATS, default='parquet')
+        parser.add_argument('--output', help='Output file (default: <dataset>_<today>.<format>)')
+        parser.add_argument('--since', type=datetime.date.fromisoformat, help='First date included (YYYY-MM-DD)')
+        parser.add_argument('--until', type=datetime.date.fromisoformat, help='First date excluded (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=activity_export.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        dataset = options['dataset']
+        try:
+            fmt = activity_export.check_format(options['format'])
+        except activity_export.FormatUnavailable as e:
+            raise CommandError(str(e))
+        path = options['output'] or (
+            f"{dataset}_{timezone.localdate():%Y%m%d}.{activity_export.EXTENSIONS[fmt]}"
+        )
+
+        queryset = activity_export.default_queryset(dataset, options['since'], options['until'])
+        with open(path, 'wb') as output:
+            fmt, rows = activity_export.export(
+                dataset, output, fmt, queryset=queryset, batch_size=options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS(f'Exported {rows} rows to {path} ({fmt})'))
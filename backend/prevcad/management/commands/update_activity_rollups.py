@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from prevcad.models import ActivityRollup
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the daily, weekly and monthly activity rollups touched by activity events '
+        'received since the last run (run backfill_activity_events first on existing data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every period with activity')
+
+    def handle(self, *args, **options):
+        count = ActivityRollup.update_rollups(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {count} activity rollups (events up to id {ActivityRollup.last_event_id()})'
+        ))
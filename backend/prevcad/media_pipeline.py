@@ -0,0 +1,137 @@
+"""
+Procesamiento en segundo plano de imágenes subidas (evaluaciones y perfil).
+
+El request solo guarda el original y encola su ruta. Un hilo de trabajo genera
+los derivados `thumb` y `preview` en JPEG junto al original, con la orientación
+EXIF ya aplicada.
+
+El original no se modifica: es la única copia de la imagen del paciente y su
+contenido es el que identifica el hash de prevcad.media_store.
+
+Las rutas de los derivados son deterministas (ver `derivative_path`), así que se
+pueden registrar junto a la ruta original en el mismo request, antes de que
+existan; quien los muestre debe usar el original como respaldo.
+
+Con `MEDIA_PIPELINE_SYNC = True` los trabajos se ejecutan en el mismo hilo (tests,
+comandos de mantenimiento).
+"""
+import atexit
+import io
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# {nombre: tamaño máximo (ancho, alto)}
+DERIVATIVES = {
+    'thumb': (200, 200),
+    'preview': (1024, 1024),
+}
+JPEG_QUALITY = 85
+
+_queue = queue.Queue(maxsize=1000)
+_workers = []
+_workers_lock = threading.Lock()
+_STOP = object()
+
+
+def derivative_path(path, name):
+    """Ruta del derivado `name` de una imagen: foto.png -> foto.thumb.jpg"""
+    root, _ = os.path.splitext(str(path))
+    return f'{root}.{name}.jpg'
+
+
+def delete_derivatives(path):
+    """Elimina los derivados de una imagen (por ejemplo, al reemplazarla)"""
+    for name in DERIVATIVES:
+        try:
+            default_storage.delete(derivative_path(path, name))
+        except Exception as e:
+            logger.warning(f"Error eliminando derivado {name} de {path}: {str(e)}")
+
+
+def process_image(path):
+    """Genera los derivados de una imagen de default_storage (sin modificar el original)"""
+    with default_storage.open(path, 'rb') as image_file:
+        image = Image.open(image_file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+
+    rgb = image.convert('RGB')
+    for name, size in DERIVATIVES.items():
+        derivative = rgb.copy()
+        derivative.thumbnail(size)
+        # Codificar antes de tocar el storage: un error no deja el derivado a medias
+        buffer = io.BytesIO()
+        derivative.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+        target = derivative_path(path, name)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def _run(path):
+    try:
+        process_image(path)
+    except Exception as e:
+        logger.error(f"Error procesando imagen {path}: {str(e)}")
+
+
+def _worker():
+    while True:
+        path = _queue.get()
+        try:
+            if path is _STOP:
+                return
+            _run(path)
+        finally:
+            _queue.task_done()
+
+
+def _ensure_workers():
+    with _workers_lock:
+        if _workers:
+            return
+        for i in range(getattr(settings, 'MEDIA_PIPELINE_WORKERS', 1)):
+            thread = threading.Thread(target=_worker, name=f'media-pipeline-{i}', daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+
+def enqueue_image(path):
+    """
+    Encola una imagen ya guardada en default_storage para su procesamiento. Si la
+    cola está llena, la imagen queda sin derivados (se sirve el original).
+    """
+    if getattr(settings, 'MEDIA_PIPELINE_SYNC', False):
+        _run(path)
+        return
+    _ensure_workers()
+    try:
+        _queue.put_nowait(path)
+    except queue.Full:
+        logger.warning(f"Cola de imágenes llena, se omite el procesamiento de {path}")
+
+
+def shutdown(timeout=10):
+    """Procesa lo pendiente y detiene los hilos (se registra con atexit)"""
+    with _workers_lock:
+        workers = list(_workers)
+        _workers.clear()
+    for _ in workers:
+        try:
+            _queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            break
+    for thread in workers:
+        thread.join(timeout)
+
+
+atexit.register(shutdown)
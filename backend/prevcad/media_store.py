@@ -0,0 +1,110 @@
+"""
+Almacén de media direccionado por contenido.
+
+Cada archivo se guarda una sola vez en `blobs/<aa>/<bb>/<sha256><ext>`, donde
+`aa` y `bb` son los primeros caracteres del hash (así ningún directorio crece sin
+límite). Subir de nuevo el mismo contenido solo cuesta calcular el hash.
+prevcad.media_pipeline solo escribe derivados junto al blob, nunca lo modifica,
+así que el contenido sigue coincidiendo con su hash y tamaño.
+
+Las referencias se cuentan por diferencias: quien guarda una ruta en un modelo o
+campo JSON llama a `update_references(rutas_anteriores, rutas_nuevas)`. Los blobs
+que quedan sin referencias no se borran de inmediato (un request concurrente
+podría estar por referenciarlos) sino con `collect_garbage`, pasado un margen.
+Las rutas antiguas, fuera de `blobs/`, se ignoran.
+"""
+import hashlib
+import logging
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from prevcad.media_pipeline import delete_derivatives
+from prevcad.models.media_blob import MediaBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_ROOT = 'blobs'
+
+
+def blob_path(content_hash, ext):
+    ext = ext.lower()
+    if ext and not ext.startswith('.'):
+        ext = f'.{ext}'
+    return f'{BLOB_ROOT}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}'
+
+
+def is_blob_path(path):
+    return bool(path) and str(path).startswith(f'{BLOB_ROOT}/')
+
+
+def hash_file(file):
+    """SHA-256 y tamaño del archivo, leído por bloques"""
+    sha256 = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks():
+        sha256.update(chunk)
+        size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+def store_file(file, ext):
+    """
+    Guarda `file` (un File de Django) si su contenido no existe aún.
+
+    Returns:
+        tuple: (ruta del blob, True si se escribió un archivo nuevo)
+    """
+    content_hash, size = hash_file(file)
+    existing = MediaBlob.objects.filter(content_hash=content_hash)
+    # Tocar updated_at aleja el blob de collect_garbage mientras se referencia
+    if existing.update(updated_at=timezone.now()):
+        return existing.values_list('path', flat=True).get(), False
+
+    path = blob_path(content_hash, ext)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    file.seek(0)
+    saved_path = default_storage.save(path, file)
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(content_hash=content_hash, path=saved_path, size=size)
+    except IntegrityError:
+        # Otro request guardó el mismo contenido al mismo tiempo
+        if saved_path != path:
+            default_storage.delete(saved_path)
+        return existing.values_list('path', flat=True).get(), False
+    return saved_path, True
+
+
+def update_references(old_paths, new_paths):
+    """Ajusta ref_count según las rutas que dejan de usarse y las que se agregan"""
+    old = Counter(path for path in old_paths if is_blob_path(path))
+    new = Counter(path for path in new_paths if is_blob_path(path))
+    deltas = Counter(new)
+    deltas.subtract(old)
+    for path, delta in deltas.items():
+        if delta:
+            MediaBlob.objects.filter(path=path).update(
+                ref_count=F('ref_count') + delta, updated_at=timezone.now()
+            )
+
+
+def collect_garbage(grace=timedelta(days=1)):
+    """Elimina los blobs sin referencias desde hace más de `grace`"""
+    unused = MediaBlob.objects.filter(
+        ref_count__lte=0, updated_at__lt=timezone.now() - grace
+    )
+    count = 0
+    for blob in unused.iterator():
+        # Borrar la fila solo si sigue sin referencias
+        if MediaBlob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()[0]:
+            default_storage.delete(blob.path)
+            delete_derivatives(blob.path)
+            count += 1
+    return count
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0010_systemdocument"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categorytemplate",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, null=True, verbose_name="Última actualización"
+            ),
+        ),
+    ]
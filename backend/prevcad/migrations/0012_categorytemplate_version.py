@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0011_categorytemplate_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categorytemplate",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Versión"
+            ),
+        ),
+    ]
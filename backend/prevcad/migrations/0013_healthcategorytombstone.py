@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0012_categorytemplate_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HealthCategoryTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("category_id", models.BigIntegerField()),
+                ("template_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="category_tombstones",
+                        to="prevcad.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Categoría de Salud Eliminada",
+                "verbose_name_plural": "Categorías de Salud Eliminadas",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "deleted_at"],
+                        name="prevcad_hea_user_id_0335d0_idx",
+                    )
+                ],
+            },
+        ),
+    ]
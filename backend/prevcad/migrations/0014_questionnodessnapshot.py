@@ -0,0 +1,105 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:47
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def compute_hash(question_nodes):
+    canonical = json.dumps(
+        question_nodes, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def dedupe_question_nodes(apps, schema_editor):
+    """Reemplaza la copia de cada formulario por una referencia a su versión compartida"""
+    EvaluationForm = apps.get_model("prevcad", "EvaluationForm")
+    QuestionNodesSnapshot = apps.get_model("prevcad", "QuestionNodesSnapshot")
+
+    snapshot_ids = {}
+    pending = []
+    forms = EvaluationForm.objects.filter(question_nodes__isnull=False).only(
+        "id", "question_nodes"
+    )
+    for form in forms.iterator(chunk_size=BATCH_SIZE):
+        content_hash = compute_hash(form.question_nodes)
+        if content_hash not in snapshot_ids:
+            snapshot, _ = QuestionNodesSnapshot.objects.get_or_create(
+                content_hash=content_hash,
+                defaults={"question_nodes": form.question_nodes},
+            )
+            snapshot_ids[content_hash] = snapshot.id
+        form.question_nodes_snapshot_id = snapshot_ids[content_hash]
+        pending.append(form)
+        if len(pending) >= BATCH_SIZE:
+            EvaluationForm.objects.bulk_update(pending, ["question_nodes_snapshot"])
+            pending = []
+    if pending:
+        EvaluationForm.objects.bulk_update(pending, ["question_nodes_snapshot"])
+
+
+def restore_question_nodes(apps, schema_editor):
+    """Vuelve a copiar los nodos en cada formulario"""
+    EvaluationForm = apps.get_model("prevcad", "EvaluationForm")
+    QuestionNodesSnapshot = apps.get_model("prevcad", "QuestionNodesSnapshot")
+
+    for snapshot in QuestionNodesSnapshot.objects.iterator():
+        EvaluationForm.objects.filter(question_nodes_snapshot=snapshot).update(
+            question_nodes=snapshot.question_nodes
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0013_healthcategorytombstone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionNodesSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(editable=False, max_length=64, unique=True),
+                ),
+                ("question_nodes", models.JSONField(editable=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Versión de Preguntas",
+                "verbose_name_plural": "Versiones de Preguntas",
+            },
+        ),
+        migrations.AddField(
+            model_name="evaluationform",
+            name="question_nodes_snapshot",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Nodos de preguntas con que se creó el formulario",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="evaluation_forms",
+                to="prevcad.questionnodessnapshot",
+            ),
+        ),
+        migrations.RunPython(dedupe_question_nodes, restore_question_nodes),
+        migrations.RemoveField(
+            model_name="evaluationform",
+            name="question_nodes",
+        ),
+    ]
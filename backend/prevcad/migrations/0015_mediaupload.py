@@ -0,0 +1,84 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:52
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0014_questionnodessnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="Nombre de archivo"),
+                ),
+                (
+                    "content_type",
+                    models.CharField(blank=True, max_length=100, verbose_name="Tipo"),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="Tamaño total")),
+                (
+                    "received",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Bytes recibidos"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pendiente"),
+                            ("COMPLETE", "Completa"),
+                            ("ATTACHED", "Adjuntada"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "file_path",
+                    models.CharField(
+                        blank=True, max_length=500, verbose_name="Ruta definitiva"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="media_uploads",
+                        to="prevcad.userprofile",
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Subida de Imagen",
+                "verbose_name_plural": "Subidas de Imágenes",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "updated_at"],
+                        name="prevcad_med_status_8bfa4d_idx",
+                    )
+                ],
+            },
+        ),
+    ]
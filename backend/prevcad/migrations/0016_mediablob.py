@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0015_mediaupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="SHA-256"
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(max_length=255, unique=True, verbose_name="Ruta"),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="Tamaño")),
+                (
+                    "ref_count",
+                    models.IntegerField(default=0, verbose_name="Referencias"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Archivo Compartido",
+                "verbose_name_plural": "Archivos Compartidos",
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "updated_at"],
+                        name="prevcad_med_ref_cou_35ba44_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0016_mediablob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluationform",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Versión"
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0017_evaluationform_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncOperation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        max_length=100, verbose_name="Clave de idempotencia"
+                    ),
+                ),
+                ("op_type", models.CharField(max_length=50, verbose_name="Tipo")),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Resultado"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_operations",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Operación Sincronizada",
+                "verbose_name_plural": "Operaciones Sincronizadas",
+                "indexes": [
+                    models.Index(
+                        fields=["created_at"], name="prevcad_syn_created_5ccc8b_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "key"), name="unique_user_sync_operation_key"
+                    )
+                ],
+            },
+        ),
+    ]
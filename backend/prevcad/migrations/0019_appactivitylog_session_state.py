@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0018_syncoperation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appactivitylog",
+            name="session_state",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Totales acumulados para actualizar el resumen de forma incremental",
+                null=True,
+                verbose_name="Estado de Sesiones",
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0019_appactivitylog_session_state"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityAction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Código"
+                    ),
+                ),
+                ("created_date", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Acción de Actividad",
+                "verbose_name_plural": "Acciones de Actividad",
+                "ordering": ["code"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ActivityEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField(verbose_name="Fecha y hora")),
+                (
+                    "action",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="events",
+                        to="prevcad.activityaction",
+                        verbose_name="Acción",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_events",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Evento de Actividad",
+                "verbose_name_plural": "Eventos de Actividad",
+                "ordering": ["-timestamp"],
+                "indexes": [
+                    models.Index(
+                        fields=["action", "timestamp"],
+                        name="prevcad_act_action__e696d0_idx",
+                    ),
+                    models.Index(
+                        fields=["timestamp", "user"],
+                        name="prevcad_act_timesta_a3cba2_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "timestamp", "action"),
+                        name="unique_user_activity_event",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0020_activityevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Día"), ("week", "Semana"), ("month", "Mes")],
+                        max_length=5,
+                        verbose_name="Periodo",
+                    ),
+                ),
+                ("start", models.DateField(verbose_name="Inicio")),
+                (
+                    "active_users",
+                    models.IntegerField(default=0, verbose_name="Usuarios Activos"),
+                ),
+                (
+                    "n_entries",
+                    models.IntegerField(default=0, verbose_name="Número de Entradas"),
+                ),
+                (
+                    "n_logins",
+                    models.IntegerField(
+                        default=0, verbose_name="Número de Inicios de Sesión"
+                    ),
+                ),
+                (
+                    "time_in_app",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Suma del tiempo en la aplicación de todos los usuarios",
+                        verbose_name="Tiempo en la Aplicación (segundos)",
+                    ),
+                ),
+                (
+                    "top_actions",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        verbose_name="Acciones más frecuentes por pantalla",
+                    ),
+                ),
+                (
+                    "source_updated",
+                    models.DateTimeField(
+                        help_text="Registros de actividad modificados hasta este momento están incluidos",
+                        verbose_name="Actualizado hasta",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Actividad",
+                "verbose_name_plural": "Resúmenes de Actividad",
+                "ordering": ["period", "-start"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("period", "start"), name="unique_activity_rollup_period"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0021_activityrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActionLogCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(blank=True, max_length=255, verbose_name="Ruta"),
+                ),
+                (
+                    "action_type",
+                    models.CharField(max_length=20, verbose_name="Tipo de acción"),
+                ),
+                ("hour", models.DateTimeField(verbose_name="Hora")),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="Cantidad"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Conteo de Accesos",
+                "verbose_name_plural": "Conteo de Accesos",
+                "ordering": ["-hour"],
+                "indexes": [
+                    models.Index(fields=["hour"], name="prevcad_act_hour_78364d_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "path", "action_type", "hour"),
+                        name="unique_action_log_counter",
+                    )
+                ],
+            },
+        ),
+    ]
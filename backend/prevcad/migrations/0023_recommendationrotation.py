@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0022_actionlogcounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationRotation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "order",
+                    models.BinaryField(default=bytes, verbose_name="Permutación"),
+                ),
+                (
+                    "cursor",
+                    models.PositiveIntegerField(default=0, verbose_name="Cursor"),
+                ),
+                (
+                    "catalog_signature",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Catálogo con el que se armó la permutación",
+                        max_length=50,
+                        verbose_name="Versión del catálogo",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendation_rotation",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Rotación de Recomendaciones",
+                "verbose_name_plural": "Rotaciones de Recomendaciones",
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0023_recommendationrotation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=50, unique=True, verbose_name="Catálogo"
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=0, verbose_name="Versión"),
+                ),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name": "Versión de Catálogo",
+                "verbose_name_plural": "Versiones de Catálogo",
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0024_catalogversion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="actionlogcounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("user__isnull", True)),
+                fields=("path", "action_type", "hour"),
+                name="unique_anonymous_action_log_counter",
+            ),
+        ),
+    ]
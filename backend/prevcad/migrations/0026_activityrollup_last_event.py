@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0025_anonymous_action_log_counter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activityrollup",
+            name="last_event",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Mayor id de ActivityEvent incluido al calcular el resumen",
+                verbose_name="Último evento",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="activityrollup",
+            name="source_updated",
+            field=models.DateTimeField(
+                help_text="Momento en que se calculó el resumen",
+                verbose_name="Actualizado",
+            ),
+        ),
+    ]
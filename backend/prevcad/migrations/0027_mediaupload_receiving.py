@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prevcad", "0026_activityrollup_last_event"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mediaupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pendiente"),
+                    ("RECEIVING", "Recibiendo parte"),
+                    ("COMPLETE", "Completa"),
+                    ("ATTACHED", "Adjuntada"),
+                ],
+                default="PENDING",
+                max_length=20,
+                verbose_name="Estado",
+            ),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from .text_recomendation import TextRecomendation
-from .health_category import HealthCategory
+from .health_category import HealthCategory, HealthCategoryTombstone
 from .category_template import CategoryTemplate
 from .activity_node import (
     ActivityNode,
@@ -17,22 +17,31 @@ from .activity_node import (
     ImageNode,
 )
 from .user_recommendation_interaction import UserRecommendationInteraction
+from .recommendation_rotation import RecommendationRotation
 
 from .appointment import Appointment
 from .user_profile import UserProfile
-from .evaluation import EvaluationForm
+from .evaluation import EvaluationForm, EvaluationFormConflict, QuestionNodesSnapshot
 from .recommendation import Recommendation
-from .action_log import ActionLog
+from .action_log import ActionLog, ActionLogCounter
 from .app_activity_log import AppActivityLog
+from .activity_event import ActivityAction, ActivityEvent
+from .activity_rollup import ActivityRollup
 from .user import User
 from .user_types import UserTypes, AccessLevel, ResourceType
 from .downloads import DownloadableContent, DownloadByUser
 from .system_document import SystemDocument
+from .media_upload import MediaUpload
+from .media_blob import MediaBlob
+from .sync_operation import SyncOperation
+from .catalog_version import CatalogVersion
 
 __all__ = [
     "ActionLog",
+    "ActionLogCounter",
     "CategoryTemplate",
     "HealthCategory",
+    "HealthCategoryTombstone",
     "TextRecomendation",
     "ActivityNodeDescription",
     "ResultNode",
@@ -45,6 +54,7 @@ __all__ = [
     "ScaleQuestion",
     "ImageQuestion",
     "UserRecommendationInteraction",
+    "RecommendationRotation",
     "Appointment",
     "VideoNode",
     "TextNode",
@@ -56,7 +66,14 @@ __all__ = [
     "AccessLevel",
     "ResourceType",
     "AppActivityLog",
+    "ActivityAction",
+    "ActivityEvent",
+    "ActivityRollup",
     "DownloadableContent",
     "DownloadByUser",
     "SystemDocument",
+    "MediaUpload",
+    "MediaBlob",
+    "SyncOperation",
+    "CatalogVersion",
 ]
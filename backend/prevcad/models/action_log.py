@@ -1,5 +1,10 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 class ActionLog(models.Model):
@@ -61,4 +66,129 @@ class ActionLog(models.Model):
 
     def __str__(self):
         user_str = self.user.username if self.user else 'Sistema'
-        return f"{self.get_action_type_display()} por {user_str} en {self.timestamp}" 
\ No newline at end of file
+        return f"{self.get_action_type_display()} por {user_str} en {self.timestamp}"
+
+    # Tipos que siempre se guardan como fila completa en modo agregado (AUDIT_LOG_AGGREGATE):
+    # denegaciones, errores, acciones que modifican datos (p. ej. PROFILE_UPDATE) y subidas
+    FULL_ROW_KEYWORDS = {'DENIED', 'ERROR', 'CREATE', 'UPDATE', 'DELETE', 'UPLOAD'}
+
+    @classmethod
+    def keeps_full_row(cls, action_type):
+        return bool(cls.FULL_ROW_KEYWORDS.intersection(action_type.split('_')))
+
+
+class ActionLogCounter(models.Model):
+    """
+    Conteo de accesos rutinarios por (usuario, ruta, tipo de acción, hora). En
+    modo agregado (AUDIT_LOG_AGGREGATE) reemplaza a las filas de ActionLog que no
+    aportan más que "el usuario X accedió a la ruta Y".
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Usuario"
+    )
+    path = models.CharField(max_length=255, blank=True, verbose_name="Ruta")
+    action_type = models.CharField(max_length=20, verbose_name="Tipo de acción")
+    hour = models.DateTimeField(verbose_name="Hora")
+    count = models.PositiveIntegerField(default=0, verbose_name="Cantidad")
+
+    class Meta:
+        verbose_name = "Conteo de Accesos"
+        verbose_name_plural = "Conteo de Accesos"
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'path', 'action_type', 'hour'],
+                name='unique_action_log_counter',
+            ),
+            # La restricción anterior no cubre user NULL (los NULL son distintos entre sí)
+            models.UniqueConstraint(
+                fields=['path', 'action_type', 'hour'],
+                condition=models.Q(user__isnull=True),
+                name='unique_anonymous_action_log_counter',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.action_type} {self.path} x{self.count} ({self.hour})"
+
+    @staticmethod
+    def key(record):
+        """(usuario, ruta, tipo, hora) de un ActionLog sin guardar"""
+        path = ((record.extra_data or {}).get('path') or '')[:255]
+        hour = record.timestamp.replace(minute=0, second=0, microsecond=0)
+        return record.user_id, path, record.action_type, hour
+
+    @classmethod
+    def add_records(cls, records):
+        """
+        Suma los registros a sus contadores en una transacción: crea los que
+        faltan (ignorando conflictos con otros procesos) y los incrementa con
+        un solo bulk_update de `count = count + n`.
+
+        Returns:
+            int: contadores actualizados.
+        """
+        return cls.add_counts(Counter(cls.key(record) for record in records))
+
+    @classmethod
+    def add_counts(cls, counts):
+        """Suma {(usuario, ruta, tipo, hora): n} a los contadores (ver add_records)"""
+        if not counts:
+            return 0
+
+        def load():
+            found = {}
+            candidates = cls.objects.select_for_update().filter(
+                hour__in={key[3] for key in counts},
+                path__in={key[1] for key in counts},
+                action_type__in={key[2] for key in counts},
+            )
+            for counter in candidates:
+                key = (counter.user_id, counter.path, counter.action_type, counter.hour)
+                if key in counts:
+                    found[key] = counter
+            return found
+
+        with transaction.atomic():
+            counters = load()
+            missing = [key for key in counts if key not in counters]
+            if missing:
+                cls.objects.bulk_create(
+                    [
+                        cls(user_id=user_id, path=path, action_type=action_type, hour=hour)
+                        for user_id, path, action_type, hour in missing
+                    ],
+                    ignore_conflicts=True,
+                )
+                counters = load()
+            for key, counter in counters.items():
+                counter.count = F('count') + counts[key]
+            cls.objects.bulk_update(list(counters.values()), ['count'])
+        return len(counters)
+
+    @classmethod
+    def detach_user(cls, user):
+        """
+        Pasa los contadores de un usuario a los anónimos (al eliminarlo): con
+        SET_NULL chocarían con un contador anónimo de la misma ruta y hora.
+        """
+        with transaction.atomic():
+            counters = cls.objects.filter(user=user)
+            counts = Counter()
+            for path, action_type, hour, count in counters.values_list('path', 'action_type', 'hour', 'count'):
+                counts[(None, path, action_type, hour)] += count
+            counters.delete()
+            cls.add_counts(counts)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def detach_action_log_counters(sender, instance, **kwargs):
+    ActionLogCounter.detach_user(instance)
@@ -0,0 +1,187 @@
+import datetime
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class ActivityAction(models.Model):
+    """Vocabulary of action codes, interned once and referenced by ActivityEvent"""
+
+    class Meta:
+        verbose_name = "Acción de Actividad"
+        verbose_name_plural = "Acciones de Actividad"
+        ordering = ["code"]
+
+    code = models.CharField(max_length=255, unique=True, verbose_name="Código")
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.code
+
+    @classmethod
+    def intern(cls, codes: Iterable[str]) -> Dict[str, int]:
+        """
+        Return {code: id} for the given codes, creating the missing ones.
+        Concurrent writers may create the same code: conflicts are ignored and
+        the ids are read back.
+        """
+        codes = set(codes)
+        if not codes:
+            return {}
+        ids = dict(cls.objects.filter(code__in=codes).values_list("code", "id"))
+        missing = codes - ids.keys()
+        if missing:
+            cls.objects.bulk_create(
+                [cls(code=code) for code in missing], ignore_conflicts=True
+            )
+            ids.update(cls.objects.filter(code__in=missing).values_list("code", "id"))
+        return ids
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only record of every action received from the app, one row per
+    (user, timestamp, action). AppActivityLog keeps the derived daily summary;
+    cross-user questions ("how many users opened downloads this week") are
+    range queries on the composite indexes below instead of scans of the daily
+    JSON blobs.
+
+    Rows are only inserted (bulk_record) and removed a month at a time once
+    archived (archive_month).
+    """
+
+    class Meta:
+        verbose_name = "Evento de Actividad"
+        verbose_name_plural = "Eventos de Actividad"
+        ordering = ["-timestamp"]
+        constraints = [
+            # Resending the same actions does not append them again
+            models.UniqueConstraint(
+                fields=["user", "timestamp", "action"],
+                name="unique_user_activity_event",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["action", "timestamp"]),
+            models.Index(fields=["timestamp", "user"]),
+        ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="activity_events",
+        verbose_name="Usuario",
+    )
+    timestamp = models.DateTimeField(verbose_name="Fecha y hora")
+    action = models.ForeignKey(
+        ActivityAction,
+        on_delete=models.PROTECT,
+        related_name="events",
+        verbose_name="Acción",
+    )
+
+    def __str__(self):
+        return f"{self.user_id} {self.timestamp:%Y-%m-%d %H:%M:%S} {self.action_id}"
+
+    @staticmethod
+    def to_datetime(date, timestamp: str) -> datetime.datetime:
+        """Aware datetime (project time zone) for a log date and an HH:MM:SS timestamp."""
+        if not isinstance(date, datetime.date):
+            date = datetime.date.fromisoformat(str(date))
+        seconds = (
+            int(timestamp[0:2]) * 3600 + int(timestamp[3:5]) * 60 + int(timestamp[6:8])
+        )
+        naive = datetime.datetime.combine(date, datetime.time.min) + datetime.timedelta(
+            seconds=seconds
+        )
+        return timezone.make_aware(naive)
+
+    @classmethod
+    def bulk_record(cls, entries: Dict[tuple, Dict[str, str]], batch_size=1000) -> int:
+        """
+        Append already normalized actions.
+
+        Args:
+            entries: {(user_id, date): {timestamp: action}}
+
+        Returns:
+            int: number of events submitted (already stored ones are ignored).
+        """
+        action_ids = ActivityAction.intern(
+            action for actions in entries.values() for action in actions.values()
+        )
+        events = [
+            cls(
+                user_id=user_id,
+                timestamp=cls.to_datetime(date, timestamp),
+                action_id=action_ids[action],
+            )
+            for (user_id, date), actions in entries.items()
+            for timestamp, action in actions.items()
+        ]
+        cls.objects.bulk_create(events, batch_size=batch_size, ignore_conflicts=True)
+        return len(events)
+
+    @classmethod
+    def active_users(cls, start, end, action: Optional[str] = None) -> int:
+        """Distinct users with events in [start, end), optionally of one action code."""
+        events = cls.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        if action is not None:
+            events = events.filter(action__code=action)
+        return events.values("user").distinct().count()
+
+    @classmethod
+    def backfill(cls, batch_size=500) -> int:
+        """
+        Record the actions of every stored AppActivityLog (idempotent). Meant to
+        be run once when introducing the table: it also restores archived months.
+        """
+        from .app_activity_log import AppActivityLog
+
+        count, entries = 0, {}
+        logs = AppActivityLog.objects.only("user_id", "date", "actions")
+        for log in logs.iterator(chunk_size=batch_size):
+            if log.actions:
+                entries[(log.user_id, log.date)] = log.actions
+            if len(entries) >= batch_size:
+                count += cls.bulk_record(entries)
+                entries = {}
+        return count + (cls.bulk_record(entries) if entries else 0)
+
+    @staticmethod
+    def month_range(year: int, month: int):
+        start = timezone.make_aware(datetime.datetime(year, month, 1))
+        if month == 12:
+            end = timezone.make_aware(datetime.datetime(year + 1, 1, 1))
+        else:
+            end = timezone.make_aware(datetime.datetime(year, month + 1, 1))
+        return start, end
+
+    @classmethod
+    def archive_month(cls, year: int, month: int, directory: str, chunk_size=5000) -> int:
+        """
+        Export the events of a month to `activity_events_YYYY-MM.jsonl.gz` in
+        `directory` and delete them in chunks. The daily summaries
+        (AppActivityLog) are kept.
+
+        Uses the manifest of prevcad.audit_archive (rows, last id, cutoff and
+        sha256 per month), so an interrupted run or a month that receives rows
+        again (client resends) never duplicates or loses events.
+
+        Returns:
+            int: archived events.
+        """
+        from prevcad import audit_archive
+
+        start, end = cls.month_range(year, month)
+        key = audit_archive.month_key(year, month)
+        events = cls.objects.filter(timestamp__gte=start, timestamp__lt=end).select_related("action")
+        return audit_archive.archive_rows(
+            events, key, f"activity_events_{key}.jsonl.gz", cls.serialize, end, directory, chunk_size
+        )
+
+    @staticmethod
+    def serialize(event) -> dict:
+        return {"user": event.user_id, "timestamp": event.timestamp.isoformat(), "action": event.action.code}
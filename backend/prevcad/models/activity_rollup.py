@@ -0,0 +1,231 @@
+import datetime
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import models, transaction
+from django.db.models import Max, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .activity_event import ActivityEvent
+from .app_activity_log import AppActivityLog
+
+
+class ActivityRollup(models.Model):
+    """
+    Aggregated app usage for a day, week (starting on Monday) or month, kept up
+    to date incrementally by `update_activity_rollups`. Reports read these rows
+    instead of the per user-day JSON blobs.
+
+    Days are computed from the normalized ActivityEvent rows (and the totals
+    already stored in AppActivityLog); weeks and months are summed from their
+    day rows, so a run only reads the events of the days it touches.
+
+    `top_actions` groups the actions by the screen the user was on (the latest
+    "screen <name>" action of the day), e.g.
+    {"downloads": [["download", 12], ["reload", 3]], "-": [["login", 5]]}.
+    Day rows keep every action (they are the input of weeks and months); weeks
+    and months keep the TOP_ACTIONS_PER_SCREEN most frequent ones.
+    """
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    PERIOD_CHOICES = [
+        (DAY, "Día"),
+        (WEEK, "Semana"),
+        (MONTH, "Mes"),
+    ]
+    # Screen of the actions before the first "screen ..." action of the day
+    NO_SCREEN = "-"
+    TOP_ACTIONS_PER_SCREEN = 10
+    # Events are re-scanned this many ids behind the last processed one: ids are
+    # assigned on insert, so a transaction that commits late can add events
+    # with ids below the ones a previous run already processed
+    EVENT_ID_OVERLAP = 1000
+
+    class Meta:
+        verbose_name = "Resumen de Actividad"
+        verbose_name_plural = "Resúmenes de Actividad"
+        ordering = ["period", "-start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "start"], name="unique_activity_rollup_period"
+            )
+        ]
+
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES, verbose_name="Periodo")
+    start = models.DateField(verbose_name="Inicio")
+    active_users = models.IntegerField(default=0, verbose_name="Usuarios Activos")
+    n_entries = models.IntegerField(default=0, verbose_name="Número de Entradas")
+    n_logins = models.IntegerField(default=0, verbose_name="Número de Inicios de Sesión")
+    time_in_app = models.IntegerField(
+        default=0,
+        verbose_name="Tiempo en la Aplicación (segundos)",
+        help_text="Suma del tiempo en la aplicación de todos los usuarios",
+    )
+    top_actions = models.JSONField(
+        default=dict, blank=True, verbose_name="Acciones más frecuentes por pantalla"
+    )
+    source_updated = models.DateTimeField(
+        verbose_name="Actualizado",
+        help_text="Momento en que se calculó el resumen",
+    )
+    last_event = models.BigIntegerField(
+        default=0,
+        verbose_name="Último evento",
+        help_text="Mayor id de ActivityEvent incluido al calcular el resumen",
+    )
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.start}"
+
+    @property
+    def end(self) -> datetime.date:
+        return self.period_end(self.period, self.start)
+
+    @property
+    def time_in_app_per_user(self) -> int:
+        return self.time_in_app // self.active_users if self.active_users else 0
+
+    @classmethod
+    def period_start(cls, period: str, date: datetime.date) -> datetime.date:
+        if period == cls.WEEK:
+            return date - datetime.timedelta(days=date.weekday())
+        if period == cls.MONTH:
+            return date.replace(day=1)
+        return date
+
+    @classmethod
+    def period_end(cls, period: str, start: datetime.date) -> datetime.date:
+        """First day after the period."""
+        if period == cls.WEEK:
+            return start + datetime.timedelta(days=7)
+        if period == cls.MONTH:
+            return (start + datetime.timedelta(days=32)).replace(day=1)
+        return start + datetime.timedelta(days=1)
+
+    @classmethod
+    def count_screen_actions(cls, actions: Iterable[Tuple[object, str]], counts: Counter) -> None:
+        """
+        Count the (timestamp, action) pairs of a user-day, in timestamp order, by
+        (screen, action). Arguments after the first word are dropped
+        ("download 12" counts as "download").
+        """
+        screen = cls.NO_SCREEN
+        for _, action in actions:
+            name, _, argument = action.partition(" ")
+            if name == "screen":
+                screen = argument or cls.NO_SCREEN
+            elif name == "login":
+                screen = cls.NO_SCREEN
+            counts[(screen, name)] += 1
+
+    @classmethod
+    def group_counts(cls, counts: Counter, limit: Optional[int] = None) -> Dict:
+        """{screen: [[action, count], ...]} by decreasing count, up to `limit` per screen."""
+        by_screen = {}
+        for (screen, name), count in counts.items():
+            by_screen.setdefault(screen, []).append([name, count])
+        return {
+            screen: sorted(items, key=lambda item: (-item[1], item[0]))[:limit]
+            for screen, items in sorted(by_screen.items())
+        }
+
+    @staticmethod
+    def day_bounds(start: datetime.date, end: datetime.date):
+        """Aware datetimes of the first instant of `start` and of `end`."""
+        return ActivityEvent.to_datetime(start, "00:00:00"), ActivityEvent.to_datetime(end, "00:00:00")
+
+    @classmethod
+    def compute_day(cls, date: datetime.date) -> Dict:
+        """Aggregate the events of a day (totals come from the daily logs)."""
+        start, end = cls.day_bounds(date, date + datetime.timedelta(days=1))
+        events = (
+            ActivityEvent.objects.filter(timestamp__gte=start, timestamp__lt=end)
+            .order_by("user_id", "timestamp")
+            .values_list("user_id", "timestamp", "action__code")
+        )
+        users, counts = set(), Counter()
+        for user_id, rows in groupby(events.iterator(chunk_size=2000), key=itemgetter(0)):
+            users.add(user_id)
+            cls.count_screen_actions(((timestamp, code) for _, timestamp, code in rows), counts)
+
+        totals = AppActivityLog.objects.filter(date=date).aggregate(
+            n_entries=Coalesce(Sum("n_entries"), 0),
+            n_logins=Coalesce(Sum("n_logins"), 0),
+            time_in_app=Coalesce(Sum("time_in_app"), 0),
+        )
+        return {"active_users": len(users), "top_actions": cls.group_counts(counts), **totals}
+
+    @classmethod
+    def compute_from_days(cls, period: str, start: datetime.date) -> Dict:
+        """Sum the day rollups of a week or month (distinct users from the events)."""
+        end = cls.period_end(period, start)
+        counts = Counter()
+        totals = {"n_entries": 0, "n_logins": 0, "time_in_app": 0}
+        for day in cls.objects.filter(period=cls.DAY, start__gte=start, start__lt=end):
+            for field in totals:
+                totals[field] += getattr(day, field)
+            for screen, items in day.top_actions.items():
+                for name, count in items:
+                    counts[(screen, name)] += count
+        return {
+            "active_users": ActivityEvent.active_users(*cls.day_bounds(start, end)),
+            "top_actions": cls.group_counts(counts, cls.TOP_ACTIONS_PER_SCREEN),
+            **totals,
+        }
+
+    @classmethod
+    def watermark(cls):
+        """Moment of the latest update (None: no rollups)."""
+        return cls.objects.aggregate(Max("source_updated"))["source_updated__max"]
+
+    @classmethod
+    def last_event_id(cls) -> Optional[int]:
+        """Events with a greater id are not yet included (None: no rollups)."""
+        return cls.objects.aggregate(Max("last_event"))["last_event__max"]
+
+    @classmethod
+    def update_rollups(cls, full: bool = False) -> int:
+        """
+        Recompute the days with events newer than the last processed one (minus
+        EVENT_ID_OVERLAP; every day with `full` or on the first run), then their
+        weeks and months from the day rows.
+
+        Returns:
+            int: recomputed rollups.
+        """
+        now = timezone.now()
+        last_event = ActivityEvent.objects.aggregate(Max("id"))["id__max"] or 0
+        events = ActivityEvent.objects.filter(id__lte=last_event)
+        processed = None if full else cls.last_event_id()
+        if processed is not None:
+            events = events.filter(id__gt=processed - cls.EVENT_ID_OVERLAP)
+        days = sorted(
+            events.annotate(day=TruncDate("timestamp")).values_list("day", flat=True).order_by().distinct()
+        )
+        periods = sorted(
+            {(period, cls.period_start(period, day)) for day in days for period in (cls.WEEK, cls.MONTH)}
+        )
+
+        with transaction.atomic():
+            for day in days:
+                cls.objects.update_or_create(
+                    period=cls.DAY,
+                    start=day,
+                    defaults={**cls.compute_day(day), "source_updated": now, "last_event": last_event},
+                )
+            for period, start in periods:
+                cls.objects.update_or_create(
+                    period=period,
+                    start=start,
+                    defaults={
+                        **cls.compute_from_days(period, start),
+                        "source_updated": now,
+                        "last_event": last_event,
+                    },
+                )
+        return len(days) + len(periods)
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 import datetime
@@ -16,9 +16,15 @@ from typing import (
 )
 from pydantic import BaseModel, RootModel, Field, ValidationError, constr
 
+from .activity_event import ActivityEvent
+
 
 class AppActivityLog(models.Model):
-    """Modelo para registrar actividades en la aplicación"""
+    """
+    Modelo para registrar actividades en la aplicación: resumen diario por
+    usuario. Cada acción nueva se agrega también a ActivityEvent, la tabla de
+    eventos para consultas entre usuarios.
+    """
 
     class Meta:
         verbose_name = "Registro de Actividad en la Aplicación"
@@ -69,6 +75,13 @@ class AppActivityLog(models.Model):
         verbose_name="Tiempo en la Aplicación",
         help_text="Tiempo total en la aplicación",
     )
+    session_state = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Estado de Sesiones",
+        help_text="Totales acumulados para actualizar el resumen de forma incremental",
+    )
     updated_date = models.DateTimeField(auto_now=True)
     created_date = models.DateTimeField(auto_now_add=True)
 
@@ -93,13 +106,20 @@ class AppActivityLog(models.Model):
 
     Schema = SchemaGenerator.create_model()
 
-    def validate_schema(self, actions: Dict[str, str]):
+    @classmethod
+    def validate_schema(cls, actions: Dict[str, str]):
         """Validate the structure of the provided actions."""
         try:
-            self.Schema.model_validate(actions)
+            cls.Schema.model_validate(actions)
         except ValidationError as e:
             raise ValueError(f"Invalid actions structure: {e.errors()}")
 
+    @classmethod
+    def normalize_actions(cls, actions: Dict[str, str]) -> Dict[str, str]:
+        """Validate the actions and return them in lowercase."""
+        cls.validate_schema(actions)
+        return {k: v.lower() for k, v in actions.items()}
+
     def add_actions(self, new_actions: Dict[str, str]):
         """
         Add multiple actions to the log after schema validation.
@@ -107,18 +127,34 @@ class AppActivityLog(models.Model):
         Args:
             new_actions (Dict[str, str]): Dictionary of timestamped actions.
         """
-        self.validate_schema(new_actions)
-
         # Ensure all actions are lowercase
-        new_actions = {k: v.lower() for k, v in new_actions.items()}
+        new_actions = self.normalize_actions(new_actions)
 
         if not self.actions:
             self.actions = {}
+        # Actions already stored (a client resending after a lost response) are skipped
+        new_actions = {k: v for k, v in new_actions.items() if self.actions.get(k) != v}
+        if not new_actions and self.pk:
+            return
         # By using update, we can add new actions with different timestamps without altering the rest
         self.actions.update(new_actions)
         self.n_entries = len(self.actions)
-        self.update_summary()
-        self.save()
+        self.update_summary(new_actions)
+        with transaction.atomic():
+            self.save()
+            if new_actions:
+                ActivityEvent.bulk_record({(self.user_id, self.date): new_actions})
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """
+        Latest stored timestamp (HH:MM:SS) of the day, or None. Clients only need
+        to send actions that are not yet acknowledged by it.
+        """
+        state = self.session_state
+        if state and state.get("n") == len(self.actions or {}):
+            return state["max"]
+        return max(self.actions) if self.actions else None
 
     @classmethod
     def add_action_for_user(
@@ -136,45 +172,136 @@ class AppActivityLog(models.Model):
         instance.add_actions(actions)
         return instance
 
-    def update_summary(self):
-        """Update the summary fields based on the current actions."""
-
-        self.n_logins = sum(1 for action in self.actions.values() if action == "login")
-
-        # Estimate time_in_app with this simple logic:
-        # Assuming each login is the start of a session, let's count the time between a login
-        # and the last action before the next login (or the end of the day).
-        # This is a simplification and may not reflect actual time spent in the app.
-        time_in_app = 0  # In seconds
-        sorted_actions = sorted(self.actions.items())
-        session_start = None
-        previous_timestamp = None
-
-        def add_delta(start, end):
-            nonlocal time_in_app
-            start_dt = datetime.datetime.combine(datetime.date.today(), start)
-            end_dt = datetime.datetime.combine(datetime.date.today(), end)
-            session_duration = (end_dt - start_dt).total_seconds()
-            if session_duration > 0:
-                time_in_app += session_duration
-
-        for timestamp_str, action in sorted_actions:
-            timestamp = datetime.datetime.strptime(timestamp_str, "%H:%M:%S").time()
+    @classmethod
+    def bulk_add_actions(
+        cls, entries: Dict[tuple, Dict[str, str]]
+    ) -> List["AppActivityLog"]:
+        """
+        Merge already normalized actions into the logs of several users and dates
+        in one transaction: one query to load the existing logs, then one
+        bulk_create and one bulk_update.
+
+        Args:
+            entries: {(user_id, date): {timestamp: action}}
+
+        Actions are keyed by timestamp, so merging the same actions again leaves
+        the log unchanged. The new actions are appended to ActivityEvent in the
+        same transaction.
+        """
+        if not entries:
+            return []
+        now = timezone.now()
+        with transaction.atomic():
+            existing = {
+                (log.user_id, log.date): log
+                for log in cls.objects.select_for_update().filter(
+                    user_id__in={user_id for user_id, _ in entries},
+                    date__in={date for _, date in entries},
+                )
+            }
+            new_logs, updated_logs, events = [], [], {}
+            for (user_id, date), actions in entries.items():
+                log = existing.get((user_id, date))
+                if log is None:
+                    log = cls(user_id=user_id, date=date, actions={})
+                    new_logs.append(log)
+                else:
+                    actions = {k: v for k, v in actions.items() if (log.actions or {}).get(k) != v}
+                    if not actions:
+                        continue
+                    updated_logs.append(log)
+                events[(user_id, date)] = actions
+                log.actions = {**(log.actions or {}), **actions}
+                log.n_entries = len(log.actions)
+                log.update_summary(actions)
+                log.updated_date = now
+
+            cls.objects.bulk_create(new_logs)
+            cls.objects.bulk_update(
+                updated_logs,
+                [
+                    "actions",
+                    "n_entries",
+                    "n_logins",
+                    "time_in_app",
+                    "time_in_app_str",
+                    "session_state",
+                    "updated_date",
+                ],
+            )
+            ActivityEvent.bulk_record(events)
+        return new_logs + updated_logs
+
+    @staticmethod
+    def timestamp_seconds(timestamp: str) -> int:
+        """
+        Seconds since midnight of an HH:MM:SS timestamp. Like strptime, raises
+        ValueError for out-of-range fields (the schema only checks the digits).
+        """
+        hours, minutes, seconds = int(timestamp[0:2]), int(timestamp[3:5]), int(timestamp[6:8])
+        if hours > 23 or minutes > 59 or seconds > 59:
+            raise ValueError(f"time data {timestamp!r} does not match format '%H:%M:%S'")
+        return hours * 3600 + minutes * 60 + seconds
+
+    @classmethod
+    def advance_session_state(cls, state: Dict[str, Any], sorted_actions) -> None:
+        """
+        Advance the running session state with actions sorted by timestamp, all
+        later than the ones already counted.
+
+        Each login is the start of a session, which lasts until the last action
+        before the next login (or the last action of the day).
+        """
+        for timestamp, action in sorted_actions:
             if action == "login":
-                if session_start is not None and previous_timestamp is not None:
-                    add_delta(session_start, previous_timestamp)
+                state["logins"] += 1
+                if state["start"] is not None and state["last"] is not None:
+                    state["closed"] += max(
+                        0, cls.timestamp_seconds(state["last"]) - cls.timestamp_seconds(state["start"])
+                    )
                 # Register the start of a new session
-                session_start = timestamp
-                previous_timestamp = None
+                state["start"] = timestamp
+                state["last"] = None
             else:
-                previous_timestamp = timestamp
+                state["last"] = timestamp
+            state["max"] = timestamp
+            state["n"] += 1
+
+    def update_summary(self, new_actions: Optional[Dict[str, str]] = None):
+        """
+        Update the summary fields based on the current actions.
+
+        `session_state` keeps the running totals (logins, seconds of closed
+        sessions, open session and latest timestamp). When `new_actions`, already
+        merged into `actions`, are all later than the counted ones, only they are
+        applied to the state; otherwise (out of order timestamps, replaced
+        actions or no state yet) everything is recomputed from scratch.
+        """
+        state = self.session_state
+        incremental = (
+            new_actions
+            and state
+            and state.get("n") == len(self.actions) - len(new_actions)
+            and (state["max"] is None or min(new_actions) > state["max"])
+        )
+        if incremental:
+            state = dict(state)
+            self.advance_session_state(state, sorted(new_actions.items()))
+        else:
+            state = {"n": 0, "logins": 0, "closed": 0, "start": None, "last": None, "max": None}
+            self.advance_session_state(state, sorted(self.actions.items()))
 
         # Count the last session if it was not closed
-        if session_start is not None and previous_timestamp is not None:
-            add_delta(session_start, previous_timestamp)
+        time_in_app = state["closed"]
+        if state["start"] is not None and state["last"] is not None:
+            time_in_app += max(
+                0, self.timestamp_seconds(state["last"]) - self.timestamp_seconds(state["start"])
+            )
 
+        self.session_state = state
+        self.n_logins = state["logins"]
         # Now have a version in the form of "HH:MM:SS"
-        self.time_in_app = int(time_in_app)  # Convert to seconds
+        self.time_in_app = int(time_in_app)  # In seconds
         self.time_in_app_str = str(datetime.timedelta(seconds=time_in_app))
 
     def get_summary(self) -> Dict[str, Any]:
@@ -0,0 +1,42 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class CatalogVersion(models.Model):
+    """
+    Contador de versión de un catálogo completo (p. ej. las recomendaciones de
+    texto), para invalidar las copias en memoria de cada proceso: se incrementa
+    al modificar el catálogo y las copias se comparan con (version, updated_at).
+    `updated_at` distingue una versión repetida tras un rollback.
+    """
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="Catálogo")
+    version = models.PositiveIntegerField(default=0, verbose_name="Versión")
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Versión de Catálogo"
+        verbose_name_plural = "Versiones de Catálogo"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def current(cls, name):
+        """(version, updated_at) actual del catálogo; (0, None) si nunca cambió"""
+        row = cls.objects.filter(name=name).values_list("version", "updated_at").first()
+        return row or (0, None)
+
+    @classmethod
+    def bump(cls, name):
+        """Incrementa la versión del catálogo (en la transacción de quien llama)"""
+        now = timezone.now()
+        if cls.objects.filter(name=name).update(version=F("version") + 1, updated_at=now):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, version=1, updated_at=now)
+        except IntegrityError:
+            # Otro proceso creó el contador entretanto
+            cls.objects.filter(name=name).update(version=F("version") + 1, updated_at=now)
@@ -1,13 +1,17 @@
 from django.db import models
 from .activity_node import ActivityNodeDescription
 import base64
+import json
 import os
 from django.conf import settings
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from .user_types import UserTypes, ResourceType
 from django.core.exceptions import ValidationError
 from prevcad.utils import build_media_url
+from prevcad.template_cache import invalidate_template_fragment
+from prevcad.tracing import traced
+from prevcad.media_store import update_references
 
 class CategoryTemplate(models.Model):
   """
@@ -96,6 +100,19 @@ class CategoryTemplate(models.Model):
         verbose_name="Etiquetas de evaluación"
     )
 
+  updated_at = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        verbose_name="Última actualización"
+    )
+
+  # Se incrementa en cada guardado; invalida el caché de fragmentos (ver template_cache)
+  version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name="Versión"
+    )
+
   @property
   def available_roles(self):
         """Retorna lista de choices para roles disponibles"""
@@ -193,6 +210,31 @@ class CategoryTemplate(models.Model):
       print(f"Icon value: {self.icon}")
       return None
     
+  @staticmethod
+  def get_training_media_paths(training_form):
+    """Rutas de media (media_url) de los nodos de entrenamiento"""
+    if isinstance(training_form, str):
+      # update_training_form del admin guarda el formulario como string JSON
+      try:
+        training_form = json.loads(training_form)
+      except ValueError:
+        return []
+    if not isinstance(training_form, dict):
+      return []
+    return [
+      node['media_url'] for node in training_form.get('training_nodes', [])
+      if isinstance(node, dict) and isinstance(node.get('media_url'), str)
+    ]
+
+  @classmethod
+  def from_db(cls, db, field_names, values):
+    instance = super().from_db(db, field_names, values)
+    # Rutas referenciadas al cargar, para ajustar referencias al guardar
+    if 'training_form' in instance.__dict__:
+      instance._loaded_media_paths = cls.get_training_media_paths(instance.training_form)
+    return instance
+
+  @traced('CategoryTemplate.get_ordered_training_nodes')
   def get_ordered_training_nodes(self, request=None):
     """Retorna los nodos de entrenamiento ordenados"""
     from prevcad.serializers.activity_node_serializer import ActivityNodeSerializer
@@ -205,16 +247,28 @@ class CategoryTemplate(models.Model):
     
     for i, node in enumerate(nodes):
         node_serializer = ActivityNodeSerializer(node, context={'request': request})
-        print('node_serializer.data',node_serializer.data)
         serialized_nodes.append(node_serializer.data)
 
     return serialized_nodes
 
   def save(self, *args, **kwargs):
     is_new = self.pk is None
+
+    if not is_new:
+        self.version = models.F('version') + 1
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+
     super().save(*args, **kwargs)
+    invalidate_template_fragment(self.pk)
+
+    if kwargs.get('update_fields') is None or 'training_form' in kwargs['update_fields']:
+      media_paths = self.get_training_media_paths(self.training_form)
+      update_references(getattr(self, '_loaded_media_paths', []), media_paths)
+      self._loaded_media_paths = media_paths
     
     if not is_new:
+        self.refresh_from_db(fields=['version'])
         # Actualizar editores en instancias existentes
         self.update_instance_editors()
 
@@ -237,10 +291,9 @@ class CategoryTemplate(models.Model):
     # Verificar si el usuario pertenece a algún grupo con permiso
     return user.groups.filter(id__in=self.editable_by_groups.all()).exists()
 
+  @traced('CategoryTemplate.get_question_nodes')
   def get_question_nodes(self):
     """Obtener los nodos de preguntas según el tipo de evaluación"""
-    print(f"Obteniendo nodos para template: {self.name}")  # Debug
-    
     if self.evaluation_type == 'PROFESSIONAL':
       nodes = [
         {
@@ -256,7 +309,6 @@ class CategoryTemplate(models.Model):
           'required': True
         }
       ]
-      print("Nodos profesionales:", nodes)  # Debug
       return nodes
       
     # Para autoevaluación
@@ -279,5 +331,7 @@ class CategoryTemplateEditor(models.Model):
         unique_together = ['template', 'user']
 
 
-
-
+@receiver(post_delete, sender=CategoryTemplate)
+def release_training_media(sender, instance, **kwargs):
+    """Libera la media de entrenamiento de un template eliminado"""
+    update_references(getattr(instance, '_loaded_media_paths', []), [])
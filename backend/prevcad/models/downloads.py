@@ -112,6 +112,26 @@ class DownloadByUser(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.content.title}"
 
+    @classmethod
+    def register_download(
+        cls, user: User, content, downloaded: bool = False, download_date=None
+    ) -> "DownloadByUser":
+        """
+        Get or create the download of `content` (instance or id) for the user and
+        update its state.
+        If it is marked as downloaded without a date, the current time is used.
+        """
+        if downloaded and not download_date:
+            download_date = timezone.now()
+
+        instance, created = cls.objects.get_or_create(
+            user=user, content_id=getattr(content, "pk", content)
+        )
+        instance.downloaded = downloaded
+        instance.download_date = download_date
+        instance.save()
+        return instance
+
     @classmethod
     def get_all_downloads_for_user(cls, user: User) -> List["DownloadByUser"]:
         """
@@ -1,6 +1,23 @@
-from django.db import models
+import hashlib
+import json
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
+from prevcad.evaluation_history import form_state, merge_patch
+from prevcad.media_store import update_references
+
+
+class EvaluationFormConflict(Exception):
+    """El formulario cambió desde la versión que leyó el cliente"""
+
+    def __init__(self, current_version):
+        super().__init__(f"El formulario fue modificado (versión actual {current_version})")
+        self.current_version = current_version
+
+
 class QuestionNode(models.Model):
     evaluation_form = models.ForeignKey(
         'EvaluationForm',
@@ -16,6 +33,51 @@ class QuestionNode(models.Model):
     class Meta:
         ordering = ['order']
 
+class QuestionNodesSnapshot(models.Model):
+    """
+    Copia inmutable de los nodos de preguntas de un template, identificada por el
+    hash de su contenido. Todos los formularios creados con los mismos nodos
+    apuntan a la misma fila en vez de guardar su propia copia.
+    """
+    content_hash = models.CharField(max_length=64, unique=True, editable=False)
+    question_nodes = models.JSONField(editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Versión de Preguntas"
+        verbose_name_plural = "Versiones de Preguntas"
+
+    def __str__(self):
+        return f"Preguntas {self.content_hash[:12]}"
+
+    @staticmethod
+    def compute_hash(question_nodes):
+        """SHA-256 del JSON canónico (claves ordenadas, sin espacios)"""
+        canonical = json.dumps(question_nodes, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_for_nodes(cls, question_nodes):
+        """Retorna (creándola si no existe) la versión con exactamente estos nodos"""
+        if question_nodes is None:
+            return None
+        snapshot, _ = cls.objects.get_or_create(
+            content_hash=cls.compute_hash(question_nodes),
+            defaults={'question_nodes': question_nodes}
+        )
+        return snapshot
+
+    @classmethod
+    def get_for_template(cls, template):
+        """Versión de los nodos de preguntas actuales del template"""
+        evaluation_form = template.evaluation_form if template else None
+        return cls.get_for_nodes((evaluation_form or {}).get('question_nodes', []))
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Las versiones de preguntas son inmutables")
+        super().save(*args, **kwargs)
+
 class EvaluationForm(models.Model):
     health_category = models.OneToOneField(
         'HealthCategory', 
@@ -44,7 +106,23 @@ class EvaluationForm(models.Model):
     updated_at = models.DateTimeField(
         auto_now=True
     )
-    question_nodes = models.JSONField(null=True, blank=True)
+    question_nodes_snapshot = models.ForeignKey(
+        QuestionNodesSnapshot,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='evaluation_forms',
+        help_text="Nodos de preguntas con que se creó el formulario"
+    )
+    # Se incrementa en cada guardado; control de concurrencia optimista (ver apply_patch)
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name="Versión"
+    )
+
+    # Campos JSON que se pueden modificar por nodo con apply_patch
+    PATCHABLE_FIELDS = ('responses', 'professional_responses')
 
     class Meta:
         db_table = 'prevcad_evaluation_form'
@@ -52,6 +130,17 @@ class EvaluationForm(models.Model):
     def __str__(self):
         return f"Evaluación para {self.health_category}"
 
+    @property
+    def question_nodes(self):
+        """Nodos de preguntas del formulario (compartidos, solo lectura)"""
+        if self.question_nodes_snapshot_id is None:
+            return None
+        return self.question_nodes_snapshot.question_nodes
+
+    @question_nodes.setter
+    def question_nodes(self, value):
+        self.question_nodes_snapshot = QuestionNodesSnapshot.get_for_nodes(value)
+
     def get_or_create_question_nodes(self):
         """Obtiene o crea los nodos de preguntas para la evaluación"""
         if not self.question_nodes:
@@ -88,14 +177,111 @@ class EvaluationForm(models.Model):
             print(f"question_nodes: {self.question_nodes}")
             return []
 
+    @staticmethod
+    def get_media_paths(responses):
+        """Rutas de las imágenes guardadas en respuestas IMAGE_QUESTION"""
+        paths = []
+        for response in (responses or {}).values():
+            if isinstance(response, dict) and response.get('type') == 'IMAGE_QUESTION':
+                answer = response.get('answer')
+                if isinstance(answer, list):
+                    paths.extend(
+                        image['path'] for image in answer
+                        if isinstance(image, dict) and image.get('path')
+                    )
+        return paths
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rutas referenciadas al cargar, para ajustar referencias al guardar
+        if 'responses' in instance.__dict__:
+            instance._loaded_media_paths = cls.get_media_paths(instance.responses)
+        return instance
+
+    def sync_media_references(self):
+        """Actualiza las referencias a blobs según las imágenes de `responses`"""
+        media_paths = self.get_media_paths(self.responses)
+        update_references(getattr(self, '_loaded_media_paths', []), media_paths)
+        self._loaded_media_paths = media_paths
+
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+
+        if not is_new:
+            self.version = models.F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+
         super().save(*args, **kwargs)
-        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'responses' in update_fields:
+            self.sync_media_references()
+
+        if not is_new:
+            self.refresh_from_db(fields=['version'])
+        if update_fields is None or {'responses', 'professional_responses'} & set(update_fields):
+            self.record_history()
+
         if is_new:
             # Crear nodos de preguntas al crear el formulario
             self.get_or_create_question_nodes() 
 
+    def apply_patch(self, patch, expected_version, **fields):
+        """
+        Aplica cambios por nodo a `responses` y/o `professional_responses` con
+        merge_patch, solo si el formulario sigue en `expected_version`.
+
+        Args:
+            patch (dict): {campo: {node_id: valor | None}} con campos de PATCHABLE_FIELDS.
+            expected_version (int): versión sobre la que el cliente hizo los cambios.
+            **fields: otros campos a escribir en el mismo UPDATE (is_draft, completed_date).
+
+        Raises:
+            EvaluationFormConflict: si otro guardado cambió el formulario.
+
+        La escritura es un UPDATE condicionado a la versión, así que dos guardados
+        concurrentes no se pisan: el segundo recibe el conflicto.
+        """
+        patched = [field for field in self.PATCHABLE_FIELDS if field in patch]
+        forms = EvaluationForm.objects.filter(pk=self.pk)
+
+        with transaction.atomic():
+            current = forms.values('version', *self.PATCHABLE_FIELDS).get()
+            if current['version'] != expected_version:
+                raise EvaluationFormConflict(current['version'])
+
+            values = {field: merge_patch(current[field] or {}, patch[field]) for field in patched}
+            values.update(fields)
+            now = timezone.now()
+            updated = forms.filter(version=expected_version).update(
+                version=models.F('version') + 1,
+                updated_at=now,
+                **values
+            )
+            if not updated:
+                raise EvaluationFormConflict(forms.values_list('version', flat=True).get())
+
+            if 'responses' in values:
+                media_paths = self.get_media_paths(values['responses'])
+                update_references(self.get_media_paths(current['responses']), media_paths)
+                self._loaded_media_paths = media_paths
+
+            for field in self.PATCHABLE_FIELDS:
+                setattr(self, field, values.get(field, current[field]))
+            for field, value in fields.items():
+                setattr(self, field, value)
+            self.version = expected_version + 1
+            self.updated_at = now
+            self.record_history()
+
+    def record_history(self):
+        """Agrega el estado actual al historial de la categoría (si cambió)"""
+        from .health_category import HealthCategory
+        HealthCategory.append_evaluation_history([
+            (self.health_category_id, form_state(self), self.version, None)
+        ])
+
     def save_professional_response(self, data):
         """
         Guarda una respuesta profesional con el formato correcto
@@ -122,4 +308,10 @@ class EvaluationForm(models.Model):
             'diagnosis': self.professional_responses.get('diagnosis', ''),
             'professional_name': self.professional_responses.get('professional_name', ''),
             'evaluation_date': self.completed_date
-        } 
\ No newline at end of file
+        }
+
+
+@receiver(post_delete, sender=EvaluationForm)
+def release_evaluation_media(sender, instance, **kwargs):
+    """Libera las imágenes de las respuestas de un formulario eliminado"""
+    update_references(getattr(instance, '_loaded_media_paths', []), [])
@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from .user_profile import UserProfile
 from .category_template import CategoryTemplate
-from .evaluation import EvaluationForm
+from .evaluation import EvaluationForm, QuestionNodesSnapshot
+from prevcad.media_store import update_references
+from prevcad import evaluation_history
 from .recommendation import Recommendation
 
 from django.db.models.signals import post_save, pre_delete
@@ -20,6 +22,23 @@ class HealthCategoryEditor(models.Model):
         verbose_name_plural = "Editores de Categoría de Salud"
         unique_together = ('health_category', 'editor')
 
+class HealthCategoryTombstone(models.Model):
+    """
+    Registro de una categoría eliminada junto con su template, para que la
+    sincronización incremental (?since=) pueda informar la eliminación al cliente.
+    """
+    user = models.ForeignKey('UserProfile', on_delete=models.CASCADE, related_name='category_tombstones')
+    category_id = models.BigIntegerField()
+    template_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Categoría de Salud Eliminada"
+        verbose_name_plural = "Categorías de Salud Eliminadas"
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
 class HealthCategory(models.Model):
     # Campos que siempre son readonly
     class Meta:
@@ -46,6 +65,7 @@ class HealthCategory(models.Model):
         related_name='editable_categories',
         blank=True
     )
+    # Append-only: solo lo escribe append_evaluation_history (ver prevcad.evaluation_history)
     evaluation_history = models.JSONField(default=list)
  
 
@@ -103,7 +123,7 @@ class HealthCategory(models.Model):
         if not hasattr(self, 'evaluation_form'):
             self.evaluation_form = EvaluationForm.objects.create(
                 health_category=self,
-                question_nodes=self.template.evaluation_form if self.template else {}
+                question_nodes_snapshot=QuestionNodesSnapshot.get_for_template(self.template)
             )
         
         if responses is not None:
@@ -237,6 +257,121 @@ class HealthCategory(models.Model):
                 is_draft=True
             )
 
+    def get_evaluation_form_or_none(self):
+        """
+        Obtiene el formulario de evaluación existente sin crearlo (lectura pura)
+        """
+        try:
+            return self.evaluation_form
+        except EvaluationForm.DoesNotExist:
+            return None
+
+    def get_recommendation_or_none(self):
+        """
+        Obtiene la recomendación existente sin crearla (lectura pura)
+        """
+        try:
+            return self.recommendation
+        except Recommendation.DoesNotExist:
+            return None
+
+    @classmethod
+    def get_categories_for_listing(cls, user):
+        """
+        Retorna las categorías del usuario con template, formulario de evaluación
+        y recomendación cargados en una sola consulta, para serializar en modo lista.
+        """
+        return (
+            cls.objects.filter(user__user=user, template__isnull=False)
+            .select_related("template", "evaluation_form", "recommendation")
+            .order_by("id")
+        )
+
+    @classmethod
+    def get_categories_changed_since(cls, user, since):
+        """
+        Categorías del usuario creadas o cuyo formulario, recomendación o template
+        cambiaron después de `since`, cargadas igual que en el listado.
+        """
+        return cls.get_categories_for_listing(user).filter(
+            models.Q(created_at__gt=since)
+            | models.Q(evaluation_form__updated_at__gt=since)
+            | models.Q(recommendation__updated_at__gt=since)
+            | models.Q(template__updated_at__gt=since)
+        )
+
+    @classmethod
+    def bulk_save_evaluation_responses(cls, entries):
+        """
+        Guarda las respuestas de varias categorías en una sola transacción.
+
+        Args:
+            entries (list): pares (categoría, respuestas). Las categorías deben venir
+                con evaluation_form y recommendation precargados (select_related).
+
+        Igual que save_evaluation_responses, marca cada formulario como completado y
+        su recomendación (si existe) como no borrador. Los formularios faltantes se
+        crean con bulk_create y el resto se actualiza con bulk_update.
+        """
+        now = timezone.now()
+        snapshots = {}
+        new_forms, forms, recommendations = [], [], []
+        history_changes = []
+
+        with transaction.atomic():
+            for category, responses in entries:
+                evaluation_form = category.get_evaluation_form_or_none()
+                if evaluation_form is None:
+                    if category.template_id not in snapshots:
+                        snapshots[category.template_id] = QuestionNodesSnapshot.get_for_template(category.template)
+                    evaluation_form = EvaluationForm(
+                        health_category=category,
+                        question_nodes_snapshot=snapshots[category.template_id]
+                    )
+                    new_forms.append(evaluation_form)
+                else:
+                    # bulk_update tampoco aplica el incremento de versión de save()
+                    history_changes.append((category.pk, evaluation_form.version + 1))
+                    evaluation_form.version = models.F('version') + 1
+                    forms.append(evaluation_form)
+
+                evaluation_form.responses = responses
+                evaluation_form.completed_date = now
+                evaluation_form.is_draft = False
+                # bulk_update no aplica auto_now
+                evaluation_form.updated_at = now
+
+                recommendation = category.get_recommendation_or_none()
+                if recommendation is not None:
+                    recommendation.is_draft = False
+                    recommendation.updated_at = now
+                    recommendations.append(recommendation)
+
+            EvaluationForm.objects.bulk_create(new_forms)
+            EvaluationForm.objects.bulk_update(
+                forms, ['responses', 'completed_date', 'is_draft', 'updated_at', 'version']
+            )
+            Recommendation.objects.bulk_update(recommendations, ['is_draft', 'updated_at'])
+
+            # bulk_* no pasa por EvaluationForm.save: ajustar aquí las referencias
+            old_media, new_media = [], []
+            for evaluation_form in new_forms + forms:
+                old_media.extend(getattr(evaluation_form, '_loaded_media_paths', []))
+                evaluation_form._loaded_media_paths = EvaluationForm.get_media_paths(evaluation_form.responses)
+                new_media.extend(evaluation_form._loaded_media_paths)
+            update_references(old_media, new_media)
+
+            versions = dict(history_changes)
+            HealthCategory.append_evaluation_history([
+                (
+                    evaluation_form.health_category_id,
+                    evaluation_history.form_state(evaluation_form),
+                    versions.get(evaluation_form.health_category_id, 1),
+                    None,
+                )
+                for evaluation_form in new_forms + forms
+            ])
+
     def get_or_create_evaluation_form(self):
         """
         Obtiene el formulario de evaluación existente o crea uno nuevo si no existe
@@ -246,11 +381,77 @@ class HealthCategory(models.Model):
         except EvaluationForm.DoesNotExist:
             return EvaluationForm.objects.create(
                 health_category=self,
-                question_nodes=self.template.evaluation_form if self.template else {}
+                question_nodes_snapshot=QuestionNodesSnapshot.get_for_template(self.template)
             )
 
+    @classmethod
+    def append_evaluation_history(cls, changes):
+        """
+        Agrega una entrada al historial de cada categoría, en una transacción.
+
+        Args:
+            changes (list): tuplas (category_id, estado, versión, color) según
+                evaluation_history.build_entry; estado None si las respuestas no
+                cambiaron y color None si no se conoce.
+        """
+        if not changes:
+            return
+        with transaction.atomic():
+            histories = dict(
+                cls.objects.select_for_update()
+                .filter(pk__in={category_id for category_id, *_ in changes})
+                .values_list('id', 'evaluation_history')
+            )
+            updated = {}
+            for category_id, state, version, status_color in changes:
+                history = histories.get(category_id)
+                if history is None:
+                    history = histories[category_id] = []
+                entry = evaluation_history.build_entry(history, state, version, status_color)
+                if entry is not None:
+                    history.append(entry)
+                    updated[category_id] = cls(id=category_id, evaluation_history=history)
+            cls.objects.bulk_update(updated.values(), ['evaluation_history'])
+
+    def record_evaluation_history(self, evaluation_form=None, status_color=None):
+        """Registra en el historial el estado actual del formulario y/o el color"""
+        HealthCategory.append_evaluation_history([(
+            self.pk,
+            evaluation_history.form_state(evaluation_form) if evaluation_form else None,
+            evaluation_form.version if evaluation_form else None,
+            status_color,
+        )])
+
+    def get_evaluation_version(self, version):
+        """
+        Estado de las respuestas en la versión `version` del formulario, o None si
+        el historial no la registra.
+        """
+        history = HealthCategory.objects.values_list('evaluation_history', flat=True).get(pk=self.pk) or []
+        index = evaluation_history.find_version(history, version)
+        if index is None:
+            return None
+        return {
+            'version': version,
+            'at': history[index]['at'],
+            'status_color': evaluation_history.status_color_at(history, index),
+            **evaluation_history.reconstruct(history, index),
+        }
+
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+        if (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            # Una instancia cargada antes de un cambio no debe pisar el historial.
+            # Solo aplica a instancias ya guardadas: una creación (incluso con pk
+            # asignado o force_insert) debe insertar la fila completa
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'evaluation_history'
+            ]
         super().save(*args, **kwargs)
         
         
@@ -307,4 +508,9 @@ def create_health_categories_for_template(sender, instance, created, **kwargs):
 @receiver(pre_delete, sender=CategoryTemplate)
 def delete_related_health_categories(sender, instance, **kwargs):
     """Eliminar todas las categorías de salud asociadas cuando se elimina un template"""
-    HealthCategory.objects.filter(template=instance).delete()
\ No newline at end of file
+    categories = HealthCategory.objects.filter(template=instance)
+    HealthCategoryTombstone.objects.bulk_create([
+        HealthCategoryTombstone(user_id=user_id, category_id=category_id, template_id=instance.pk)
+        for category_id, user_id in categories.values_list('id', 'user_id')
+    ])
+    categories.delete()
\ No newline at end of file
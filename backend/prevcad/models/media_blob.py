@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class MediaBlob(models.Model):
+    """
+    Archivo guardado una sola vez según el hash de su contenido (ver
+    prevcad.media_store). `ref_count` cuenta las referencias desde modelos y
+    campos JSON; los blobs sin referencias los elimina `collect_media_blobs`.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    path = models.CharField(max_length=255, unique=True, verbose_name="Ruta")
+    size = models.PositiveBigIntegerField(verbose_name="Tamaño")
+    ref_count = models.IntegerField(default=0, verbose_name="Referencias")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Archivo Compartido"
+        verbose_name_plural = "Archivos Compartidos"
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.path} ({self.ref_count} referencias)"
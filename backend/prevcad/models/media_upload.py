@@ -0,0 +1,147 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from prevcad.media_store import store_file
+
+
+class MediaUpload(models.Model):
+    """
+    Subida por partes (reanudable) de una imagen. Las partes se escriben en disco
+    a medida que llegan, en un archivo temporal fuera de MEDIA_ROOT; al adjuntarla
+    a una respuesta el archivo pasa al almacén de media (prevcad.media_store).
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendiente"),
+        ("RECEIVING", "Recibiendo parte"),
+        ("COMPLETE", "Completa"),
+        ("ATTACHED", "Adjuntada"),
+    ]
+
+    # Tamaño de bloque al copiar el cuerpo del request al archivo temporal
+    COPY_BUFFER_SIZE = 64 * 1024
+    # Una parte reclamada sin terminar (p. ej. el proceso murió) se libera tras este plazo
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        "UserProfile",
+        on_delete=models.CASCADE,
+        related_name="media_uploads",
+        verbose_name="Usuario",
+    )
+    filename = models.CharField(max_length=255, verbose_name="Nombre de archivo")
+    content_type = models.CharField(max_length=100, blank=True, verbose_name="Tipo")
+    size = models.PositiveBigIntegerField(verbose_name="Tamaño total")
+    received = models.PositiveBigIntegerField(default=0, verbose_name="Bytes recibidos")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="PENDING", verbose_name="Estado"
+    )
+    file_path = models.CharField(
+        max_length=500, blank=True, verbose_name="Ruta definitiva"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Subida de Imagen"
+        verbose_name_plural = "Subidas de Imágenes"
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    @property
+    def extension(self):
+        ext = os.path.splitext(self.filename)[1].lstrip(".").lower()
+        return ext or "jpg"
+
+    def append_chunk(self, stream, offset, length):
+        """
+        Escribe `length` bytes de `stream` a partir de `offset` sin cargarlos en memoria.
+
+        Returns:
+            bool: False si `offset` no coincide con los bytes ya recibidos o si otra
+            petición está escribiendo esa parte (el cliente debe consultar el offset
+            actual y reanudar desde ahí).
+        """
+        # Primero se reclama el offset: solo una petición puede escribir a partir de él
+        now = timezone.now()
+        claimable = Q(status="PENDING") | Q(
+            status="RECEIVING", updated_at__lt=now - self.CLAIM_TIMEOUT
+        )
+        claimed = (
+            MediaUpload.objects.filter(claimable, pk=self.pk, received=offset)
+            .update(status="RECEIVING", updated_at=now)
+        )
+        if not claimed:
+            return False
+
+        written = 0
+        try:
+            os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+            with open(self.temp_path, "r+b" if offset else "wb") as temp_file:
+                temp_file.seek(offset)
+                while written < length:
+                    data = stream.read(min(self.COPY_BUFFER_SIZE, length - written))
+                    if not data:
+                        break
+                    temp_file.write(data)
+                    written += len(data)
+                temp_file.truncate()
+        finally:
+            # Se libera el reclamo con lo efectivamente escrito, aunque la lectura falle
+            MediaUpload.objects.filter(pk=self.pk, status="RECEIVING").update(
+                received=offset + written,
+                status="COMPLETE" if offset + written >= self.size else "PENDING",
+                updated_at=timezone.now(),
+            )
+        self.refresh_from_db(fields=["received", "status", "updated_at"])
+        return True
+
+    def attach(self):
+        """
+        Mueve la subida completa al almacén de media y la marca como adjuntada.
+
+        Returns:
+            tuple: (ruta del blob, True si el contenido no existía)
+        """
+        if self.status != "COMPLETE":
+            raise ValueError("La subida no está completa")
+
+        with open(self.temp_path, "rb") as temp_file:
+            saved_path, created = store_file(File(temp_file), self.extension)
+        os.remove(self.temp_path)
+
+        self.file_path = saved_path
+        self.status = "ATTACHED"
+        self.save(update_fields=["file_path", "status", "updated_at"])
+        return saved_path, created
+
+    @classmethod
+    def cleanup_expired(cls, max_age=timedelta(days=1)):
+        """Elimina las subidas no adjuntadas sin actividad desde hace `max_age`"""
+        expired = cls.objects.filter(
+            status__in=["PENDING", "RECEIVING", "COMPLETE"],
+            updated_at__lt=timezone.now() - max_age,
+        )
+        count = 0
+        for upload in expired.iterator():
+            if os.path.exists(upload.temp_path):
+                os.remove(upload.temp_path)
+            upload.delete()
+            count += 1
+        return count
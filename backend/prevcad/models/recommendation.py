@@ -50,9 +50,11 @@ class Recommendation(models.Model):
             self.status_color = 'gris'
             
         # Si hay un nuevo video y ya existe uno, eliminar el anterior
+        previous_color = None
         if self.pk:
             try:
                 old_instance = Recommendation.objects.get(pk=self.pk)
+                previous_color = old_instance.status_color
                 if old_instance.video and self.video != old_instance.video:
                     old_instance.video.delete(save=False)
             except Recommendation.DoesNotExist:
@@ -60,6 +62,10 @@ class Recommendation(models.Model):
                 
         super().save(*args, **kwargs)
 
+        # Registrar el cambio de color en el historial de la evaluación
+        if self.status_color != (previous_color or 'gris'):
+            self.health_category.record_evaluation_history(status_color=self.status_color)
+
     def delete(self, *args, **kwargs):
         # Eliminar el archivo de video cuando se elimina la recomendación
         if self.video:
@@ -0,0 +1,141 @@
+import random
+from array import array
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Max
+
+
+class RecommendationRotation(models.Model):
+    """
+    Rotación de recomendaciones de un usuario: una permutación aleatoria de los
+    ids del catálogo (TextRecomendation) y un cursor. Cada lista entrega los
+    siguientes ids desde el cursor, así que no se repiten hasta recorrer todo
+    el catálogo; al terminar se baraja de nuevo.
+
+    La permutación se guarda empaquetada (4 bytes por id) y se actualiza cuando
+    cambia el catálogo, conservando lo ya mostrado y el orden pendiente.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recommendation_rotation",
+        verbose_name="Usuario",
+    )
+    order = models.BinaryField(default=bytes, verbose_name="Permutación")
+    cursor = models.PositiveIntegerField(default=0, verbose_name="Cursor")
+    catalog_signature = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        verbose_name="Versión del catálogo",
+        help_text="Catálogo con el que se armó la permutación",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rotación de Recomendaciones"
+        verbose_name_plural = "Rotaciones de Recomendaciones"
+
+    def __str__(self):
+        return f"{self.user_id} ({self.cursor}/{len(self.ids)})"
+
+    @property
+    def ids(self):
+        ids = array("I")
+        ids.frombytes(bytes(self.order))
+        return ids
+
+    @ids.setter
+    def ids(self, ids):
+        self.order = array("I", ids).tobytes()
+
+    @classmethod
+    def catalog_signature_for(cls):
+        """Firma barata del catálogo (cantidad e id máximo): cambia al agregar o eliminar"""
+        from .text_recomendation import TextRecomendation
+
+        stats = TextRecomendation.objects.aggregate(count=Count("id"), max_id=Max("id"))
+        return f"{stats['count']}:{stats['max_id'] or 0}"
+
+    @classmethod
+    def catalog_ids(cls):
+        from .text_recomendation import TextRecomendation
+
+        return list(TextRecomendation.objects.values_list("id", flat=True))
+
+    def resync(self, catalog_ids, signature):
+        """
+        Ajusta la permutación al catálogo: quita los ids eliminados y reparte los
+        nuevos al azar entre los pendientes.
+        """
+        catalog = set(catalog_ids)
+        current = self.ids
+        shown = [i for i in current[: self.cursor] if i in catalog]
+        pending = [i for i in current[self.cursor :] if i in catalog]
+        for new_id in catalog.difference(current):
+            pending.insert(random.randint(0, len(pending)), new_id)
+        self.ids = shown + pending
+        self.cursor = len(shown)
+        self.catalog_signature = signature
+
+    def advance(self, size, exclude=()):
+        """
+        Toma hasta `size` ids desde el cursor, saltando los de `exclude`. Solo se
+        baraja al comenzar una lista: si quedan menos de `size` pendientes, estos
+        pasan al inicio de la nueva vuelta, seguidos de los ya mostrados en otro
+        orden, así ningún id se pierde ni se repite dentro de la lista.
+
+        Los ids de `exclude` también consumen su posición, por lo que la lista
+        puede tener menos de `size` ids si excluye gran parte del catálogo.
+        """
+        ids = self.ids
+        if len(ids) - self.cursor < size:
+            shown = list(ids[: self.cursor])
+            random.shuffle(shown)
+            ids = array("I", list(ids[self.cursor :]) + shown)
+            self.ids = ids
+            self.cursor = 0
+        picked = []
+        while self.cursor < len(ids) and len(picked) < size:
+            current = ids[self.cursor]
+            self.cursor += 1
+            if current not in exclude:
+                picked.append(current)
+        return picked
+
+    @classmethod
+    def next_batch(cls, user, size=10, exclude=(), catalog=None):
+        """
+        Siguientes `size` ids de recomendaciones para el usuario.
+
+        Con `catalog` (prevcad.recommendation_catalog) la firma es la versión del
+        catálogo y los ids se toman de memoria, sin consultar TextRecomendation.
+
+        Returns:
+            list: ids en el orden de la rotación.
+        """
+        if catalog is not None:
+            version, updated_at = catalog.version
+            # Sin contador (catálogo nunca modificado) la versión es (0, None)
+            signature = f"v{version}:{updated_at.timestamp():.6f}" if updated_at else f"v{version}"
+        else:
+            signature = cls.catalog_signature_for()
+        with transaction.atomic():
+            rotation, _ = cls.objects.select_for_update().get_or_create(user=user)
+            fields = []
+            if rotation.catalog_signature != signature:
+                ids = catalog.ids if catalog is not None else cls.catalog_ids()
+                rotation.resync(ids, signature)
+                fields += ["catalog_signature", "order"]
+            previous = (rotation.cursor, bytes(rotation.order))
+            picked = rotation.advance(size, set(exclude))
+            if rotation.cursor != previous[0]:
+                fields += ["cursor"]
+            if bytes(rotation.order) != previous[1] and "order" not in fields:
+                fields += ["order"]
+            # Sin cambios (p. ej. catálogo vacío) no se escribe la fila
+            if fields:
+                rotation.save(update_fields=fields + ["updated_at"])
+        return picked
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class SyncOperation(models.Model):
+    """
+    Operación aplicada por el endpoint de sincronización (prevcad.sync), guardada
+    con la clave de idempotencia generada por la app: si el cliente reenvía la
+    operación se responde el mismo resultado sin volver a aplicarla.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="sync_operations",
+        verbose_name="Usuario",
+    )
+    key = models.CharField(max_length=100, verbose_name="Clave de idempotencia")
+    op_type = models.CharField(max_length=50, verbose_name="Tipo")
+    result = models.JSONField(default=dict, blank=True, verbose_name="Resultado")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Operación Sincronizada"
+        verbose_name_plural = "Operaciones Sincronizadas"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_user_sync_operation_key"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.op_type} {self.key}"
+
+    @classmethod
+    def cleanup_expired(cls, max_age=timedelta(days=30)):
+        """Elimina las claves más antiguas que `max_age` (ya no se reintentarán)"""
+        deleted, _ = cls.objects.filter(
+            created_at__lt=timezone.now() - max_age
+        ).delete()
+        return deleted
@@ -1,9 +1,16 @@
 from typing import Any
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.encoding import smart_str
 
+from .catalog_version import CatalogVersion
+
 
 class TextRecomendation(models.Model):
+    # Nombre del contador de versión del catálogo (ver prevcad.recommendation_catalog)
+    CATALOG = 'text_recomendation'
+
     theme = models.CharField(max_length=100, default='')  # theme (Templado)
     category = models.CharField(max_length=100, default='')  # Categoría
     sub_category = models.CharField(max_length=100, blank=True, null=True, default='')  # Sub-categoría
@@ -36,3 +43,10 @@ class TextRecomendation(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['sub_category']),
         ]
+
+
+@receiver(post_save, sender=TextRecomendation)
+@receiver(post_delete, sender=TextRecomendation)
+def bump_catalog_version(sender, instance, **kwargs):
+    """Invalida las copias en memoria del catálogo (también con QuerySet.delete)"""
+    CatalogVersion.bump(TextRecomendation.CATALOG)
@@ -16,4 +16,22 @@ class UserRecommendationInteraction(models.Model):
         indexes = [
             models.Index(fields=['user', 'recommendation']),
             models.Index(fields=['last_clicked']),
-        ]
\ No newline at end of file
+        ]
+
+    @classmethod
+    def register_click(cls, user, recommendation):
+        """
+        Registra un click del usuario en la recomendación (instancia o id) y
+        retorna la interacción
+        """
+        interaction, created = cls.objects.get_or_create(
+            user=user,
+            recommendation_id=getattr(recommendation, 'pk', recommendation),
+            defaults={'clicks': 1}
+        )
+        if not created:
+            interaction.clicks = models.F('clicks') + 1
+            interaction.last_clicked = timezone.now()
+            interaction.save()
+            interaction.refresh_from_db()
+        return interaction
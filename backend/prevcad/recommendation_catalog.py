@@ -0,0 +1,64 @@
+"""
+Catálogo en memoria de recomendaciones de texto (TextRecomendation).
+
+El catálogo solo cambia cuando un administrador importa el Excel o edita una
+recomendación, así que cada proceso lo carga una vez y lo reutiliza:
+
+- `fragments`: la representación de TextRecomendationSerializer de cada
+  recomendación, ya serializada ({id: dict});
+- `categories`: {categoría: frozenset(ids)};
+- `ids`: todos los ids, en orden.
+
+Guardar o eliminar una recomendación incrementa el contador de
+CatalogVersion (ver TextRecomendation.CATALOG); cada uso compara esa versión
+(una consulta por clave única) y recarga el catálogo si cambió. Si el
+contador aún no existe (base recién migrada) la versión es (0, None): la
+lectura nunca escribe, y el primer cambio crea el contador con otra versión.
+
+Los fragmentos son compartidos entre respuestas: deben tratarse como solo lectura.
+"""
+import threading
+from collections import namedtuple
+
+from prevcad.models import CatalogVersion, TextRecomendation
+
+Catalog = namedtuple('Catalog', ['version', 'fragments', 'categories', 'ids'])
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def _load(version):
+    from prevcad.serializers.text_recomendation_serializer import TextRecomendationSerializer
+
+    recommendations = TextRecomendation.objects.order_by('id')
+    fragments = {item['id']: item for item in TextRecomendationSerializer(recommendations, many=True).data}
+    categories = {}
+    for recommendation_id, fragment in fragments.items():
+        categories.setdefault(fragment['category'], set()).add(recommendation_id)
+    return Catalog(
+        version=version,
+        fragments=fragments,
+        categories={category: frozenset(ids) for category, ids in categories.items()},
+        ids=tuple(fragments),
+    )
+
+
+def get_catalog():
+    """Catálogo vigente, recargado si cambió su versión"""
+    global _catalog
+    version = CatalogVersion.current(TextRecomendation.CATALOG)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = _load(version)
+        return _catalog
+
+
+def invalidate():
+    """Descarta la copia local (la siguiente consulta la recarga)"""
+    global _catalog
+    with _lock:
+        _catalog = None
@@ -2,6 +2,11 @@ from rest_framework import serializers
 from prevcad.models import HealthCategory, CategoryTemplate
 from django.conf import settings
 from urllib.parse import urljoin
+from prevcad.template_cache import get_template_fragment
+from prevcad.tracing import traced
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class HealthCategorySerializer(serializers.ModelSerializer):
@@ -47,139 +52,198 @@ class HealthCategorySerializer(serializers.ModelSerializer):
         
         ]
 
+    # Campos pesados: con ?include= solo se calculan si se piden explícitamente
+    HEAVY_FIELDS = ('evaluation_form', 'training_form')
+
+    def __init__(self, *args, **kwargs):
+        """
+        Acepta `fields`: conjunto de campos a serializar. Los campos omitidos se
+        eliminan antes de serializar, por lo que sus getters nunca se ejecutan.
+        """
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields) - {'id'}:
+                self.fields.pop(field_name)
+
+    @classmethod
+    def get_requested_fields(cls, query_params):
+        """
+        Interpreta ?fields= y ?include= (listas separadas por comas).
+
+        - fields: solo esos campos (más los de include)
+        - include: todos los campos livianos más los pesados indicados
+        - sin parámetros: None, es decir, todos los campos
+        """
+        def parse(name):
+            value = query_params.get(name)
+            if value is None:
+                return None
+            return {field.strip() for field in value.split(',') if field.strip()}
+
+        fields = parse('fields')
+        include = parse('include')
+        if fields is None and include is None:
+            return None
+
+        if fields is None:
+            fields = set(cls.Meta.fields) - set(cls.HEAVY_FIELDS)
+        return fields | (include or set())
+
     def get_template_attribute(self, obj, attr, default=None):
         """Helper para obtener atributos del template de forma segura"""
         return getattr(obj.template, attr, default) if obj.template else default
 
+    def is_list_mode(self):
+        """
+        En modo lista el serializer solo lee: usa las relaciones precargadas
+        (ver HealthCategory.get_categories_for_listing) y nunca crea filas.
+        """
+        return bool(self.context.get('list_mode'))
+
+    def get_evaluation_form_instance(self, obj):
+        """Retorna el formulario de evaluación, creándolo solo fuera del modo lista"""
+        if self.is_list_mode():
+            return obj.get_evaluation_form_or_none()
+        return obj.get_or_create_evaluation_form()
+
+    def get_recommendation_instance(self, obj):
+        """Retorna la recomendación, creándola solo fuera del modo lista"""
+        if self.is_list_mode():
+            return obj.get_recommendation_or_none()
+        return obj.get_or_create_recommendation()
+
     def get_evaluation_attribute(self, obj, attr, default=None):
         """Helper para obtener atributos del evaluation_form de forma segura"""
         try:
-            evaluation_form = obj.get_or_create_evaluation_form()
+            evaluation_form = self.get_evaluation_form_instance(obj)
             return getattr(evaluation_form, attr, default)
         except Exception as e:
-            print(f"Error getting evaluation attribute {attr}: {str(e)}")
+            logger.warning(f"Error getting evaluation attribute {attr}: {str(e)}")
             return default
 
     def get_recommendation_attribute(self, obj, attr, default=None):
         """Helper para obtener atributos de recommendation de forma segura"""
         try:
-            recommendation = obj.get_or_create_recommendation()
+            recommendation = self.get_recommendation_instance(obj)
             return getattr(recommendation, attr, default)
         except Exception as e:
-            print(f"Error getting recommendation attribute {attr}: {str(e)}")
+            logger.warning(f"Error getting recommendation attribute {attr}: {str(e)}")
             return default
 
-    # Getters básicos
-    def get_name(self, obj):
-        return self.get_template_attribute(obj, 'name')
-
-    def get_icon(self, obj):
-        """Retorna la URL absoluta del icono del template"""
-        if not obj.template or not obj.template.icon:
+    # Fragmento derivado del template (igual para todos los usuarios)
+    @traced()
+    def get_template_fragment(self, obj):
+        """
+        Retorna la parte del payload que depende solo del template, cacheada por
+        id y versión del template (ver prevcad.template_cache).
+        """
+        if not obj.template:
             return None
-            
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(obj.template.icon.url)
-            
-        # Si no hay request, usar el dominio de settings
-        domain = getattr(settings, 'BASE_URL', 'https://caidas.uchile.cl')
-        return urljoin(domain, f'/media/{obj.template.icon.name}')
 
-    def get_description(self, obj):
-        return (self.get_template_attribute(obj, 'root_node.description') or 
-                self.get_template_attribute(obj, 'description'))
+        return get_template_fragment(obj.template, self.get_base_url(), self.build_template_fragment)
 
-    def get_evaluation_type(self, obj):
-        eval_type = self.get_template_attribute(obj, 'evaluation_type')
-        if not eval_type:
-            return None
-            
+    def get_base_url(self):
+        """URL base para las URLs absolutas de media (se calcula una vez por serializer)"""
+        if not hasattr(self, '_base_url'):
+            request = self.context.get('request')
+            if request:
+                self._base_url = request.build_absolute_uri('/')
+            else:
+                # Si no hay request, usar el dominio de settings
+                self._base_url = getattr(settings, 'BASE_URL', 'https://caidas.uchile.cl')
+        return self._base_url
+
+    def get_fragment_value(self, obj, key):
+        fragment = self.get_template_fragment(obj)
+        return fragment.get(key) if fragment else None
+
+    def build_template_fragment(self, template, base_url):
+        """Construye el fragmento del template; solo se ejecuta cuando no está en caché"""
+        eval_type = template.evaluation_type
         types = {
             'SELF': 'Autoevaluación',
             'PROFESSIONAL': 'Evaluación Profesional'
         }
         return {
-            'type': eval_type,
-            'label': types.get(eval_type, 'Desconocido')
+            'name': template.name,
+            'icon': urljoin(base_url, template.icon.url) if template.icon else None,
+            'description': getattr(template, 'root_node.description', None) or template.description,
+            'evaluation_type': {
+                'type': eval_type,
+                'label': types.get(eval_type, 'Desconocido')
+            } if eval_type else None,
+            'question_nodes': self.build_question_nodes(template),
+            'training_form': self.build_training_form(template, base_url),
         }
 
+    def build_question_nodes(self, template):
+        """Nodos de preguntas según el tipo de evaluación del template"""
+        try:
+            return template.get_question_nodes()
+        except Exception as e:
+            logger.warning(f"Error obteniendo nodos: {str(e)}")
+            return []
+
+    def build_training_form(self, template, base_url):
+        """Copia del training_form con las URLs de media convertidas a absolutas"""
+        if not template.training_form:
+            return None
+
+        # Copiar también los nodos para no modificar el template original
+        training_form = dict(template.training_form)
+        training_nodes = []
+        for node in training_form.get('training_nodes', []):
+            node = dict(node)
+            if node.get('media_url'):
+                node['media_url'] = urljoin(base_url, f'/media/{node["media_url"]}')
+                ##[NOTE] Commented out the HTTPS enforcement -- check if no error occurs
+                # Asegurarse de que la URL sea HTTPS
+                # if not node['media_url'].startswith('https://'):
+                #     node['media_url'] = node['media_url'].replace('http://', 'https://')
+            training_nodes.append(node)
+
+        training_form['training_nodes'] = training_nodes
+        return training_form
+
+    # Getters básicos
+    @traced()
+    def get_name(self, obj):
+        return self.get_fragment_value(obj, 'name')
+
+    @traced()
+    def get_icon(self, obj):
+        """Retorna la URL absoluta del icono del template"""
+        return self.get_fragment_value(obj, 'icon')
 
+    @traced()
+    def get_description(self, obj):
+        return self.get_fragment_value(obj, 'description')
+
+    @traced()
+    def get_evaluation_type(self, obj):
+        return self.get_fragment_value(obj, 'evaluation_type')
+
+    @traced()
     def get_evaluation_form(self, obj):
-        eval_form = obj.get_or_create_evaluation_form()
-        if eval_form:
-            # Debug
-            print("-"*30, '\n*', "Procesando evaluation_form para:", obj.template.name if obj.template else "No template")
-            
-            template = obj.template
-            question_nodes = []
-            
-            if template:
-                # Debug
-                print("Tipo de evaluación:", template.evaluation_type)
-
-
-                # Si es evaluación profesional
-                if template.evaluation_type == 'PROFESSIONAL':
-                    question_nodes = [
-                        {
-                            'id': 'observations',
-                            'type': 'text',
-                            'label': 'Observaciones',
-                            'required': True
-                        },
-                        {
-                            'id': 'diagnosis',
-                            'type': 'text',
-                            'label': 'Diagnóstico',
-                            'required': True
-                        }
-                    ]
-                    print("Nodos profesionales creados:", question_nodes)  # Debug
-                # Si es autoevaluación
-                else:
-                    try:
-                        # Obtener los nodos del template
-                        if hasattr(template, 'get_question_nodes'):
-                            question_nodes = template.get_question_nodes()
-                         
-                        else:
-                            print("El template no tiene método get_question_nodes")  # Debug
-                            # Intentar obtener nodos del root_node
-                            if hasattr(template, 'root_node') and template.root_node:
-                                question_nodes = [
-                                    {
-                                        'id': node.id,
-                                        'type': node.type,
-                                        'label': node.text,
-                                        'required': getattr(node, 'required', False),
-                                        'options': getattr(node, 'options', None)
-                                    }
-                                    for node in template.root_node.get_descendants()
-                                    if node.type == 'QUESTION'
-                                ]
-                                print("Nodos obtenidos del root_node:", question_nodes)  # Debug
-                    except Exception as e:
-                        print("Error obteniendo nodos:", str(e))  # Debug
-                        question_nodes = []
-            
-            # Debug final
-            print("Nodos finales a devolver:", question_nodes)
-            
+        eval_form = self.get_evaluation_form_instance(obj)
+        if eval_form or self.is_list_mode():
             return {
-                'completed_date': eval_form.completed_date,
-                'responses': eval_form.responses,
-                'professional_responses': eval_form.professional_responses,
-                'updated_at': eval_form.updated_at if hasattr(eval_form, 'updated_at') else None,
-                'question_nodes': question_nodes
+                'completed_date': getattr(eval_form, 'completed_date', None),
+                'responses': getattr(eval_form, 'responses', {}),
+                'professional_responses': getattr(eval_form, 'professional_responses', {}),
+                'updated_at': getattr(eval_form, 'updated_at', None),
+                'version': getattr(eval_form, 'version', 0),
+                'question_nodes': self.get_fragment_value(obj, 'question_nodes') or []
             }
         return None
 
+    @traced()
     def get_status(self, obj):
         """Obtener estado completo"""
         try:
-            evaluation_form = obj.get_or_create_evaluation_form()
-            recommendation = obj.get_or_create_recommendation()
+            evaluation_form = self.get_evaluation_form_instance(obj)
             
             status_color = self.get_recommendation_attribute(obj, 'status_color', 'gris')
             status_info = self.STATUS_COLORS.get(status_color, self.STATUS_COLORS['gris'])
@@ -187,19 +251,20 @@ class HealthCategorySerializer(serializers.ModelSerializer):
             return {
                 'color': status_info['color'],
                 'text': status_info['text'],
-                'is_completed': bool(evaluation_form.completed_date),
+                'is_completed': bool(getattr(evaluation_form, 'completed_date', None)),
                 'is_draft': self.get_recommendation_attribute(obj, 'is_draft', True),
                 'last_updated': self.get_recommendation_attribute(obj, 'updated_at'),
                 'professional_reviewed': (
-                    bool(evaluation_form.professional_responses) 
+                    bool(getattr(evaluation_form, 'professional_responses', None)) 
                     if obj.template.evaluation_type == 'PROFESSIONAL' 
                     else None
                 )
             }
         except Exception as e:
-            print(f"Error getting status: {str(e)}")
+            logger.warning(f"Error getting status: {str(e)}")
             return self.get_default_status()
 
+    @traced()
     def get_recommendations(self, obj):
         """Obtener recomendaciones"""
         from django.conf import settings
@@ -208,7 +273,7 @@ class HealthCategorySerializer(serializers.ModelSerializer):
 
         try:
             status = self.get_status(obj)
-            recommendation = obj.get_or_create_recommendation()
+            recommendation = self.get_recommendation_instance(obj)
             request = self.context.get('request')
             
 
@@ -233,7 +298,7 @@ class HealthCategorySerializer(serializers.ModelSerializer):
                     'text': status['text']
                 },
                 'text': recommendation.text if recommendation else None,
-                'video_url': f"{domain}{recommendation.video.url}" if recommendation.video and recommendation.video.url else None,
+                'video_url': f"{domain}{recommendation.video.url}" if recommendation and recommendation.video else None,
                 'updated_at': recommendation.updated_at if recommendation else None,
                 'is_draft': recommendation.is_draft if recommendation else True,
                 'professional': {
@@ -244,37 +309,12 @@ class HealthCategorySerializer(serializers.ModelSerializer):
 
             return base_recommendation
         except Exception as e:
-            print(f"Error getting recommendations: {str(e)}")
+            logger.warning(f"Error getting recommendations: {str(e)}")
             return None
 
+    @traced()
     def get_training_form(self, obj):
-        training_form = self.get_template_attribute(obj, 'training_form')
-        if not training_form:
-            return None
-            
-        # Hacer una copia para no modificar el original
-        training_form = training_form.copy()
-        training_nodes = training_form.get('training_nodes', [])
-        
-        # Convertir URLs relativas a absolutas
-        for node in training_nodes:
-            if node.get('media_url'):
-                request = self.context.get('request')
-                if request:
-                    node['media_url'] = request.build_absolute_uri(f'/media/{node["media_url"]}')
-                else:
-                    # Si no hay request, usar el dominio de settings
-                    domain = getattr(settings, 'BASE_URL', 'https://caidas.uchile.cl')
-                    node['media_url'] = urljoin(domain, f'/media/{node["media_url"]}')
-                    
-                ##[NOTE] Commented out the HTTPS enforcement -- check if no error occurs
-                # Asegurarse de que la URL sea HTTPS
-                # if not node['media_url'].startswith('https://'):
-                #     node['media_url'] = node['media_url'].replace('http://', 'https://')
-        
-        training_form['training_nodes'] = training_nodes
-        return training_form
-    
+        return self.get_fragment_value(obj, 'training_form')
 
     def get_default_status(self):
         """Helper para obtener estado por defecto"""
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from prevcad.models import UserProfile
+from prevcad.media_pipeline import derivative_path
 
 class UserProfileSerializer(serializers.ModelSerializer):
     profile_image = serializers.SerializerMethodField()
+    profile_image_thumbnail = serializers.SerializerMethodField()
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
     first_name = serializers.CharField(source='user.first_name', read_only=True)
@@ -11,7 +13,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProfile
-        fields = ['profile_image', 'phone', 'birth_date', 'role', 'first_name', 'last_name', 'email', 'username']
+        fields = ['profile_image', 'profile_image_thumbnail', 'phone', 'birth_date', 'role', 'first_name', 'last_name', 'email', 'username']
 
     def get_profile_image(self, obj):
         if obj.profile_image:
@@ -20,6 +22,15 @@ class UserProfileSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.profile_image.url)
         return None
 
+    def get_profile_image_thumbnail(self, obj):
+        """Miniatura generada por prevcad.media_pipeline (puede no existir aún)"""
+        if obj.profile_image:
+            request = self.context.get('request')
+            if request:
+                thumbnail = obj.profile_image.storage.url(derivative_path(obj.profile_image.name, 'thumb'))
+                return request.build_absolute_uri(thumbnail)
+        return None
+
 class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer()
 
@@ -0,0 +1,59 @@
+"""
+Caché del fragmento de HealthCategorySerializer que depende solo del CategoryTemplate
+(nombre, ícono, descripción, tipo de evaluación, nodos de preguntas y training_form).
+
+Las entradas se identifican por id de template, su contador `version` (junto con
+`updated_at`, por si un id se reutiliza tras un rollback) y la URL base usada para
+las URLs absolutas de media. Cada proceso mantiene una copia local; si
+`TEMPLATE_FRAGMENT_CACHE_ALIAS` apunta a un caché de Django, los fragmentos además se
+comparten entre procesos. Como la versión forma parte de la clave, guardar el template
+basta para invalidar en todos los procesos.
+
+Los fragmentos son compartidos entre respuestas: deben tratarse como solo lectura.
+"""
+import threading
+from django.conf import settings
+from django.core.cache import caches
+
+# {template_id: (version, {base_url: fragment})}
+_local_fragments = {}
+_lock = threading.Lock()
+
+
+def _get_shared_cache():
+    alias = getattr(settings, 'TEMPLATE_FRAGMENT_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def get_template_fragment(template, base_url, build):
+    """
+    Retorna el fragmento cacheado del template, construyéndolo con `build(template, base_url)`
+    si no existe para la versión actual.
+    """
+    version = (template.version, template.updated_at)
+    entry = _local_fragments.get(template.pk)
+    if entry and entry[0] == version and base_url in entry[1]:
+        return entry[1][base_url]
+
+    shared_cache = _get_shared_cache()
+    updated = template.updated_at.timestamp() if template.updated_at else None
+    key = f'prevcad:template_fragment:{template.pk}:{template.version}:{updated}:{base_url}'
+    fragment = shared_cache.get(key) if shared_cache else None
+    if fragment is None:
+        fragment = build(template, base_url)
+        if shared_cache:
+            shared_cache.set(key, fragment)
+
+    with _lock:
+        entry = _local_fragments.get(template.pk)
+        if not entry or entry[0] != version:
+            entry = (version, {})
+            _local_fragments[template.pk] = entry
+        entry[1][base_url] = fragment
+    return fragment
+
+
+def invalidate_template_fragment(template_id):
+    """Elimina la copia local del fragmento de un template"""
+    with _lock:
+        _local_fragments.pop(template_id, None)
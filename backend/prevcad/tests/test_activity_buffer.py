@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from prevcad import activity_buffer
+from prevcad.models import AppActivityLog
+
+
+@override_settings(
+    ACTIVITY_LOG_WRITE_BEHIND=True,
+    ACTIVITY_LOG_FLUSH_INTERVAL=0,
+    ACTIVITY_LOG_FLUSH_THRESHOLD=1000,
+)
+class ActivityLogWriteBehindTest(TestCase):
+    """Verifica la ingesta con buffer y la escritura en lote de registros de actividad"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='activity_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/app_activity_log'
+        self.addCleanup(activity_buffer.flush)
+        # Los ids de usuario se repiten entre tests (rollback)
+        activity_buffer._stored.clear()
+
+    def post(self, actions, date='2025-01-31'):
+        return self.client.post(self.url, {'date': date, 'actions': actions}, format='json')
+
+    def test_buffers_and_flushes_on_read(self):
+        response = self.post({'08:00:00': 'Login', '08:05:00': 'home'})
+        self.assertEqual(response.status_code, 202)
+        self.post({'08:10:00': 'logout', '08:05:00': 'home'})
+        self.assertFalse(AppActivityLog.objects.exists())
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        log = AppActivityLog.objects.get(user=self.user)
+        self.assertEqual(log.actions, {'08:00:00': 'login', '08:05:00': 'home', '08:10:00': 'logout'})
+        self.assertEqual(log.n_entries, 3)
+        self.assertEqual(log.time_in_app, 600)
+
+    def test_buffered_actions_are_not_acknowledged(self):
+        response = self.post({'08:00:00': 'home', '06:30:00': 'logout'})
+
+        # Solo lo que este proceso escribió cuenta para el watermark
+        self.assertIsNone(response.data['watermark'])
+        self.assertEqual(response.data['pending'], ['06:30:00', '08:00:00'])
+
+        with self.assertNumQueries(0):
+            activity_buffer.flush(self.user.id + 1)
+        activity_buffer.flush()
+        with self.assertNumQueries(0):
+            response = self.post({})
+        self.assertEqual(response.data['watermark'], '08:00:00')
+        self.assertEqual(response.data['pending'], [])
+
+    @override_settings(ACTIVITY_LOG_BUFFER_LIMIT=2)
+    def test_full_buffer_writes_directly(self):
+        self.assertEqual(self.post({'08:00:00': 'login', '08:01:00': 'home'}).status_code, 202)
+
+        response = self.post({'08:02:00': 'logout'})
+
+        self.assertEqual(response.status_code, 201)
+        log = AppActivityLog.objects.get(user=self.user)
+        self.assertEqual(log.n_entries, 3)
+        self.assertEqual(response.data['watermark'], '08:02:00')
+
+    def test_flush_merges_with_existing_log_in_bulk(self):
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'07:00:00': 'login'})
+        self.post({'07:30:00': 'home'})
+        self.post({'09:00:00': 'login'}, date='2025-02-01')
+
+        self.assertEqual(activity_buffer.flush(), 2)
+
+        self.assertEqual(AppActivityLog.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            AppActivityLog.objects.get(user=self.user, date='2025-01-31').actions,
+            {'07:00:00': 'login', '07:30:00': 'home'}
+        )
+
+    def test_failed_flush_keeps_actions(self):
+        self.post({'08:00:00': 'login'})
+
+        with mock.patch.object(AppActivityLog, 'bulk_add_actions', side_effect=RuntimeError('db')):
+            self.assertEqual(activity_buffer.flush(), 0)
+        self.assertEqual(activity_buffer.flush(), 1)
+        self.assertEqual(AppActivityLog.objects.get(user=self.user).actions, {'08:00:00': 'login'})
+
+    def test_invalid_actions_are_rejected(self):
+        response = self.post({'8am': 'login'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(activity_buffer.pending(self.user.id, '2025-01-31'), {})
+
+    @override_settings(ACTIVITY_LOG_FLUSH_THRESHOLD=2)
+    def test_threshold_triggers_flush(self):
+        self.post({'08:00:00': 'login'})
+        self.assertFalse(AppActivityLog.objects.exists())
+
+        self.post({'08:01:00': 'home'})
+
+        self.assertEqual(AppActivityLog.objects.get(user=self.user).n_entries, 2)
@@ -0,0 +1,73 @@
+import datetime
+import gzip
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from prevcad import audit_archive
+from prevcad.models import ActivityAction, ActivityEvent, AppActivityLog
+
+
+class ActivityEventTest(TestCase):
+    """Verifica la tabla de eventos derivada de los registros diarios"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='event_user', password='testpass123')
+        self.other = User.objects.create_user(username='event_other', password='testpass123')
+
+    def test_new_actions_are_appended_once(self):
+        log = AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'08:00:00': 'Login', '08:01:00': 'downloads'})
+        log.add_actions({'08:01:00': 'downloads', '08:02:00': 'home'})
+        AppActivityLog.bulk_add_actions({(self.other.id, '2025-01-31'): {'09:00:00': 'downloads'}})
+
+        self.assertEqual(ActivityEvent.objects.count(), 4)
+        self.assertEqual(ActivityAction.objects.count(), 3)
+        event = ActivityEvent.objects.get(user=self.user, action__code='login')
+        self.assertEqual(timezone.localtime(event.timestamp).replace(tzinfo=None), datetime.datetime(2025, 1, 31, 8, 0))
+
+        start = timezone.make_aware(datetime.datetime(2025, 1, 27))
+        self.assertEqual(ActivityEvent.active_users(start, start + datetime.timedelta(days=7), 'downloads'), 2)
+        self.assertEqual(ActivityEvent.active_users(start, start + datetime.timedelta(days=7), 'login'), 1)
+
+    def test_backfill_is_idempotent(self):
+        AppActivityLog.objects.create(user=self.user, date='2025-01-30', actions={'08:00:00': 'login'})
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'08:00:00': 'login'})
+
+        ActivityEvent.backfill()
+        ActivityEvent.backfill()
+
+        self.assertEqual(ActivityEvent.objects.count(), 2)
+
+    def test_archive_month_exports_and_deletes(self):
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'23:59:59': 'logout'})
+        AppActivityLog.add_action_for_user(self.user, '2025-02-01', {'00:00:00': 'login'})
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(ActivityEvent.archive_month(2025, 1, directory), 1)
+            with gzip.open(f'{directory}/activity_events_2025-01.jsonl.gz', 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertEqual([(row['user'], row['action']) for row in rows], [(self.user.id, 'logout')])
+        self.assertEqual(list(ActivityEvent.objects.values_list('action__code', flat=True)), ['login'])
+        self.assertEqual(AppActivityLog.objects.filter(user=self.user).count(), 2)
+
+    def test_archive_month_appends_late_events_once(self):
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'23:59:59': 'logout'})
+
+        with tempfile.TemporaryDirectory() as directory:
+            ActivityEvent.archive_month(2025, 1, directory)
+            # Reenvío tardío de la app: solo se archiva lo nuevo
+            AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'22:00:00': 'home'})
+            self.assertEqual(ActivityEvent.archive_month(2025, 1, directory), 1)
+            self.assertEqual(ActivityEvent.archive_month(2025, 1, directory), 0)
+
+            entry = audit_archive.load_manifest(directory)['months']['2025-01']
+            self.assertEqual(entry['rows'], 2)
+            audit_archive.verify(entry, directory)
+            with gzip.open(f'{directory}/activity_events_2025-01.jsonl.gz', 'rt') as archive:
+                self.assertEqual(sorted(json.loads(line)['action'] for line in archive), ['home', 'logout'])
+        self.assertFalse(ActivityEvent.objects.exists())
@@ -0,0 +1,90 @@
+import csv
+import io
+import os
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from prevcad import activity_export
+from prevcad.models import ActionLog, AppActivityLog
+
+
+class ActivityExportTest(TestCase):
+    """Verifica la exportación por lotes de registros de actividad"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='export_user', password='testpass123')
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'08:00:00': 'login', '08:05:00': 'screen home'})
+        AppActivityLog.add_action_for_user(self.user, '2025-02-01', {'09:00:00': 'login'})
+        ActionLog.objects.create(user=self.user, action_type='VIEW', description='Vista', extra_data={'path': '/api/'})
+
+    def export_csv(self, dataset, **kwargs):
+        output = io.BytesIO()
+        fmt, rows = activity_export.export(dataset, output, 'csv', **kwargs)
+        return rows, list(csv.DictReader(io.StringIO(output.getvalue().decode('utf-8'))))
+
+    def test_app_activity_is_exploded_in_batches(self):
+        rows, records = self.export_csv('app_activity', batch_size=2)
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(
+            [(r['date'], r['time'], r['action']) for r in records],
+            [('2025-01-31', '08:00:00', 'login'), ('2025-01-31', '08:05:00', 'screen home'), ('2025-02-01', '09:00:00', 'login')]
+        )
+        self.assertEqual(records[0]['timestamp'], '2025-01-31T08:00:00-03:00')
+
+    def test_action_log_and_date_range(self):
+        rows, records = self.export_csv('action_log')
+        self.assertEqual(records[0]['extra_data'], '{"path": "/api/"}')
+
+        queryset = activity_export.default_queryset('app_activity', since='2025-02-01')
+        rows, _ = self.export_csv('app_activity', queryset=queryset)
+        self.assertEqual(rows, 1)
+
+    @unittest.skipIf(activity_export.pa is None, 'pyarrow no está instalado')
+    def test_parquet_has_typed_columns(self):
+        import pyarrow.parquet as pq
+
+        output = io.BytesIO()
+        fmt, rows = activity_export.export('app_activity', output, 'parquet', batch_size=2)
+        table = pq.read_table(io.BytesIO(output.getvalue()))
+
+        self.assertEqual((fmt, table.num_rows), ('parquet', 3))
+        self.assertEqual(str(table.schema.field('date').type), 'date32[day]')
+
+    @unittest.skipIf(activity_export.pa is None, 'pyarrow no está instalado')
+    def test_arrow_ipc_file(self):
+        import pyarrow.ipc
+
+        output = io.BytesIO()
+        fmt, rows = activity_export.export('action_log', output, 'arrow')
+        table = pyarrow.ipc.open_file(io.BytesIO(output.getvalue())).read_all()
+
+        self.assertEqual((fmt, table.num_rows), ('arrow', 1))
+        self.assertEqual(table.column('action_type').to_pylist(), ['VIEW'])
+
+    @unittest.skipIf(activity_export.pa is not None, 'pyarrow está instalado')
+    def test_columnar_formats_without_pyarrow_are_rejected(self):
+        for fmt in ('parquet', 'arrow'):
+            with self.assertRaises(activity_export.FormatUnavailable):
+                activity_export.export('action_log', io.BytesIO(), fmt)
+        with self.assertRaises(CommandError):
+            call_command('export_activity', 'action_log', '--format', 'parquet', '--output', os.devnull)
+
+    def test_admin_action_downloads_file(self):
+        User = get_user_model()
+        admin = User.objects.create_superuser(username='export_admin', password='testpass123')
+        # El perfil creado por señal reasigna is_staff/is_superuser según su rol
+        User.objects.filter(pk=admin.pk).update(is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+
+        response = self.client.post('/admin/prevcad/appactivitylog/', {
+            'action': 'export_app_activity_csv',
+            '_selected_action': list(AppActivityLog.objects.values_list('id', flat=True)),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertGreater(len(b''.join(response.streaming_content)), 0)
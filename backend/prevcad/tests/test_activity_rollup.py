@@ -0,0 +1,81 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.test import TestCase
+
+from prevcad.models import ActivityEvent, ActivityRollup, AppActivityLog
+
+
+class ActivityRollupTest(TestCase):
+    """Verifica los resúmenes por día, semana y mes y su actualización incremental"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='rollup_user', password='testpass123')
+        self.other = User.objects.create_user(username='rollup_other', password='testpass123')
+        # Viernes 31 de enero y sábado 1 de febrero: misma semana, distinto mes
+        AppActivityLog.add_action_for_user(self.user, '2025-01-31', {
+            '08:00:00': 'login', '08:01:00': 'screen downloads', '08:02:00': 'download 3', '08:10:00': 'download 4'
+        })
+        AppActivityLog.add_action_for_user(self.other, '2025-02-01', {
+            '09:00:00': 'login', '09:30:00': 'screen home'
+        })
+
+    def get(self, period, start):
+        return ActivityRollup.objects.get(period=period, start=datetime.date.fromisoformat(start))
+
+    def test_rollups_per_period(self):
+        self.assertEqual(ActivityRollup.update_rollups(), 5)
+
+        day = self.get('day', '2025-01-31')
+        self.assertEqual((day.active_users, day.n_logins, day.time_in_app), (1, 1, 600))
+        self.assertEqual(day.top_actions, {'-': [['login', 1]], 'downloads': [['download', 2], ['screen', 1]]})
+
+        week = self.get('week', '2025-01-27')
+        self.assertEqual((week.active_users, week.n_logins, week.time_in_app), (2, 2, 2400))
+        self.assertEqual(self.get('month', '2025-02-01').active_users, 1)
+
+    @mock.patch.object(ActivityRollup, 'EVENT_ID_OVERLAP', 0)
+    def test_only_touched_periods_are_recomputed(self):
+        ActivityRollup.update_rollups()
+        self.assertEqual(ActivityRollup.update_rollups(), 0)
+
+        AppActivityLog.add_action_for_user(self.other, '2025-02-01', {'09:40:00': 'screen perfil'})
+
+        self.assertEqual(ActivityRollup.update_rollups(), 3)
+        self.assertEqual(self.get('day', '2025-02-01').time_in_app, 2400)
+        self.assertEqual(self.get('week', '2025-01-27').n_entries, 7)
+
+    def test_events_committed_late_are_included(self):
+        ActivityRollup.update_rollups()
+        AppActivityLog.add_action_for_user(self.other, '2025-02-01', {'09:40:00': 'screen perfil'})
+        # Como si otro proceso ya hubiera procesado ids mayores a los de este evento
+        ActivityRollup.objects.update(last_event=ActivityEvent.objects.aggregate(Max('id'))['id__max'] + 10)
+
+        ActivityRollup.update_rollups()
+
+        self.assertEqual(self.get('day', '2025-02-01').time_in_app, 2400)
+        self.assertEqual(self.get('day', '2025-02-01').top_actions['perfil'], [['screen', 1]])
+
+    def test_month_top_actions_are_summed_from_days(self):
+        ActivityRollup.update_rollups()
+
+        month = self.get('month', '2025-01-01')
+        self.assertEqual(month.top_actions, {'-': [['login', 1]], 'downloads': [['download', 2], ['screen', 1]]})
+        self.assertEqual((month.active_users, month.n_entries), (1, 4))
+
+    def test_admin_dashboard_reads_rollups(self):
+        ActivityRollup.update_rollups()
+        User = get_user_model()
+        admin = User.objects.create_superuser(username='rollup_admin', password='testpass123')
+        # El perfil creado por señal reasigna is_staff/is_superuser según su rol
+        User.objects.filter(pk=admin.pk).update(is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+
+        response = self.client.get('/admin/prevcad/activityrollup/', {'period__exact': 'day'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['dashboard_rows']), 2)
+        self.assertContains(response, 'downloads · download (2)')
@@ -0,0 +1,101 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from prevcad.models import AppActivityLog
+
+
+class AppActivityLogSummaryTest(TestCase):
+    """Verifica que el resumen incremental coincida con el recálculo completo"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='summary_user', password='testpass123')
+
+    def full_summary(self, actions):
+        log = AppActivityLog(user=self.user, actions=dict(actions))
+        log.update_summary()
+        return log.n_logins, log.time_in_app
+
+    def random_actions(self, count, seed):
+        rng = random.Random(seed)
+        seconds = sorted(rng.sample(range(6 * 3600, 23 * 3600), count))
+        return [
+            (f'{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}', rng.choice(['login', 'home', 'evaluation', 'logout']))
+            for s in seconds
+        ]
+
+    def test_in_order_batches_match_full_recompute(self):
+        actions = self.random_actions(60, seed=1)
+        log = AppActivityLog.add_action_for_user(self.user, '2025-01-31', {})
+
+        for i in range(0, len(actions), 7):
+            log.add_actions(dict(actions[i:i + 7]))
+            self.assertEqual((log.n_logins, log.time_in_app), self.full_summary(log.actions))
+
+        log.refresh_from_db()
+        self.assertEqual(log.session_state['n'], 60)
+
+    def test_out_of_order_actions_trigger_recompute(self):
+        log = AppActivityLog.add_action_for_user(
+            self.user, '2025-01-31', {'08:00:00': 'login', '08:30:00': 'home', '10:00:00': 'login'}
+        )
+        self.assertEqual(log.time_in_app, 1800)
+
+        # Cierra la primera sesión más tarde y reemplaza una acción existente
+        log.add_actions({'09:00:00': 'home', '10:00:00': 'home'})
+
+        self.assertEqual(log.n_logins, 1)
+        self.assertEqual(log.time_in_app, 7200)
+        self.assertEqual((log.n_logins, log.time_in_app), self.full_summary(log.actions))
+
+    def test_replaced_actions_are_recomputed(self):
+        log = AppActivityLog.add_action_for_user(
+            self.user, '2025-01-31', {'08:00:00': 'login', '09:00:00': 'home'}
+        )
+
+        log.actions = {}
+        log.add_actions({'10:00:00': 'login', '10:01:00': 'home'})
+
+        self.assertEqual((log.n_logins, log.time_in_app), (1, 60))
+
+    def test_timestamp_seconds_rejects_out_of_range_fields(self):
+        self.assertEqual(AppActivityLog.timestamp_seconds('23:59:59'), 86399)
+        # El esquema solo valida dígitos: el rango se revisa como lo hacía strptime
+        for timestamp in ('99:99:99', '24:00:00', '12:60:00', '12:00:60'):
+            with self.assertRaises(ValueError):
+                AppActivityLog.timestamp_seconds(timestamp)
+
+
+class AppActivityLogWatermarkTest(TestCase):
+    """Verifica el watermark de acciones confirmadas por (usuario, fecha)"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='watermark_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/app_activity_log'
+
+    def test_create_and_get_return_watermark(self):
+        response = self.client.get(f'{self.url}/watermark', {'date': '2025-01-31'})
+        self.assertIsNone(response.data['watermark'])
+
+        response = self.client.post(self.url, {
+            'date': '2025-01-31', 'actions': {'08:00:00': 'login', '08:05:00': 'home'}
+        }, format='json')
+        self.assertEqual(response.data['watermark'], '08:05:00')
+
+        response = self.client.get(f'{self.url}/watermark', {'date': '2025-01-31'})
+        self.assertEqual(response.data['watermark'], '08:05:00')
+        self.assertEqual(response.data['n_entries'], 2)
+
+    def test_resent_actions_are_not_written_again(self):
+        log = AppActivityLog.add_action_for_user(self.user, '2025-01-31', {'08:00:00': 'login'})
+
+        with CaptureQueriesContext(connection) as ctx:
+            log.add_actions({'08:00:00': 'Login'})
+
+        self.assertEqual(len(ctx.captured_queries), 0)
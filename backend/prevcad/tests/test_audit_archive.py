@@ -0,0 +1,97 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from prevcad import audit_archive
+from prevcad.models import ActionLog
+
+
+class AuditArchiveTest(TestCase):
+    """Verifica el archivo mensual de ActionLog y la búsqueda en él"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.settings_override = override_settings(ACTION_LOG_ARCHIVE_DIR=self.temp_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = get_user_model().objects.create_user(username='archive_user', password='testpass123')
+
+    def log(self, when, action_type='UPDATE', description='Cambio'):
+        return ActionLog.objects.create(
+            user=self.user, action_type=action_type, description=description,
+            timestamp=timezone.make_aware(when), extra_data={'path': '/api/profile/'}
+        )
+
+    def test_archives_months_and_deletes_rows(self):
+        self.log(datetime.datetime(2025, 1, 10), description='Perfil actualizado')
+        self.log(datetime.datetime(2025, 2, 3), action_type='ACCESS_DENIED')
+        recent = self.log(datetime.datetime(2025, 2, 20))
+
+        cutoff = timezone.make_aware(datetime.datetime(2025, 2, 15))
+        self.assertEqual(audit_archive.archive_older_than(cutoff), {'2025-01': 1, '2025-02': 1})
+
+        self.assertEqual(list(ActionLog.objects.values_list('id', flat=True)), [recent.id])
+        months = audit_archive.load_manifest()['months']
+        self.assertEqual(months['2025-02']['rows'], 1)
+        self.assertEqual(
+            months['2025-01']['sha256'],
+            audit_archive.file_checksum(os.path.join(self.temp_dir, 'action_log_2025-01.jsonl.gz'))
+        )
+
+        # El resto del mes se agrega al mismo archivo
+        audit_archive.archive_older_than(timezone.make_aware(datetime.datetime(2025, 3, 1)))
+        results, truncated = audit_archive.search('2025-02')
+        self.assertEqual([row['action_type'] for row in results], ['ACCESS_DENIED', 'UPDATE'])
+        self.assertFalse(ActionLog.objects.exists())
+
+        results, _ = audit_archive.search('2025-01', query='perfil actualizado', username='archive_user')
+        self.assertEqual(len(results), 1)
+
+    def test_later_row_with_smaller_id_is_archived_before_deletion(self):
+        # El sink asigna la fecha al encolar y el id al escribir: los ids no siguen las fechas
+        after_cutoff = self.log(datetime.datetime(2025, 1, 15, 12, 0, 1), description='Después del corte')
+        self.log(datetime.datetime(2025, 1, 15, 11, 59, 59), description='Antes del corte')
+
+        audit_archive.archive_older_than(timezone.make_aware(datetime.datetime(2025, 1, 15, 12)))
+        self.assertEqual(list(ActionLog.objects.values_list('id', flat=True)), [after_cutoff.id])
+
+        audit_archive.archive_older_than(timezone.make_aware(datetime.datetime(2025, 2, 1)))
+        results, _ = audit_archive.search('2025-01')
+        self.assertEqual(
+            sorted(row['description'] for row in results), ['Antes del corte', 'Después del corte']
+        )
+        self.assertFalse(ActionLog.objects.exists())
+
+    def test_tampered_archive_is_rejected(self):
+        self.log(datetime.datetime(2025, 1, 10))
+        call_command('archive_action_logs', '--days', '0', '--output', self.temp_dir, stdout=io.StringIO())
+
+        with open(os.path.join(self.temp_dir, 'action_log_2025-01.jsonl.gz'), 'ab') as f:
+            f.write(b'x')
+
+        with self.assertRaises(audit_archive.ArchiveError):
+            audit_archive.search('2025-01')
+
+    def test_admin_archive_view_searches_month(self):
+        self.log(datetime.datetime(2025, 1, 10), description='Perfil actualizado')
+        audit_archive.archive_older_than(timezone.make_aware(datetime.datetime(2025, 2, 1)))
+        User = get_user_model()
+        admin = User.objects.create_superuser(username='archive_admin', password='testpass123')
+        # El perfil creado por señal reasigna is_staff/is_superuser según su rol
+        User.objects.filter(pk=admin.pk).update(is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+
+        response = self.client.get('/admin/prevcad/actionlog/archive/', {'month': '2025-01', 'q': 'perfil'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Perfil actualizado')
+        response = self.client.get('/admin/prevcad/actionlog/')
+        self.assertContains(response, '/admin/prevcad/actionlog/archive/')
@@ -0,0 +1,137 @@
+import queue
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from prevcad import audit_sink
+from prevcad.decorators import doctor_required, log_action
+from prevcad.models import ActionLog, ActionLogCounter
+
+
+@override_settings(
+    AUDIT_LOG_SYNC=False,
+    AUDIT_LOG_AGGREGATE=False,
+    AUDIT_LOG_FLUSH_INTERVAL=3600,
+    AUDIT_LOG_BATCH_SIZE=1000,
+)
+class AuditSinkTest(TestCase):
+    """Verifica la escritura en lote de los registros de auditoría"""
+
+    def setUp(self):
+        self.addCleanup(audit_sink.shutdown)
+
+    def protected_view(self):
+        @doctor_required
+        def view(request):
+            return JsonResponse({'status': 'success'})
+
+        request = RequestFactory().get('/api/protected/')
+        request.user = AnonymousUser()
+        return view(request)
+
+    def test_records_are_written_on_flush(self):
+        response = self.protected_view()
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(ActionLog.objects.exists())
+
+        self.assertEqual(audit_sink.flush(), 2)
+        self.assertEqual(
+            sorted(ActionLog.objects.values_list('action_type', flat=True)),
+            ['ACCESS_ATTEMPT', 'ACCESS_DENIED']
+        )
+
+    def test_full_queue_drops_all_but_denials(self):
+        dropped = audit_sink.dropped()
+        with mock.patch.object(audit_sink, '_queue', queue.Queue(maxsize=1)):
+            self.protected_view()
+
+            # El intento ocupa la cola; la denegación se escribe en el request
+            self.assertEqual(list(ActionLog.objects.values_list('action_type', flat=True)), ['ACCESS_DENIED'])
+            self.protected_view()
+            self.assertEqual(audit_sink.dropped(), dropped + 1)
+            self.assertEqual(audit_sink.flush(), 1)
+
+        self.assertEqual(ActionLog.objects.count(), 3)
+
+    @override_settings(AUDIT_LOG_RETRY_DELAY=0)
+    def test_failed_batch_requeues_denials(self):
+        self.protected_view()
+        dropped = audit_sink.dropped()
+
+        with mock.patch.object(ActionLog.objects, 'bulk_create', side_effect=RuntimeError('database is locked')) as mocked:
+            self.assertEqual(audit_sink.flush(), 0)
+
+        # Dos intentos; la denegación vuelve a la cola y el intento se descarta
+        self.assertEqual(mocked.call_count, 2)
+        self.assertEqual(audit_sink.dropped(), dropped + 1)
+        self.assertFalse(ActionLog.objects.exists())
+        self.assertEqual(audit_sink.flush(), 1)
+        self.assertEqual(list(ActionLog.objects.values_list('action_type', flat=True)), ['ACCESS_DENIED'])
+
+    def test_shutdown_flushes_pending_records(self):
+        self.protected_view()
+
+        audit_sink.shutdown()
+
+        self.assertEqual(ActionLog.objects.count(), 2)
+
+
+@override_settings(AUDIT_LOG_SYNC=True, AUDIT_LOG_AGGREGATE=True)
+class AggregatedAuditTest(TestCase):
+    """Verifica los contadores de accesos rutinarios en modo agregado"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='audit_user', password='testpass123')
+
+    def call(self, action_type, path='/api/profile/'):
+        @log_action(action_type)
+        def view(request):
+            return JsonResponse({'status': 'success'})
+
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return view(request)
+
+    def test_routine_accesses_are_counted(self):
+        for _ in range(3):
+            self.call('VIEW')
+        self.call('VIEW', path='/api/other/')
+        self.call('PROFILE_UPDATE')
+
+        self.assertEqual(
+            list(ActionLog.objects.values_list('action_type', flat=True)), ['PROFILE_UPDATE']
+        )
+        counters = {counter.path: counter.count for counter in ActionLogCounter.objects.filter(user=self.user)}
+        self.assertEqual(counters, {'/api/profile/': 3, '/api/other/': 1})
+
+    def test_batch_upsert_increments_existing_counters(self):
+        records = [
+            ActionLog(user=self.user, action_type='ACCESS_GRANTED', description='', extra_data={'path': '/a/'})
+            for _ in range(2)
+        ] + [ActionLog(user=None, action_type='ACCESS_ATTEMPT', description='', extra_data={'path': '/a/'})]
+
+        self.assertEqual(ActionLogCounter.add_records(records), 2)
+        self.assertEqual(ActionLogCounter.add_records(records), 2)
+
+        self.assertEqual(
+            sorted(ActionLogCounter.objects.values_list('action_type', 'count')),
+            [('ACCESS_ATTEMPT', 2), ('ACCESS_GRANTED', 4)]
+        )
+
+    def test_anonymous_counters_are_unique_and_absorb_deleted_users(self):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        ActionLogCounter.objects.create(path='/a/', action_type='ACCESS_ATTEMPT', hour=hour, count=1)
+        ActionLogCounter.objects.bulk_create(
+            [ActionLogCounter(path='/a/', action_type='ACCESS_ATTEMPT', hour=hour)], ignore_conflicts=True
+        )
+        ActionLogCounter.objects.create(user=self.user, path='/a/', action_type='ACCESS_ATTEMPT', hour=hour, count=2)
+
+        self.user.delete()
+
+        self.assertEqual(list(ActionLogCounter.objects.values_list('user', 'count')), [(None, 3)])
+        self.assertTrue(ActionLog.keeps_full_row('UPLOAD'))
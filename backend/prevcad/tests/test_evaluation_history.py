@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from prevcad import evaluation_history
+from prevcad.models import CategoryTemplate, HealthCategory
+
+
+class EvaluationHistoryFormatTest(SimpleTestCase):
+    def append(self, history, responses):
+        entry = evaluation_history.build_entry(
+            history, {'responses': responses, 'professional_responses': {}}, len(history) + 1
+        )
+        if entry is not None:
+            history.append(entry)
+        return entry
+
+    def test_diffs_reconstruct_every_version(self):
+        history = []
+        states = [{'1': {'answer': i}, '2': {'answer': 'fijo'}} for i in range(25)]
+        states[7] = {}
+        for responses in states:
+            self.append(history, responses)
+
+        for index, responses in enumerate(states):
+            self.assertEqual(evaluation_history.reconstruct(history, index)['responses'], responses)
+
+        self.assertEqual(
+            [i for i, entry in enumerate(history) if 'snapshot' in entry],
+            [9, 19]
+        )
+        # Los diffs solo guardan lo que cambió
+        self.assertEqual(history[3]['diff'], {'responses': {'1': {'answer': 3}}})
+
+    def test_unchanged_state_adds_nothing(self):
+        history = []
+        self.append(history, {'1': {'answer': 'si'}})
+
+        self.assertIsNone(self.append(history, {'1': {'answer': 'si'}}))
+        self.assertEqual(len(history), 1)
+
+
+class EvaluationHistoryApiTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='history_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        CategoryTemplate.objects.create(name='Template', evaluation_form={'question_nodes': []})
+        self.category = HealthCategory.objects.get(user__user=self.user)
+
+    def test_saves_and_clear_keep_previous_versions(self):
+        form = self.category.get_or_create_evaluation_form()
+        form.responses = {'1': {'answer': 'si'}}
+        form.save()
+        first_version = form.version
+        form.apply_patch({'responses': {'2': {'answer': 'no'}}}, form.version)
+        self.client.post(f'/api/prevcad/health_categories/{self.category.id}/clear_evaluation/')
+
+        response = self.client.get(f'/api/prevcad/health-categories/{self.category.id}/history/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 3)
+
+        response = self.client.get(
+            f'/api/prevcad/health-categories/{self.category.id}/history/{first_version}/'
+        )
+        self.assertEqual(response.data['data']['responses'], {'1': {'answer': 'si'}})
+        form.refresh_from_db()
+        response = self.client.get(
+            f'/api/prevcad/health-categories/{self.category.id}/history/{form.version}/'
+        )
+        self.assertEqual(response.data['data']['responses'], {})
+
+    def test_stale_category_save_keeps_history(self):
+        stale = HealthCategory.objects.get(pk=self.category.pk)
+        form = self.category.get_or_create_evaluation_form()
+        form.responses = {'1': {'answer': 'si'}}
+        form.save()
+
+        stale.save()
+
+        self.category.refresh_from_db()
+        self.assertEqual(len(self.category.evaluation_history), 1)
+
+    def test_create_with_preset_pk_inserts_full_row(self):
+        pk, user, template = self.category.pk, self.category.user, self.category.template
+        history = [{'v': 1, 'at': '2025-01-31T08:00:00-03:00'}]
+        for kwargs in ({}, {'force_insert': True}):
+            HealthCategory.objects.filter(pk=pk).delete()
+
+            HealthCategory(pk=pk, user=user, template=template, evaluation_history=history).save(**kwargs)
+
+            self.assertEqual(HealthCategory.objects.get(pk=pk).evaluation_history, history)
+
+    def test_trend_lists_status_color_changes(self):
+        recommendation = self.category.get_or_create_recommendation()
+        for color in ('amarillo', 'amarillo', 'rojo', 'verde'):
+            recommendation.status_color = color
+            recommendation.save()
+
+        response = self.client.get('/api/prevcad/health-categories/trend/')
+
+        self.assertEqual(response.status_code, 200)
+        category = response.data['data'][0]
+        self.assertEqual(category['status_color'], 'verde')
+        self.assertEqual(
+            [point['status_color'] for point in category['trend']],
+            ['amarillo', 'rojo', 'verde']
+        )
+
+    def test_trend_of_other_patient_requires_permission(self):
+        other = get_user_model().objects.create_user(username='history_other', password='testpass123')
+
+        response = self.client.get(f'/api/prevcad/health-categories/trend/?user_id={other.profile.id}')
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from prevcad.models import CategoryTemplate, EvaluationForm, EvaluationFormConflict, HealthCategory
+from prevcad.models.evaluation import merge_patch
+
+
+class MergePatchTest(TestCase):
+    def test_merges_nested_and_removes_nulls(self):
+        target = {'1': {'answer': 'si', 'type': 'TEXT_QUESTION'}, '2': {'answer': 'no'}}
+        patch = {'1': {'answer': 'no'}, '2': None, '3': {'answer': [1, 2]}}
+
+        self.assertEqual(merge_patch(target, patch), {
+            '1': {'answer': 'no', 'type': 'TEXT_QUESTION'},
+            '3': {'answer': [1, 2]},
+        })
+        # No modifica el original
+        self.assertEqual(target['2'], {'answer': 'no'})
+
+
+class EvaluationResponsesPatchTest(TestCase):
+    """Verifica el guardado por nodo con control de versión"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='patch_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        CategoryTemplate.objects.create(name='Template', evaluation_form={'question_nodes': []})
+        self.category = HealthCategory.objects.get(user__user=self.user)
+        self.url = f'/api/prevcad/health-categories/{self.category.id}/responses/nodes/'
+
+    def patch(self, data, version=None, client=None):
+        headers = {} if version is None else {'HTTP_IF_MATCH': f'"{version}"'}
+        return (client or self.client).patch(self.url, data, format='json', **headers)
+
+    def test_patch_creates_form_and_merges_nodes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['version'], 0)
+
+        response = self.patch({'responses': {'1': {'answer': 'si'}, '2': {'answer': 'no'}}}, version=0)
+        self.assertEqual(response.status_code, 200)
+        version = response.data['data']['version']
+        self.assertEqual(response['ETag'], f'"{version}"')
+
+        response = self.patch({'responses': {'2': None, '3': {'answer': 'a'}}}, version=version)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['version'], version + 1)
+
+        form = EvaluationForm.objects.get(health_category=self.category)
+        self.assertEqual(form.responses, {'1': {'answer': 'si'}, '3': {'answer': 'a'}})
+        self.assertTrue(form.is_draft)
+
+    def test_stale_version_returns_conflict(self):
+        form = self.category.get_or_create_evaluation_form()
+        stale_version = form.version
+        form.responses = {'1': {'answer': 'desde la app'}}
+        form.save()
+        self.assertEqual(form.version, stale_version + 1)
+
+        response = self.patch({'responses': {'1': {'answer': 'viejo'}}}, version=stale_version)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['data']['version'], form.version)
+        self.assertEqual(response.data['data']['responses'], {'1': {'answer': 'desde la app'}})
+        form.refresh_from_db()
+        self.assertEqual(form.responses, {'1': {'answer': 'desde la app'}})
+
+    def test_apply_patch_detects_concurrent_write(self):
+        form = self.category.get_or_create_evaluation_form()
+        other = EvaluationForm.objects.get(pk=form.pk)
+        form.apply_patch({'responses': {'1': {'answer': 'a'}}}, form.version)
+
+        with self.assertRaises(EvaluationFormConflict) as ctx:
+            other.apply_patch({'responses': {'2': {'answer': 'b'}}}, other.version)
+        self.assertEqual(ctx.exception.current_version, form.version)
+
+    def test_requires_version(self):
+        response = self.patch({'responses': {'1': {'answer': 'si'}}})
+
+        self.assertEqual(response.status_code, 428)
+
+    def test_professional_responses_require_permission(self):
+        self.category.get_or_create_evaluation_form()
+        response = self.patch({'professional_responses': {'diagnosis': 'x'}}, version=1)
+        self.assertEqual(response.status_code, 403)
+
+        reviewer = get_user_model().objects.create_user(username='patch_doctor', password='testpass123')
+        reviewer.user_permissions.add(Permission.objects.get(codename='change_healthcategory'))
+        reviewer_client = APIClient()
+        reviewer_client.force_authenticate(user=reviewer)
+
+        response = self.patch({'professional_responses': {'diagnosis': 'x'}}, version=1, client=reviewer_client)
+        self.assertEqual(response.status_code, 200)
+        response = self.patch({'responses': {'1': {'answer': 'si'}}}, version=2, client=reviewer_client)
+        self.assertEqual(response.status_code, 403)
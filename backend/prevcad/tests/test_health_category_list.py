@@ -0,0 +1,293 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from prevcad.models import CategoryTemplate, EvaluationForm, HealthCategory, Recommendation
+from prevcad.serializers import HealthCategorySerializer
+
+
+class HealthCategoryListQueriesTest(TestCase):
+    """Verifica que el listado de categorías use un número fijo de consultas y no escriba"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='list_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health_categories/'
+
+    def create_templates(self, count, offset=0):
+        for i in range(count):
+            CategoryTemplate.objects.create(
+                name=f'Template {offset + i}',
+                evaluation_form={'question_nodes': [{'id': 1, 'type': 'TEXT_QUESTION'}]},
+                training_form={'training_nodes': [{'id': 1, 'media_url': 'training_images/a.png'}]},
+            )
+
+    def get_with_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, ctx.captured_queries
+
+    def test_query_count_is_constant(self):
+        self.create_templates(2)
+        response, small_queries = self.get_with_queries()
+        self.assertEqual(len(response.data), 2)
+
+        self.create_templates(6, offset=2)
+        response, large_queries = self.get_with_queries()
+        self.assertEqual(len(response.data), 8)
+
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_list_does_not_write(self):
+        self.create_templates(3)
+        category = HealthCategory.objects.filter(user__user=self.user).first()
+        category.get_or_create_evaluation_form()
+        category.get_or_create_recommendation()
+
+        forms_before = EvaluationForm.objects.count()
+        recommendations_before = Recommendation.objects.count()
+
+        response, queries = self.get_with_queries()
+
+        self.assertEqual(EvaluationForm.objects.count(), forms_before)
+        self.assertEqual(Recommendation.objects.count(), recommendations_before)
+        for query in queries:
+            self.assertFalse(query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE')))
+
+        for item in response.data:
+            self.assertIn('status', item)
+            self.assertIn('question_nodes', item['evaluation_form'])
+            self.assertIn('status', item['recommendations'])
+
+
+class HealthCategoryConditionalGetTest(TestCase):
+    """Verifica las respuestas condicionales (ETag / 304) del listado de categorías"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='etag_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health_categories/'
+        CategoryTemplate.objects.create(
+            name='Template ETag',
+            evaluation_form={'question_nodes': []},
+        )
+
+    def test_not_modified_until_data_changes(self):
+        category = HealthCategory.objects.get(user__user=self.user)
+        recommendation = category.get_or_create_recommendation()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+
+        recommendation.status_color = 'verde'
+        recommendation.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_deletion_advances_last_modified(self):
+        CategoryTemplate.objects.create(name='Template ETag 2', evaluation_form={'question_nodes': []})
+        response = self.client.get(self.url)
+        last_modified = response.headers['Last-Modified']
+
+        # El tombstone queda más nuevo que cualquier updated_at restante
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(seconds=5)):
+            CategoryTemplate.objects.get(name='Template ETag').delete()
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+
+class TemplateFragmentCacheTest(TestCase):
+    """Verifica que el fragmento del template se reutilice hasta que el template cambie"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='cache_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health_categories/'
+        self.template = CategoryTemplate.objects.create(
+            name='Template Cache',
+            evaluation_form={'question_nodes': [{'id': 1, 'type': 'TEXT_QUESTION'}]},
+        )
+
+    def test_fragment_rebuilt_only_after_template_save(self):
+        original = HealthCategorySerializer.build_template_fragment
+        with mock.patch.object(
+            HealthCategorySerializer, 'build_template_fragment',
+            autospec=True, side_effect=original
+        ) as build:
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(build.call_count, 1)
+
+            self.template.name = 'Template Renombrado'
+            self.template.save()
+            response = self.client.get(self.url)
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(response.data[0]['name'], 'Template Renombrado')
+
+
+class HealthCategorySparseFieldsTest(TestCase):
+    """Verifica ?fields= e ?include= en el listado de categorías"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='fields_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health_categories/'
+        CategoryTemplate.objects.create(
+            name='Template Fields',
+            evaluation_form={'question_nodes': [{'id': 1, 'type': 'TEXT_QUESTION'}]},
+            training_form={'training_nodes': [{'id': 1}]},
+        )
+
+    def test_fields_limits_payload(self):
+        with mock.patch.object(HealthCategorySerializer, 'get_training_form') as training_form:
+            response = self.client.get(self.url, {'fields': 'name,icon,status'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data[0]), {'id', 'name', 'icon', 'status'})
+        training_form.assert_not_called()
+
+    def test_include_adds_heavy_fields(self):
+        response = self.client.get(self.url, {'include': 'training_form'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('training_form', response.data[0])
+        self.assertIn('recommendations', response.data[0])
+        self.assertNotIn('evaluation_form', response.data[0])
+
+    def test_without_params_returns_all_fields(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(set(response.data[0]), set(HealthCategorySerializer.Meta.fields))
+
+
+@mock.patch('prevcad.views.health_categories.SYNC_CURSOR_OVERLAP', timedelta(0))
+class HealthCategorySyncTest(TestCase):
+    """Verifica la sincronización incremental (?since=) de categorías"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='sync_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health_categories/sync/'
+        for name in ('Template A', 'Template B', 'Template C'):
+            CategoryTemplate.objects.create(name=name, evaluation_form={'question_nodes': []})
+
+    def test_without_cursor_returns_everything(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['full_sync'])
+        self.assertEqual(len(response.data['categories']), 3)
+        self.assertEqual(response.data['deleted'], [])
+
+    def test_cursor_returns_only_changes_and_tombstones(self):
+        categories = list(HealthCategory.objects.filter(user__user=self.user).order_by('id'))
+        recommendation = categories[0].get_or_create_recommendation()
+        cursor = self.client.get(self.url).data['cursor']
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertFalse(response.data['full_sync'])
+        self.assertEqual(response.data['categories'], [])
+
+        recommendation.status_color = 'rojo'
+        recommendation.save()
+        deleted_id = categories[1].id
+        categories[1].template.delete()
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual([c['id'] for c in response.data['categories']], [categories[0].id])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'since': 'ayer'})
+
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'since': '2024-13-45T00:00:00'})
+        self.assertEqual(response.status_code, 400)
+
+
+class EvaluationResponsesBatchTest(TestCase):
+    """Verifica el guardado de respuestas de varias categorías en un solo request"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='batch_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/health-categories/responses/batch/'
+        for name in ('Template A', 'Template B'):
+            CategoryTemplate.objects.create(name=name, evaluation_form={'question_nodes': []})
+        self.categories = list(HealthCategory.objects.filter(user__user=self.user).order_by('id'))
+
+    def test_saves_all_items_and_reports_per_item(self):
+        existing_form = self.categories[0].get_or_create_evaluation_form()
+        self.categories[0].get_or_create_recommendation()
+        other_user = get_user_model().objects.create_user(username='batch_other', password='testpass123')
+        foreign_id = HealthCategory.objects.filter(user__user=other_user).first().id
+
+        response = self.client.post(self.url, {'items': [
+            {'category_id': self.categories[0].id, 'responses': {'1': {'answer': 'si'}}},
+            {'category_id': self.categories[1].id, 'responses': {'2': {'answer': 'no'}}},
+            {'category_id': foreign_id, 'responses': {}},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['saved'], 2)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['success', 'success', 'error']
+        )
+
+        existing_form.refresh_from_db()
+        self.assertEqual(existing_form.responses, {'1': {'answer': 'si'}})
+        self.assertFalse(existing_form.is_draft)
+        self.assertFalse(Recommendation.objects.get(health_category=self.categories[0]).is_draft)
+        new_form = EvaluationForm.objects.get(health_category=self.categories[1])
+        self.assertEqual(new_form.responses, {'2': {'answer': 'no'}})
+        self.assertIsNotNone(new_form.completed_date)
+        self.assertFalse(EvaluationForm.objects.filter(health_category_id=foreign_id).exists())
+
+    def test_requires_items(self):
+        response = self.client.post(self.url, {'items': []}, format='json')
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,57 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from prevcad.media_pipeline import derivative_path, enqueue_image, process_image
+
+
+class MediaPipelineTest(TestCase):
+    """Verifica la normalización y los derivados de imágenes subidas"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.temp_dir, MEDIA_PIPELINE_SYNC=True)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def save_rotated_jpeg(self, path):
+        """JPEG de 400x200 con EXIF Orientation=6 (rotar 90° al mostrar)"""
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        Image.new('RGB', (400, 200), 'red').save(buffer, format='JPEG', exif=exif)
+        return default_storage.save(path, ContentFile(buffer.getvalue()))
+
+    def test_process_image_creates_oriented_derivatives(self):
+        path = self.save_rotated_jpeg('evaluation_images/category_1/foto.jpg')
+        with default_storage.open(path) as image_file:
+            original = image_file.read()
+
+        enqueue_image(path)
+
+        # El original queda intacto
+        with default_storage.open(path) as image_file:
+            self.assertEqual(image_file.read(), original)
+        with default_storage.open(derivative_path(path, 'preview')) as preview_file:
+            preview = Image.open(preview_file)
+            self.assertEqual(preview.size, (200, 400))
+            self.assertNotIn(0x0112, preview.getexif())
+        with default_storage.open(derivative_path(path, 'thumb')) as thumb_file:
+            self.assertLessEqual(max(Image.open(thumb_file).size), 200)
+
+    def test_invalid_image_is_ignored(self):
+        path = default_storage.save('evaluation_images/category_1/roto.jpg', ContentFile(b'no es imagen'))
+
+        enqueue_image(path)
+
+        self.assertFalse(default_storage.exists(derivative_path(path, 'thumb')))
+        with self.assertRaises(Exception):
+            process_image(path)
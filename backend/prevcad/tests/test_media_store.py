@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from prevcad.media_store import collect_garbage, store_file
+from prevcad.models import CategoryTemplate, HealthCategory, MediaBlob
+
+
+class MediaStoreTest(TestCase):
+    """Verifica la deduplicación y el conteo de referencias del almacén de media"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.temp_dir, MEDIA_PIPELINE_SYNC=True)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_identical_content_is_stored_once(self):
+        path, created = store_file(ContentFile(b'misma foto'), 'jpg')
+        same_path, created_again = store_file(ContentFile(b'misma foto'), 'png')
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(path, same_path)
+        self.assertRegex(path, r'^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+    def test_evaluation_responses_count_references(self):
+        get_user_model().objects.create_user(username='blob_user', password='testpass123')
+        CategoryTemplate.objects.create(name='Template Blobs', evaluation_form={'question_nodes': []})
+        category = HealthCategory.objects.get()
+        path, _ = store_file(ContentFile(b'foto'), 'jpg')
+        image = {'type': 'IMAGE_QUESTION', 'answer': [{'url': path, 'path': path}]}
+
+        evaluation_form = category.get_or_create_evaluation_form()
+        evaluation_form.responses = {'1': image, '2': image}
+        evaluation_form.save()
+        self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 2)
+
+        evaluation_form.responses = {'1': image}
+        evaluation_form.save()
+        self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 1)
+
+        evaluation_form.delete()
+        self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 0)
+
+        # Sin referencias, se elimina pasado el margen
+        self.assertEqual(collect_garbage(timedelta(days=1)), 0)
+        self.assertEqual(collect_garbage(timedelta(0)), 1)
+        self.assertFalse(default_storage.exists(path))
+
+    def test_training_media_references(self):
+        path, _ = store_file(ContentFile(b'video'), '.mp4')
+        template = CategoryTemplate.objects.create(
+            name='Template Video',
+            training_form={'training_nodes': [{'id': 1, 'media_url': path}]},
+        )
+        self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 1)
+
+        template = CategoryTemplate.objects.get(pk=template.pk)
+        template.training_form = {'training_nodes': []}
+        template.save()
+        self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 0)
@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from prevcad.models import CategoryTemplate, EvaluationForm, HealthCategory, MediaUpload
+
+
+class MediaUploadTest(TestCase):
+    """Verifica las subidas por partes y su uso en respuestas IMAGE_QUESTION"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            CHUNKED_UPLOAD_DIR=f'{self.temp_dir}/tmp',
+            MEDIA_ROOT=f'{self.temp_dir}/media',
+            CHUNKED_UPLOAD_MAX_CHUNK_SIZE=4,
+            MEDIA_PIPELINE_SYNC=True,
+        )
+        self.settings_override.enable()
+
+        self.user = get_user_model().objects.create_user(
+            username='upload_user',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def put_chunk(self, upload_id, offset, data):
+        return self.client.generic(
+            'PUT', f'/api/prevcad/uploads/{upload_id}/', data,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def create_upload(self, content):
+        response = self.client.post(
+            '/api/prevcad/uploads/',
+            {'filename': 'foto.png', 'content_type': 'image/png', 'size': len(content)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data['upload_id']
+
+    def test_resumable_upload(self):
+        upload_id = self.create_upload(b'abcdefghij')
+
+        self.assertEqual(self.put_chunk(upload_id, 0, b'abcd').data['offset'], 4)
+        # Una parte repetida o fuera de orden se rechaza con el offset actual
+        response = self.put_chunk(upload_id, 0, b'abcd')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 4)
+        self.assertEqual(self.put_chunk(upload_id, 4, b'efghi').status_code, 413)
+
+        self.put_chunk(upload_id, 4, b'efgh')
+        response = self.put_chunk(upload_id, 8, b'ij')
+        self.assertEqual(response.data['status'], 'COMPLETE')
+        with open(MediaUpload.objects.get(id=upload_id).temp_path, 'rb') as temp_file:
+            self.assertEqual(temp_file.read(), b'abcdefghij')
+
+    def test_claimed_offset_is_not_written_twice(self):
+        upload_id = self.create_upload(b'abcdefgh')
+        # Otra petición reclamó el offset 0 y aún está escribiendo
+        MediaUpload.objects.filter(id=upload_id).update(status='RECEIVING')
+
+        response = self.put_chunk(upload_id, 0, b'abcd')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.data['offset'], response.data['status']), (0, 'RECEIVING'))
+
+        # Un reclamo abandonado se libera pasado CLAIM_TIMEOUT
+        MediaUpload.objects.filter(id=upload_id).update(
+            updated_at=timezone.now() - MediaUpload.CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+        response = self.put_chunk(upload_id, 0, b'abcd')
+        self.assertEqual((response.status_code, response.data['offset']), (200, 4))
+        self.assertEqual(response.data['status'], 'PENDING')
+
+    def test_evaluation_response_references_upload(self):
+        CategoryTemplate.objects.create(name='Template Fotos', evaluation_form={'question_nodes': []})
+        category = HealthCategory.objects.get(user__user=self.user)
+        category.get_or_create_recommendation()
+        upload_id = self.create_upload(b'png!')
+        self.put_chunk(upload_id, 0, b'png!')
+
+        response = self.client.post(
+            f'/api/prevcad/health-categories/{category.id}/responses/',
+            {'responses': {'5': {'type': 'IMAGE_QUESTION', 'answer': [{'upload_id': upload_id}]}}},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        upload = MediaUpload.objects.get(id=upload_id)
+        self.assertEqual(upload.status, 'ATTACHED')
+        self.assertTrue(upload.file_path.startswith('blobs/'))
+        answer = EvaluationForm.objects.get(health_category=category).responses['5']['answer']
+        self.assertEqual(len(answer), 1)
+        self.assertTrue(answer[0]['url'].endswith(upload.file_path))
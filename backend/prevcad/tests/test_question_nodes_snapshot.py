@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from prevcad.models import CategoryTemplate, HealthCategory, QuestionNodesSnapshot
+
+
+class QuestionNodesSnapshotTest(TestCase):
+    """Verifica que los formularios compartan una sola copia de los nodos de preguntas"""
+
+    def setUp(self):
+        self.template = CategoryTemplate.objects.create(
+            name='Template Compartido',
+            evaluation_form={'question_nodes': [{'id': 1, 'type': 'TEXT_QUESTION', 'question': '¿Cómo está?'}]},
+        )
+        for i in range(3):
+            get_user_model().objects.create_user(username=f'snapshot_user_{i}', password='testpass123')
+
+    def test_forms_share_one_snapshot(self):
+        forms = [
+            category.get_or_create_evaluation_form()
+            for category in HealthCategory.objects.filter(template=self.template)
+        ]
+
+        self.assertEqual(len(forms), 3)
+        self.assertEqual(QuestionNodesSnapshot.objects.count(), 1)
+        self.assertEqual(len({form.question_nodes_snapshot_id for form in forms}), 1)
+        self.assertEqual(forms[0].question_nodes, self.template.evaluation_form['question_nodes'])
+
+    def test_template_change_creates_new_snapshot(self):
+        category = HealthCategory.objects.filter(template=self.template).first()
+        old_form = category.get_or_create_evaluation_form()
+
+        self.template.evaluation_form = {'question_nodes': [{'id': 2, 'type': 'TEXT_QUESTION'}]}
+        self.template.save()
+        other = HealthCategory.objects.filter(template=self.template).exclude(pk=category.pk).first()
+        new_form = other.get_or_create_evaluation_form()
+
+        self.assertNotEqual(old_form.question_nodes_snapshot_id, new_form.question_nodes_snapshot_id)
+        old_form.refresh_from_db()
+        self.assertEqual(old_form.question_nodes[0]['id'], 1)
+
+    def test_snapshots_are_immutable(self):
+        snapshot = QuestionNodesSnapshot.get_for_nodes([{'id': 1}])
+        snapshot.question_nodes = [{'id': 2}]
+
+        with self.assertRaises(ValueError):
+            snapshot.save()
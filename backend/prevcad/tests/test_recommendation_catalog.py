@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from prevcad import recommendation_catalog
+from prevcad.models import CatalogVersion, TextRecomendation, UserRecommendationInteraction
+
+
+class RecommendationCatalogTest(TestCase):
+    """Verifica el catálogo en memoria de recomendaciones y su invalidación"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='catalog_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.falls = [
+            TextRecomendation.objects.create(theme=f'Caídas {i}', category='Caídas') for i in range(4)
+        ]
+        self.nutrition = TextRecomendation.objects.create(theme='Nutrición', category='Nutrición')
+
+    def test_catalog_is_reused_until_version_changes(self):
+        catalog = recommendation_catalog.get_catalog()
+        self.assertEqual(catalog.categories['Caídas'], frozenset(r.id for r in self.falls))
+        self.assertEqual(catalog.fragments[self.nutrition.id]['theme'], 'Nutrición')
+
+        # Sin cambios solo se consulta la versión
+        with self.assertNumQueries(1):
+            self.assertIs(recommendation_catalog.get_catalog(), catalog)
+
+        self.nutrition.theme = 'Alimentación'
+        self.nutrition.save()
+        self.assertEqual(CatalogVersion.current(TextRecomendation.CATALOG)[0], catalog.version[0] + 1)
+        reloaded = recommendation_catalog.get_catalog()
+        self.assertEqual(reloaded.fragments[self.nutrition.id]['theme'], 'Alimentación')
+
+        TextRecomendation.objects.filter(id=self.falls[0].id).delete()
+        self.assertNotIn(self.falls[0].id, recommendation_catalog.get_catalog().ids)
+
+    def test_missing_version_is_read_without_writing(self):
+        CatalogVersion.objects.all().delete()
+        recommendation_catalog.invalidate()
+
+        with CaptureQueriesContext(connection) as ctx:
+            catalog = recommendation_catalog.get_catalog()
+        self.assertEqual(catalog.version, (0, None))
+        self.assertFalse(any(
+            query['sql'].startswith(('INSERT', 'UPDATE')) for query in ctx.captured_queries
+        ))
+
+        self.nutrition.save()
+        self.assertIsNot(recommendation_catalog.get_catalog(), catalog)
+
+    def test_register_click_uses_catalog(self):
+        clicked = self.falls[0]
+        UserRecommendationInteraction.register_click(self.user, self.falls[1])
+
+        response = self.client.post(f'/api/prevcad/text_recommendations/{clicked.id}/register_click')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['clicked_recommendation']['id'], clicked.id)
+        related = [item['id'] for item in response.data['more_recommendations']]
+        # Primero las no vistas de la categoría y luego las ya vistas
+        self.assertEqual(set(related[:2]), {self.falls[2].id, self.falls[3].id})
+        self.assertEqual(related[2:], [self.falls[1].id])
+        self.assertEqual(response.data['interaction']['clicks'], 1)
+
+        response = self.client.post('/api/prevcad/text_recommendations/999999/register_click')
+        self.assertEqual(response.status_code, 404)
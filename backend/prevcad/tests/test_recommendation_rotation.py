@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from prevcad.models import RecommendationRotation, TextRecomendation, UserRecommendationInteraction
+
+
+class RecommendationRotationTest(TestCase):
+    """Verifica la rotación por usuario de recomendaciones"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='rotation_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        TextRecomendation.objects.bulk_create([
+            TextRecomendation(theme=f'Tema {i}', category='Caídas' if i % 2 else 'Nutrición')
+            for i in range(25)
+        ])
+
+    def list_ids(self):
+        response = self.client.get('/api/prevcad/text_recommendations/')
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['recommendations']]
+
+    def test_no_repeats_until_catalog_is_exhausted(self):
+        first, second = self.list_ids(), self.list_ids()
+        third = self.list_ids()
+
+        self.assertEqual((len(first), len(second)), (10, 10))
+        self.assertEqual(len(set(first + second)), 20)
+        # La tercera lista completa la vuelta y continúa con una nueva permutación
+        self.assertEqual(len(set(third)), 10)
+        self.assertEqual(set(first + second + third[:5]), set(TextRecomendation.objects.values_list('id', flat=True)))
+        self.assertFalse(self.client.session.get('last_shown_recommendations'))
+
+    def test_recently_clicked_are_skipped_and_catalog_changes_applied(self):
+        clicked = TextRecomendation.objects.first()
+        UserRecommendationInteraction.register_click(self.user, clicked)
+        shown = self.list_ids()
+        self.assertNotIn(clicked.id, shown)
+
+        removed = TextRecomendation.objects.exclude(id__in=shown).exclude(id=clicked.id).first()
+        removed.delete()
+        added = TextRecomendation.objects.create(theme='Nueva', category='Caídas')
+
+        shown += self.list_ids() + self.list_ids()
+        self.assertIn(added.id, shown)
+        self.assertNotIn(removed.id, shown)
+
+        rotation = RecommendationRotation.objects.get(user=self.user)
+        self.assertEqual(len(rotation.ids), 25)
+
+    def test_short_batch_when_most_ids_are_excluded(self):
+        ids = list(TextRecomendation.objects.values_list('id', flat=True))
+
+        picked = RecommendationRotation.next_batch(self.user, 10, exclude=ids[3:])
+
+        # Los excluidos consumen su posición: la lista queda corta en vez de repetir
+        self.assertEqual(sorted(picked), sorted(ids[:3]))
+        rotation = RecommendationRotation.objects.get(user=self.user)
+        self.assertEqual(rotation.cursor, 25)
+
+        # La siguiente lista comienza una vuelta nueva completa
+        self.assertEqual(len(set(RecommendationRotation.next_batch(self.user, 10))), 10)
+
+    def test_unchanged_rotation_is_not_saved(self):
+        TextRecomendation.objects.all().delete()
+        RecommendationRotation.next_batch(self.user, 10)
+        updated_at = RecommendationRotation.objects.get(user=self.user).updated_at
+
+        self.assertEqual(RecommendationRotation.next_batch(self.user, 10), [])
+        self.assertEqual(RecommendationRotation.objects.get(user=self.user).updated_at, updated_at)
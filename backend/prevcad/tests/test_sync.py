@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from prevcad.models import (
+    AppActivityLog,
+    CategoryTemplate,
+    DownloadableContent,
+    DownloadByUser,
+    EvaluationForm,
+    HealthCategory,
+    SyncOperation,
+    TextRecomendation,
+    UserRecommendationInteraction,
+)
+
+
+class SyncViewTest(TestCase):
+    """Verifica la aplicación ordenada e idempotente de operaciones offline"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='sync_user', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/prevcad/sync/'
+        CategoryTemplate.objects.create(name='Template', evaluation_form={'question_nodes': []})
+        self.category = HealthCategory.objects.get(user__user=self.user)
+        self.content = DownloadableContent.objects.create(title='Guía', file='downloadable_content/guia.pdf')
+        self.recommendation = TextRecomendation.objects.create(theme='Tema', category='Caídas')
+
+    def operations(self):
+        return [
+            {'key': 'op-1', 'type': 'activity_log', 'payload': {'date': '2025-01-31', 'actions': {'08:00:00': 'login', '08:10:00': 'home'}}},
+            {'key': 'op-2', 'type': 'download', 'payload': {'content': self.content.id, 'downloaded': True}},
+            {'key': 'op-3', 'type': 'recommendation_click', 'payload': {'recommendation': self.recommendation.id}},
+            {'key': 'op-4', 'type': 'evaluation_responses', 'payload': {'category_id': self.category.id, 'responses': {'1': {'answer': 'si'}}}},
+            {'key': 'op-5', 'type': 'evaluation_patch', 'payload': {'category_id': self.category.id, 'version': 99, 'responses': {'1': None}}},
+            {'key': 'op-6', 'type': 'unknown', 'payload': {}},
+        ]
+
+    def test_applies_operations_and_acks_each(self):
+        response = self.client.post(self.url, {'operations': self.operations()}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applied'], 4)
+        acks = response.data['acks']
+        self.assertEqual([ack['key'] for ack in acks], ['op-1', 'op-2', 'op-3', 'op-4', 'op-5', 'op-6'])
+        self.assertEqual(
+            [ack['status'] for ack in acks],
+            ['success', 'success', 'success', 'success', 'error', 'error']
+        )
+        self.assertEqual(acks[4]['code'], 'conflict')
+
+        self.assertEqual(AppActivityLog.objects.get(user=self.user).n_logins, 1)
+        self.assertTrue(DownloadByUser.objects.get(user=self.user, content=self.content).downloaded)
+        self.assertEqual(UserRecommendationInteraction.objects.get(user=self.user).clicks, 1)
+        self.assertEqual(
+            EvaluationForm.objects.get(health_category=self.category).responses,
+            {'1': {'answer': 'si'}}
+        )
+        self.assertEqual(SyncOperation.objects.filter(user=self.user).count(), 4)
+
+    def test_replayed_operations_are_not_applied_twice(self):
+        self.client.post(self.url, {'operations': self.operations()[:3]}, format='json')
+
+        response = self.client.post(self.url, {'operations': self.operations()[:3]}, format='json')
+
+        self.assertEqual(response.data['applied'], 0)
+        self.assertTrue(all(ack['duplicate'] for ack in response.data['acks']))
+        self.assertEqual(response.data['acks'][2]['result']['clicks'], 1)
+        self.assertEqual(UserRecommendationInteraction.objects.get(user=self.user).clicks, 1)
+
+    def test_failed_operation_can_be_retried(self):
+        operation = {'key': 'op-bad', 'type': 'activity_log', 'payload': {'actions': {'8am': 'login'}}}
+        response = self.client.post(self.url, {'operations': [operation]}, format='json')
+        self.assertEqual(response.data['acks'][0]['status'], 'error')
+
+        operation['payload']['actions'] = {'08:00:00': 'login'}
+        response = self.client.post(self.url, {'operations': [operation]}, format='json')
+        self.assertEqual(response.data['acks'][0]['status'], 'success')
+        self.assertFalse(response.data['acks'][0]['duplicate'])
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from prevcad.models import CategoryTemplate
+from prevcad.tracing import get_current_trace, span
+
+
+class RequestTracingTest(TestCase):
+    """Verifica los spans por request del listado de categorías"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='trace_user',
+            password='testpass123'
+        )
+        self.url = '/api/prevcad/health_categories/'
+        for i in range(3):
+            CategoryTemplate.objects.create(
+                name=f'Template Trace {i}',
+                evaluation_form={'question_nodes': []},
+            )
+
+    def get_client(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        return client
+
+    @override_settings(REQUEST_TRACING_ENABLED=True)
+    def test_spans_are_summarized_per_request(self):
+        with self.assertLogs('prevcad.tracing', level='INFO') as logs:
+            response = self.get_client().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('HealthCategoryListView.get', response.headers['Server-Timing'])
+        self.assertIn('HealthCategorySerializer.get_evaluation_form x3', logs.output[0])
+        self.assertIn('HealthCategoryListView.serialize x1', logs.output[0])
+
+    def test_disabled_by_default(self):
+        response = self.get_client().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertIsNone(get_current_trace())
+        with span('sin traza') as current:
+            self.assertIsNone(current)
@@ -0,0 +1,161 @@
+"""
+Trazas por request para los caminos calientes (vistas y métodos de serializers).
+
+Cada span con nombre acumula, por request, número de llamadas, tiempo total y
+consultas SQL ejecutadas mientras estaba abierto (tiempos y consultas son
+inclusivos: un span anidado también cuenta en su padre). Al terminar el request,
+RequestTracingMiddleware registra un resumen en el logger `prevcad.tracing` y
+agrega el header `Server-Timing`.
+
+Se activa con `REQUEST_TRACING_ENABLED = True`. Desactivado, el middleware no se
+instala (MiddlewareNotUsed) y `span()` / `@traced` solo consultan una ContextVar
+vacía antes de ejecutar el código original.
+
+Uso:
+    from prevcad.tracing import span, traced
+
+    @traced()
+    def get_status(self, obj): ...
+
+    with span('HealthCategoryListView.serialize'):
+        data = serializer.data
+"""
+import functools
+import logging
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('prevcad.tracing')
+
+_current_trace = ContextVar('prevcad_request_trace', default=None)
+_NOOP_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'started', 'queries')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.queries = self.trace.queries
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        stats = self.trace.spans.setdefault(self.name, [0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += self.trace.queries - self.queries
+        return False
+
+
+class RequestTrace:
+    """Spans acumulados por nombre durante un request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        # {nombre: [llamadas, segundos, consultas]}
+        self.spans = {}
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def count_query(self, execute, sql, params, many, context):
+        """execute_wrapper de Django: cuenta cada consulta del request"""
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def summary(self):
+        """Resumen del request con los spans ordenados por tiempo total"""
+        spans = sorted(self.spans.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'queries': self.queries,
+            'spans': [
+                {
+                    'name': name,
+                    'calls': calls,
+                    'duration_ms': round(seconds * 1000, 2),
+                    'queries': queries,
+                }
+                for name, (calls, seconds, queries) in spans
+            ],
+        }
+
+
+def get_current_trace():
+    return _current_trace.get()
+
+
+def span(name):
+    """Context manager de un span; sin traza activa no hace nada"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return trace.span(name)
+
+
+def traced(name=None):
+    """Decorador que envuelve la función en un span (por defecto, su __qualname__)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RequestTracingMiddleware:
+    """Activa una traza por request y registra su resumen al terminar"""
+
+    # Spans incluidos en el header Server-Timing
+    SERVER_TIMING_SPANS = 10
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TRACING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        try:
+            with connection.execute_wrapper(trace.count_query):
+                response = self.get_response(request)
+        finally:
+            _current_trace.reset(token)
+
+        summary = trace.summary()
+        logger.info(
+            "%s %s %sms %s consultas | %s",
+            request.method,
+            request.path,
+            summary['duration_ms'],
+            summary['queries'],
+            ', '.join(
+                f"{s['name']} x{s['calls']} {s['duration_ms']}ms {s['queries']}q"
+                for s in summary['spans']
+            ),
+        )
+        response['Server-Timing'] = ', '.join(
+            [f"total;dur={summary['duration_ms']}"] + [
+                f'span{i};desc="{s["name"]}";dur={s["duration_ms"]}'
+                for i, s in enumerate(summary['spans'][:self.SERVER_TIMING_SPANS])
+            ]
+        )
+        return response
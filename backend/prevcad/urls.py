@@ -6,7 +6,12 @@ from prevcad.views.profiles import getProfile, uploadProfileImage, deleteProfile
 from prevcad.views.text_recomendations import TextRecomendationsView
 from prevcad.views.health_categories import (
     HealthCategoryListView,
+    HealthCategorySyncView,
+    EvaluationResponsesView,
+    EvaluationHistoryView,
+    HealthCategoryTrendView,
     save_evaluation_responses,
+    save_evaluation_responses_batch,
     create_health_category,
     update_health_category,
     update_recommendation,
@@ -19,6 +24,8 @@ from .views import admin_views
 from .views.appointment_view import AppointmentViewSet
 from .views.app_activity_log import AppActivityLogView
 from .views.downloads import DownloadByUserViewSet
+from .views.media_uploads import MediaUploadCreateView, MediaUploadChunkView
+from .views.sync import SyncView
 from .views.admin_views import update_training_form
 import os
 from .views import health_categories
@@ -63,11 +70,56 @@ urlpatterns = [
         HealthCategoryListView.as_view(),
         name="health-categories",
     ),
+    path(
+        "prevcad/health_categories/sync/",
+        HealthCategorySyncView.as_view(),
+        name="health-categories-sync",
+    ),
     path(
         "prevcad/health-categories/<int:category_id>/responses/",
         save_evaluation_responses,
         name="responses",
     ),
+    path(
+        "prevcad/health-categories/<int:category_id>/responses/nodes/",
+        EvaluationResponsesView.as_view(),
+        name="responses-nodes",
+    ),
+    path(
+        "prevcad/health-categories/<int:category_id>/history/",
+        EvaluationHistoryView.as_view(),
+        name="evaluation-history",
+    ),
+    path(
+        "prevcad/health-categories/<int:category_id>/history/<int:version>/",
+        EvaluationHistoryView.as_view(),
+        name="evaluation-history-version",
+    ),
+    path(
+        "prevcad/health-categories/trend/",
+        HealthCategoryTrendView.as_view(),
+        name="health-categories-trend",
+    ),
+    path(
+        "prevcad/health-categories/responses/batch/",
+        save_evaluation_responses_batch,
+        name="responses-batch",
+    ),
+    path(
+        "prevcad/sync/",
+        SyncView.as_view(),
+        name="sync",
+    ),
+    path(
+        "prevcad/uploads/",
+        MediaUploadCreateView.as_view(),
+        name="media-uploads",
+    ),
+    path(
+        "prevcad/uploads/<uuid:upload_id>/",
+        MediaUploadChunkView.as_view(),
+        name="media-upload-chunk",
+    ),
     path(
         "prevcad/health_categories/<int:category_id>/clear_evaluation/",
         health_categories.clear_evaluation,
@@ -1,6 +1,12 @@
 from django.conf import settings
 import os
+import logging
 
+from prevcad.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+@traced('build_media_url')
 def build_media_url(file_path, request=None, is_backend=True):
     """
     Builds a media URL or file path for a file field.
@@ -19,7 +25,6 @@ def build_media_url(file_path, request=None, is_backend=True):
     try:
         if is_backend:
             # Para operaciones de archivo locales (como get_icon_base64)
-            print(f"file_path: {file_path}")
             if type(file_path) == str:
                 return os.path.join(settings.MEDIA_ROOT, file_path)
             else:
@@ -36,7 +41,7 @@ def build_media_url(file_path, request=None, is_backend=True):
                 return f"{settings.DOMAIN}/{settings.MEDIA_URL}{file_path}"
             
     except Exception as e:
-        print(f"Error building media URL: {str(e)}")
+        logger.warning(f"Error building media URL: {str(e)}")
         return None
 
 
@@ -27,6 +27,7 @@ from ..models import VideoNode
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 from prevcad.utils import build_media_url
+from prevcad.media_store import store_file, is_blob_path
 from pathlib import Path
 
 
@@ -125,6 +126,10 @@ def delete_old_media(old_media_url):
         return
     
     try:
+        # Los archivos del almacén de media se liberan al guardar el template
+        if is_blob_path(old_media_url.split('/media/')[-1]):
+            return
+
         # Convertir URL a ruta del sistema de archivos
         if 'training_videos' in old_media_url or 'training_images' in old_media_url:
             # Extraer la ruta relativa después de /media/
@@ -223,51 +228,16 @@ def update_training_form(request, template_id):
 def handle_uploaded_file(file, file_type):
     """
     Maneja la subida de archivos y retorna la URL relativa.
+    El archivo se guarda en el almacén de media según el hash de su contenido,
+    por lo que subir de nuevo el mismo archivo no lo vuelve a escribir.
     Args:
         file: El archivo subido
         file_type: 'video' o 'image'
     """
-    import os
-    from django.conf import settings
-    from pathlib import Path
-
     try:
-        # Asegurarnos de que MEDIA_ROOT está definido correctamente
-        media_root = Path(settings.MEDIA_ROOT)
-        logger.info(f"MEDIA_ROOT: {media_root}")
-
-        # Definir el subdirectorio basado en el tipo de archivo
-        subdir = 'training_videos' if file_type == 'video' else 'training_images'
-        upload_dir = media_root / subdir
-        
-        # Crear el directorio si no existe
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Directorio de carga: {upload_dir}")
-
-        # Generar nombre único para el archivo
         file_extension = os.path.splitext(file.name)[1].lower()
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        
-        # Ruta completa del archivo
-        file_path = upload_dir / unique_filename
-        logger.info(f"Ruta completa del archivo: {file_path}")
-
-        # Guardar el archivo físicamente
-        with open(file_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
-
-        # Verificar que el archivo se guardó correctamente
-        if not file_path.exists():
-            raise Exception(f"El archivo no se guardó correctamente en {file_path}")
-
-        # Establecer permisos correctos
-        os.chmod(file_path, 0o644)
-        
-        # Retornar la URL relativa
-        relative_path = f'{subdir}/{unique_filename}'
-        logger.info(f"URL relativa generada: {relative_path}")
-        
+        relative_path, created = store_file(file, file_extension)
+        logger.info(f"Archivo de {file_type} guardado en: {relative_path} (nuevo: {created})")
         return relative_path
 
     except Exception as e:
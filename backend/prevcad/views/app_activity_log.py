@@ -1,9 +1,12 @@
-from typing import cast
+import datetime
+from typing import Optional, cast
 from django.utils import timezone
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
+from prevcad import activity_buffer
 from prevcad.models import AppActivityLog
 from prevcad.serializers.app_activity_log_serializer import AppActivityLogSerializer
 
@@ -13,6 +16,9 @@ class AppActivityLogView(viewsets.ModelViewSet):
     serializer_class = AppActivityLogSerializer
 
     def get_queryset(self):
+        # Write pending buffered actions before reading (write-behind mode)
+        if activity_buffer.is_enabled():
+            activity_buffer.flush(self.request.user.id)
         # Return only the activity logs for the requesting user
         return AppActivityLog.objects.filter(user=self.request.user)
 
@@ -21,8 +27,6 @@ class AppActivityLogView(viewsets.ModelViewSet):
         actions = request.data.get("actions", {})
         date = request.data.get("date")
 
-        print(user, date, actions)
-
         # Check if date exists, if not, set it to today
         if not date:
             date = timezone.now().date()
@@ -31,6 +35,15 @@ class AppActivityLogView(viewsets.ModelViewSet):
             "overwrite_actions", "false"
         ).lower() in ["true", "1"]
 
+        if activity_buffer.is_enabled():
+            if not overwrite_actions:
+                response = self.buffer_actions(user, date, actions)
+                if response is not None:
+                    return response
+            # Overwriting must not be undone later by older buffered actions;
+            # with the buffer full the actions are written here
+            activity_buffer.flush(user.id)
+
         # Check if an instance already exists
         instance, created = AppActivityLog.objects.get_or_create(user=user, date=date)
         # print("Created: ", created)
@@ -50,13 +63,71 @@ class AppActivityLogView(viewsets.ModelViewSet):
                 raise ValidationError(
                     {"detail": f"Error overwriting actions: {str(e)}"}
                 )
+            # Save the updated instance (add_actions skips saving when nothing is new)
+            instance.save()
         # elif not created and not overwrite_actions:
         else:
             # Add actions without overwriting existing actions
             instance.add_actions(actions)
 
-        # Save the updated instance
-        instance.save()
-
         serializer = self.get_serializer(instance)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {**serializer.data, "watermark": instance.watermark},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["get"])
+    def watermark(self, request: Request) -> Response:
+        """
+        Latest acknowledged timestamp for a date (?date=YYYY-MM-DD, today by
+        default): the client only has to send actions it has not seen acknowledged.
+
+        In write-behind mode only this process's buffer is flushed first
+        (get_queryset): actions buffered by other workers are not included until
+        they flush, so the value is durable but may lag behind.
+        """
+        date = request.query_params.get("date") or timezone.now().date().isoformat()
+        try:
+            date = datetime.date.fromisoformat(date)
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+
+        log = self.get_queryset().filter(date=date).first()
+        return Response(
+            {
+                "date": date.isoformat(),
+                "watermark": log.watermark if log else None,
+                "n_entries": log.n_entries if log else 0,
+            }
+        )
+
+    def buffer_actions(self, user, date, actions) -> Optional[Response]:
+        """
+        Validate the actions and queue them in the write-behind buffer
+        (prevcad.activity_buffer); they are written in bulk later. Returns None
+        when the buffer is full: the caller writes them directly.
+        """
+        try:
+            if isinstance(date, str):
+                date = datetime.date.fromisoformat(date)
+            actions = AppActivityLog.normalize_actions(actions)
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+
+        if not activity_buffer.add(user.id, date, actions):
+            return None
+        pending = activity_buffer.pending(user.id, date)
+        # Only what this process already wrote is acknowledged: the buffer lives
+        # in process memory and is lost if the process dies before flushing, so
+        # the client keeps the buffered actions (and resends them) until a later
+        # response no longer lists them as pending
+        return Response(
+            {
+                "user": user.id,
+                "date": date.isoformat(),
+                "buffered": len(actions),
+                "pending": sorted(pending),
+                "watermark": activity_buffer.stored_watermark(user.id, date),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
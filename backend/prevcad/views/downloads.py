@@ -1,4 +1,5 @@
 from typing import cast
+from django.db.models import Count, Max
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.request import Request
@@ -6,6 +7,20 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from prevcad.models import DownloadableContent, DownloadByUser
 from prevcad.serializers.downloads_serializer import DownloadByUserSerializer
+from prevcad.decorators import conditional_get
+
+
+def downloads_version(request):
+    """
+    Versión del listado de descargas: contenido disponible y descargas del usuario.
+    """
+    content = DownloadableContent.objects.aggregate(
+        n=Count("id"), updated=Max("updated_date")
+    )
+    downloads = DownloadByUser.objects.filter(user=request.user).aggregate(
+        n=Count("id"), updated=Max("updated_date")
+    )
+    return (*content.values(), *downloads.values())
 
 
 class DownloadByUserViewSet(viewsets.ModelViewSet):
@@ -16,27 +31,19 @@ class DownloadByUserViewSet(viewsets.ModelViewSet):
         # Get or create and return all the DownloadByUser objects related to DownloadableContent
         return DownloadByUser.get_all_downloads_for_user(self.request.user)
 
+    @conditional_get(downloads_version)
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
     def create(self, request: Request, *args, **kwargs) -> Response:
         user = request.user
         content = request.data.get("content", None)
         download_date = request.data.get("download_date", None)
         downloaded = request.data.get("downloaded", False)
 
-        # Check if date exists, if not, set it to today
-        if downloaded and not download_date:
-            download_date = timezone.now()
-
-        # Check if an instance already exists
-        instance, created = DownloadByUser.objects.get_or_create(
-            user=user, content=content
+        instance = DownloadByUser.register_download(
+            user, content, downloaded, download_date
         )
-        # Update fields
-        instance = cast(DownloadByUser, instance)
-        instance.downloaded = downloaded
-        instance.download_date = download_date
-
-        # Save the updated instance
-        instance.save()
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
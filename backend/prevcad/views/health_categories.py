@@ -1,11 +1,11 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from ..models import HealthCategory, CategoryTemplate, ActivityNode, UserProfile
+from ..models import HealthCategory, CategoryTemplate, ActivityNode, UserProfile, HealthCategoryTombstone, MediaUpload, EvaluationForm, EvaluationFormConflict
 from ..serializers import HealthCategorySerializer
 from rest_framework.decorators import api_view, parser_classes
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
@@ -23,6 +23,14 @@ import traceback
 from django.core.exceptions import ValidationError
 
 from prevcad.utils import build_media_url
+from prevcad.decorators import conditional_get
+from prevcad.tracing import span, traced
+from prevcad.media_pipeline import enqueue_image, derivative_path
+from prevcad.media_store import store_file
+from prevcad import evaluation_history
+from django.db.models import Count, Max
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
 
 from prevcad.models import UserProfile
 
@@ -33,31 +41,206 @@ from rest_framework.parsers import MultiPartParser, FormParser
 import logging
 logger = logging.getLogger(__name__)
 
+def health_categories_version(request):
+    """
+    Versión barata del listado de categorías del usuario: una consulta agregada
+    sobre categorías, formularios, recomendaciones y templates, más la última
+    eliminación (tombstone), para que Last-Modified también avance al borrar una
+    categoría y un cliente que solo envía If-Modified-Since no reciba un 304 falso.
+    """
+    deleted = HealthCategoryTombstone.objects.filter(user__user=request.user).aggregate(
+        last_deleted=Max('deleted_at'),
+    )
+    stamp = HealthCategory.objects.filter(user__user=request.user).aggregate(
+        n_categories=Count('id'),
+        last_category=Max('id'),
+        n_forms=Count('evaluation_form'),
+        n_recommendations=Count('recommendation'),
+        forms_updated=Max('evaluation_form__updated_at'),
+        recommendations_updated=Max('recommendation__updated_at'),
+        templates_updated=Max('template__updated_at'),
+    )
+    return tuple(stamp.values()) + (deleted['last_deleted'],)
+
+
 class HealthCategoryListView(APIView):
 
-    
+    @traced('HealthCategoryListView.get')
+    @conditional_get(health_categories_version)
     def get(self, request):
-        print("=== Debug HealthCategoryListView ===")
-        print(f"Usuario autenticado: {request.user.username}")
-        
-        user_profile = get_object_or_404(UserProfile, user=request.user)
-        categories = HealthCategory.objects.filter(user__user=request.user)
-        # Sort by id
-        categories = categories.order_by('id')
+        get_object_or_404(UserProfile, user=request.user)
+
+        # Modo lista: template, evaluación y recomendación se cargan en una sola
+        # consulta y el serializer no crea filas durante un GET
+        categories = HealthCategory.get_categories_for_listing(request.user)
+        # ?fields= / ?include=: los campos no pedidos no se calculan
+        serializer = HealthCategorySerializer(
+            categories,
+            many=True,
+            fields=HealthCategorySerializer.get_requested_fields(request.query_params),
+            context={'request': request, 'list_mode': True},
+        )
+        with span('HealthCategoryListView.serialize'):
+            data = serializer.data
+        return Response(data)
+
+# Margen con que se relee desde el cursor: cubre escrituras que tomaron su
+# updated_at antes de emitir el cursor pero se confirmaron después. Los
+# duplicados son inofensivos porque el cliente reemplaza por id.
+SYNC_CURSOR_OVERLAP = timedelta(seconds=5)
+
+
+class HealthCategorySyncView(APIView):
+    """
+    Sincronización incremental de categorías.
+
+    GET ?since=<cursor> retorna solo las categorías creadas o cuyo formulario,
+    recomendación o template cambiaron desde el cursor, los ids de categorías
+    eliminadas (tombstones) y un nuevo cursor. Sin `since` retorna todas las
+    categorías (`full_sync: true`). Acepta ?fields= / ?include= como el listado.
+    """
+
+    @traced('HealthCategorySyncView.get')
+    def get(self, request):
+        get_object_or_404(UserProfile, user=request.user)
+
+        # El cursor se toma antes de consultar para no perder cambios concurrentes
+        cursor = timezone.now()
+        since = request.query_params.get('since')
+        if since:
+            try:
+                # parse_datetime lanza ValueError con fechas bien formadas pero inválidas
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response(
+                    {'error': 'Cursor inválido, se espera una fecha ISO 8601'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            since -= SYNC_CURSOR_OVERLAP
+
+        if since:
+            categories = HealthCategory.get_categories_changed_since(request.user, since)
+            deleted = list(
+                HealthCategoryTombstone.objects.filter(
+                    user__user=request.user,
+                    deleted_at__gt=since
+                ).values_list('category_id', flat=True)
+            )
+        else:
+            categories = HealthCategory.get_categories_for_listing(request.user)
+            deleted = []
+
+        serializer = HealthCategorySerializer(
+            categories,
+            many=True,
+            fields=HealthCategorySerializer.get_requested_fields(request.query_params),
+            context={'request': request, 'list_mode': True},
+        )
+        with span('HealthCategorySyncView.serialize'):
+            data = serializer.data
+        return Response({
+            'cursor': cursor.isoformat(),
+            'full_sync': not since,
+            'categories': data,
+            'deleted': deleted,
+        })
+
+def get_completed_upload(request, upload_id):
+    """Subida por partes completa del usuario, o None"""
+    try:
+        return MediaUpload.objects.get(id=upload_id, user__user=request.user, status='COMPLETE')
+    except (MediaUpload.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+def process_image_responses(request, category_id, responses):
+    """
+    Guarda las imágenes de las respuestas IMAGE_QUESTION (archivos, base64 o
+    {"upload_id": ...} de una subida por partes) y reemplaza su `answer` por las
+    URLs guardadas. Modifica `responses` en el lugar.
+    """
+    for node_id, response in responses.items():
+        logger.info(f"Procesando node_id: {node_id}")
+        logger.info(f"Respuesta: {response}")
+
+        if isinstance(response, dict) and response.get('type') == 'IMAGE_QUESTION':
+            processed_images = []
+            images_to_process = response.get('answer', [])
+            logger.info(f"Procesando {len(images_to_process)} imágenes para node_id {node_id}")
+
+            for image_data in images_to_process:
+                try:
+                    logger.info(f"Procesando imagen: {type(image_data)}")
+                    
+                    upload = None
+                    # Si referencia una subida por partes ya completa
+                    if isinstance(image_data, dict) and image_data.get('upload_id'):
+                        upload = get_completed_upload(request, image_data['upload_id'])
+                        if upload is None:
+                            logger.warning(f"Subida no encontrada o incompleta: {image_data['upload_id']}")
+                            continue
+                        ext = upload.extension
+                    # Si es un archivo
+                    elif hasattr(image_data, 'name'):
+                        logger.info(f"Procesando archivo: {image_data.name}")
+                        image_content = image_data
+                        ext = image_data.name.split('.')[-1]
+                    # Si es base64
+                    elif isinstance(image_data, str) and image_data.startswith('data:image'):
+                        logger.info("Procesando imagen base64")
+                        format, imgstr = image_data.split(';base64,')
+                        ext = format.split('/')[-1]
+                        image_content = ContentFile(base64.b64decode(imgstr))
+                    else:
+                        logger.warning(f"Formato de imagen no reconocido: {type(image_data)}")
+                        continue
+
+                    # Nombre descriptivo (el archivo se guarda según el hash de su contenido)
+                    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S_%f')
+                    filename = f'question_{node_id}_{timestamp}.{ext}'
+
+                    # Guardar la imagen (si el contenido ya existe no se vuelve a escribir)
+                    if upload:
+                        saved_path, created = upload.attach()
+                    else:
+                        saved_path, created = store_file(image_content, ext)
+                    logger.info(f"Imagen guardada en: {saved_path} (categoría {category_id})")
+
+                    # Derivados (miniaturas) en segundo plano
+                    if created:
+                        enqueue_image(saved_path)
+
+                    # Construir la URL
+                    image_url = build_media_url(saved_path, request, is_backend=False)
+                    logger.info(f"URL generada: {image_url}")
+
+                    processed_images.append({
+                        'url': image_url,
+                        'path': saved_path,
+                        'thumbnail_url': build_media_url(derivative_path(saved_path, 'thumb'), request, is_backend=False),
+                        'preview_url': build_media_url(derivative_path(saved_path, 'preview'), request, is_backend=False),
+                        'filename': filename,
+                        'timestamp': timezone.now().isoformat()
+                    })
+
+                except Exception as e:
+                    logger.error(f"Error procesando imagen: {str(e)}")
+                    logger.error(traceback.format_exc())
+                    continue
+
+            if processed_images:
+                logger.info(f"Imágenes procesadas exitosamente: {len(processed_images)}")
+                responses[node_id] = {
+                    'type': 'IMAGE_QUESTION',
+                    'answer': processed_images
+                }
+
+    return responses
 
-        serialized_categories = []
-        
-        for category in categories:
-            template = category.template
-            if template:
-                # Usar el serializer en lugar de construir el diccionario manualmente
-                serializer = HealthCategorySerializer(category)
-                serializer.context['request'] = request  # Pasar el request al serializer
-                # print(f"serializer.data: {serializer.data}")
-
-                serialized_categories.append(serializer.data)
-        
-        return Response(serialized_categories)
 
 @api_view(['POST'])
 def save_evaluation_responses(request, category_id):
@@ -106,77 +289,7 @@ def save_evaluation_responses(request, category_id):
                 }, status=status.HTTP_400_BAD_REQUEST)
 
         # Procesar cada respuesta
-        for node_id, response in responses.items():
-            logger.info(f"Procesando node_id: {node_id}")
-            logger.info(f"Respuesta: {response}")
-
-            if isinstance(response, dict) and response.get('type') == 'IMAGE_QUESTION':
-                processed_images = []
-                images_to_process = response.get('answer', [])
-                logger.info(f"Procesando {len(images_to_process)} imágenes para node_id {node_id}")
-
-                for image_data in images_to_process:
-                    try:
-                        logger.info(f"Procesando imagen: {type(image_data)}")
-                        
-                        # Si es un archivo
-                        if hasattr(image_data, 'name'):
-                            logger.info(f"Procesando archivo: {image_data.name}")
-                            image_content = image_data
-                            ext = image_data.name.split('.')[-1]
-                        # Si es base64
-                        elif isinstance(image_data, str) and image_data.startswith('data:image'):
-                            logger.info("Procesando imagen base64")
-                            format, imgstr = image_data.split(';base64,')
-                            ext = format.split('/')[-1]
-                            image_content = ContentFile(base64.b64decode(imgstr))
-                        else:
-                            logger.warning(f"Formato de imagen no reconocido: {type(image_data)}")
-                            continue
-
-                        # Crear nombre único para la imagen
-                        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S_%f')
-                        filename = f'question_{node_id}_{timestamp}.{ext}'
-                        logger.info(f"Nombre de archivo generado: {filename}")
-
-                        # Definir la ruta relativa
-                        relative_path = os.path.join(
-                            'evaluation_images',
-                            f'category_{category_id}',
-                            filename
-                        )
-                        logger.info(f"Ruta relativa: {relative_path}")
-
-                        # Crear directorio si no existe
-                        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
-                        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                        logger.info(f"Directorio creado/verificado: {os.path.dirname(full_path)}")
-
-                        # Guardar la imagen
-                        saved_path = default_storage.save(relative_path, image_content)
-                        logger.info(f"Imagen guardada en: {saved_path}")
-
-                        # Construir la URL
-                        image_url = build_media_url(saved_path, request, is_backend=False)
-                        logger.info(f"URL generada: {image_url}")
-
-                        processed_images.append({
-                            'url': image_url,
-                            'filename': filename,
-                            'timestamp': timezone.now().isoformat()
-                        })
-
-                    except Exception as e:
-                        logger.error(f"Error procesando imagen: {str(e)}")
-                        logger.error(traceback.format_exc())
-                        continue
-
-                if processed_images:
-                    logger.info(f"Imágenes procesadas exitosamente: {len(processed_images)}")
-                    responses[node_id] = {
-                        'type': 'IMAGE_QUESTION',
-                        'answer': processed_images
-                    }
+        process_image_responses(request, category_id, responses)
 
         # Guardar las respuestas
         try:
@@ -207,6 +320,279 @@ def save_evaluation_responses(request, category_id):
             'message': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# Máximo de categorías por request en save_evaluation_responses_batch
+MAX_BATCH_ITEMS = 50
+
+
+@api_view(['POST'])
+def save_evaluation_responses_batch(request):
+    """
+    Guarda respuestas de varias categorías en una sola transacción.
+
+    Body: {"items": [{"category_id": 1, "responses": {...}}, ...]}
+    Retorna un resultado por ítem, en el mismo orden. Los ítems inválidos se
+    informan en su resultado sin impedir que se guarden los demás.
+    """
+    items = request.data.get('items')
+    if isinstance(items, str):
+        try:
+            items = json.loads(items)
+        except json.JSONDecodeError:
+            items = None
+    if not isinstance(items, list) or not items:
+        return Response({
+            'status': 'error',
+            'message': 'Se requiere una lista de ítems'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_BATCH_ITEMS:
+        return Response({
+            'status': 'error',
+            'message': f'Máximo {MAX_BATCH_ITEMS} ítems por request'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    user_profile = get_object_or_404(UserProfile, user=request.user)
+    category_ids = [item.get('category_id') for item in items if isinstance(item, dict)]
+    categories = HealthCategory.objects.filter(
+        id__in=[category_id for category_id in category_ids if isinstance(category_id, int)],
+        user=user_profile
+    ).select_related('template', 'evaluation_form', 'recommendation').in_bulk()
+
+    results = []
+    entries = []
+    seen = set()
+    for item in items:
+        category_id = item.get('category_id') if isinstance(item, dict) else None
+        responses = item.get('responses', {}) if isinstance(item, dict) else None
+        if isinstance(responses, str):
+            try:
+                responses = json.loads(responses)
+            except json.JSONDecodeError:
+                responses = None
+
+        if not isinstance(category_id, int) or category_id not in categories:
+            results.append({'category_id': category_id, 'status': 'error', 'message': 'Categoría no encontrada'})
+        elif category_id in seen:
+            results.append({'category_id': category_id, 'status': 'error', 'message': 'Categoría repetida'})
+        elif not isinstance(responses, dict):
+            results.append({'category_id': category_id, 'status': 'error', 'message': 'Error en el formato de las respuestas'})
+        else:
+            seen.add(category_id)
+            entries.append((categories[category_id], process_image_responses(request, category_id, responses)))
+            results.append({'category_id': category_id, 'status': 'success'})
+
+    try:
+        HealthCategory.bulk_save_evaluation_responses(entries)
+    except Exception as e:
+        logger.error(f"Error guardando respuestas en lote: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response({
+            'status': 'error',
+            'message': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'status': 'success',
+        'saved': len(entries),
+        'results': results
+    })
+
+def get_expected_version(request):
+    """
+    Versión del formulario sobre la que el cliente hizo sus cambios: header
+    If-Match ("3" o W/"3") o campo "version" del cuerpo. None si no viene.
+    """
+    value = request.headers.get('If-Match')
+    if value is None:
+        value = request.data.get('version')
+    if isinstance(value, str):
+        value = value.strip().removeprefix('W/').strip('"')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def serialize_evaluation_responses(evaluation_form):
+    """Respuestas y versión de un formulario (versión 0 si aún no existe)"""
+    return {
+        'version': evaluation_form.version if evaluation_form else 0,
+        'responses': (evaluation_form.responses if evaluation_form else None) or {},
+        'professional_responses': (evaluation_form.professional_responses if evaluation_form else None) or {},
+        'updated_at': evaluation_form.updated_at if evaluation_form else None,
+    }
+
+
+def evaluation_responses_response(evaluation_form, response_status=status.HTTP_200_OK, **extra):
+    data = serialize_evaluation_responses(evaluation_form)
+    response = Response({**extra, 'data': data}, status=response_status)
+    response['ETag'] = f'"{data["version"]}"'
+    return response
+
+
+def get_accessible_category(request, category_id):
+    """
+    Categoría visible para el usuario: la propia (paciente) o cualquiera si tiene
+    permiso de edición sobre categorías (profesional).
+
+    Returns:
+        tuple: (categoría, es_paciente, es_profesional)
+    """
+    health_category = get_object_or_404(
+        HealthCategory.objects.select_related('user', 'evaluation_form'),
+        id=category_id
+    )
+    is_owner = health_category.user.user_id == request.user.id
+    can_review = request.user.has_perm('prevcad.change_healthcategory')
+    if not (is_owner or can_review):
+        raise Http404
+    return health_category, is_owner, can_review
+
+
+def apply_responses_patch(request, health_category, patch, expected_version):
+    """
+    Aplica cambios por nodo (EvaluationForm.apply_patch) creando el formulario si
+    no existe (versión 0) y guardando las imágenes de `responses`.
+
+    Raises:
+        EvaluationFormConflict: si el formulario no está en `expected_version`.
+    """
+    evaluation_form = health_category.get_evaluation_form_or_none()
+    current_version = evaluation_form.version if evaluation_form else 0
+    # Verificar antes de guardar imágenes: una subida adjuntada no se puede reenviar
+    if current_version != expected_version:
+        raise EvaluationFormConflict(current_version)
+    if evaluation_form is None:
+        evaluation_form = health_category.get_or_create_evaluation_form()
+        expected_version = evaluation_form.version
+
+    if 'responses' in patch:
+        process_image_responses(request, health_category.id, patch['responses'])
+
+    evaluation_form.apply_patch(patch, expected_version)
+    return evaluation_form
+
+
+class EvaluationResponsesView(APIView):
+    """
+    Respuestas de una evaluación con control de concurrencia optimista.
+
+    GET   {version, responses, professional_responses} con ETag "<version>".
+    PATCH {"responses": {node_id: valor | null}, "professional_responses": {...}}
+          con la versión leída en If-Match (o "version" en el cuerpo). Cada nodo
+          se combina con merge_patch (null lo elimina). Si el formulario cambió
+          entretanto responde 409 con la versión y las respuestas actuales.
+
+    `responses` solo puede modificarlas el paciente; `professional_responses`,
+    quien tenga permiso de edición sobre categorías.
+    """
+
+    def get(self, request, category_id):
+        health_category, _, _ = get_accessible_category(request, category_id)
+        return evaluation_responses_response(health_category.get_evaluation_form_or_none())
+
+    def patch(self, request, category_id):
+        health_category, is_owner, can_review = get_accessible_category(request, category_id)
+
+        patch = {
+            field: request.data[field]
+            for field in EvaluationForm.PATCHABLE_FIELDS if field in request.data
+        }
+        if not patch or not all(isinstance(changes, dict) for changes in patch.values()):
+            return Response({
+                'status': 'error',
+                'message': 'Se requieren cambios por nodo en responses o professional_responses'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if ('responses' in patch and not is_owner) or ('professional_responses' in patch and not can_review):
+            return Response({
+                'status': 'error',
+                'message': 'No tiene permiso para modificar estas respuestas'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        expected_version = get_expected_version(request)
+        if expected_version is None:
+            return Response({
+                'status': 'error',
+                'message': 'Se requiere la versión del formulario (If-Match o version)'
+            }, status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+        try:
+            evaluation_form = apply_responses_patch(request, health_category, patch, expected_version)
+        except EvaluationFormConflict:
+            evaluation_form = health_category.get_evaluation_form_or_none()
+            if evaluation_form is not None:
+                evaluation_form.refresh_from_db()
+            return evaluation_responses_response(
+                evaluation_form, status.HTTP_409_CONFLICT,
+                status='conflict', message='El formulario fue modificado'
+            )
+        return evaluation_responses_response(evaluation_form, status='success')
+
+
+class EvaluationHistoryView(APIView):
+    """
+    Historial de una evaluación (ver prevcad.evaluation_history).
+
+    GET prevcad/health-categories/<id>/history/            versiones registradas, sin respuestas
+    GET prevcad/health-categories/<id>/history/<version>/  respuestas en esa versión
+    """
+
+    def get(self, request, category_id, version=None):
+        health_category, _, _ = get_accessible_category(request, category_id)
+
+        if version is not None:
+            state = health_category.get_evaluation_version(version)
+            if state is None:
+                return Response({
+                    'status': 'error',
+                    'message': 'Versión no encontrada'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return Response({'status': 'success', 'data': state})
+
+        return Response({
+            'status': 'success',
+            'data': [evaluation_history.describe(entry) for entry in health_category.evaluation_history or []]
+        })
+
+
+class HealthCategoryTrendView(APIView):
+    """
+    Evolución del color de estado de cada categoría de un paciente.
+
+    GET prevcad/health-categories/trend/              del usuario autenticado
+    GET prevcad/health-categories/trend/?user_id=<n>  de otro paciente (profesionales)
+    """
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if user_id is None:
+            user_profile = get_object_or_404(UserProfile, user=request.user)
+        elif request.user.has_perm('prevcad.change_healthcategory'):
+            user_profile = get_object_or_404(UserProfile, id=user_id)
+        else:
+            return Response({
+                'status': 'error',
+                'message': 'No tiene permiso para ver otros pacientes'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        categories = HealthCategory.objects.filter(
+            user=user_profile, template__isnull=False
+        ).order_by('id').values(
+            'id', 'template__name', 'recommendation__status_color', 'evaluation_history'
+        )
+        return Response({
+            'status': 'success',
+            'data': [
+                {
+                    'category_id': category['id'],
+                    'name': category['template__name'],
+                    'status_color': category['recommendation__status_color'] or 'gris',
+                    'trend': evaluation_history.status_trend(category['evaluation_history'] or []),
+                }
+                for category in categories
+            ]
+        })
+
+
 @api_view(['PATCH'])
 def update_health_category(request, category_id):
     try:
@@ -289,9 +675,9 @@ def create_health_category(request):
         # Crear nueva categoría con el perfil del usuario
         health_category = HealthCategory.objects.create(
             user=user_profile,
-            template=template,
-            evaluation_form=template.evaluation_form
+            template=template
         )
+        health_category.get_or_create_evaluation_form()
         
         serializer = HealthCategorySerializer(health_category)
         return Response({
@@ -346,61 +732,63 @@ def save_professional_evaluation(request, category_id):
         data = request.data
         evaluation_form = health_category.get_or_create_evaluation_form()
         
-        # Debug
-        print("Data", data)
-        print("Estado inicial:", {
-            'is_draft': evaluation_form.is_draft,
-            'completed_date': evaluation_form.completed_date
-        })
-        
-        # Obtener y actualizar las respuestas profesionales
-        professional_responses = data.get('professional_responses', {})
-        if evaluation_form.professional_responses is None:
-            evaluation_form.professional_responses = {}
-        evaluation_form.professional_responses.update(professional_responses)
-        
+        # Las respuestas profesionales se combinan con las guardadas al momento de
+        # escribir (no con una copia leída antes), condicionado a la versión
+        patch = {'professional_responses': data.get('professional_responses', {})}
+        if not isinstance(patch['professional_responses'], dict):
+            return JsonResponse({
+                'success': False,
+                'error': 'Datos inválidos'
+            }, status=400)
+
         # [JV] Nota, aquí podría extenderse para reclasificar una evaluación como borrador (set is_draft=True)
 
         # Manejar el estado de completado
+        now = timezone.now()
+        fields = {}
         if data.get('complete', False):
-            print("Marcando como completado...")  # Debug
-            now = timezone.now()
-            
-            # Actualizar el formulario
-            evaluation_form.is_draft = False
-            evaluation_form.completed_date = now
-            health_category.clear_recommendation()
-            
-            
+            fields = {'is_draft': False, 'completed_date': now}
+
+        # Con versión (If-Match o "version") un cambio concurrente es un conflicto;
+        # sin ella se reintenta sobre la versión actual
+        expected_version = get_expected_version(request)
+        for attempt in range(3):
+            try:
+                evaluation_form.apply_patch(
+                    patch,
+                    evaluation_form.version if expected_version is None else expected_version,
+                    **fields
+                )
+                break
+            except EvaluationFormConflict as e:
+                if expected_version is not None or attempt == 2:
+                    return JsonResponse({
+                        'success': False,
+                        'error': 'La evaluación fue modificada por otro usuario',
+                        'version': e.current_version
+                    }, status=409)
+                evaluation_form.version = e.current_version
+
+        if fields:
             # Actualizar la recomendación
             try:
                 recommendation = health_category.get_or_create_recommendation()
+                health_category.clear_recommendation()
                 if recommendation:
                     recommendation.is_draft = False
                     recommendation.updated_by = request.user.username
                     recommendation.updated_at = now
                     recommendation.save()
-                    print("Recomendación actualizada")  # Debug
             except Exception as e:
-                print(f"Error actualizando recomendación: {e}")
-        
-        # Guardar y verificar
-        evaluation_form.save()
-        evaluation_form.refresh_from_db()
-        
-        # Debug final
-        print("Estado final:", {
-            'is_draft': evaluation_form.is_draft,
-            'completed_date': evaluation_form.completed_date,
-            'professional_responses': evaluation_form.professional_responses
-        })
+                logger.error(f"Error actualizando recomendación: {e}")
 
         return JsonResponse({
             'success': True,
             'message': 'Evaluación guardada correctamente',
             'is_draft': evaluation_form.is_draft,
             'completed_date': evaluation_form.completed_date.isoformat() if evaluation_form.completed_date else None,
-            'professional_responses': evaluation_form.professional_responses
+            'professional_responses': evaluation_form.professional_responses,
+            'version': evaluation_form.version
         })
 
     except HealthCategory.DoesNotExist:
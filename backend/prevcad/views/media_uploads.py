@@ -0,0 +1,92 @@
+"""
+Subidas de imágenes por partes y reanudables (respuestas IMAGE_QUESTION).
+
+1. POST   prevcad/uploads/              {"filename", "content_type", "size"} -> {"upload_id", "offset"}
+2. PUT    prevcad/uploads/<upload_id>/  cuerpo binario con header Upload-Offset -> {"offset", "status"}
+3. GET    prevcad/uploads/<upload_id>/  estado actual, para reanudar desde "offset"
+
+Una vez completa, la respuesta de evaluación referencia la subida con
+{"upload_id": "..."} dentro de `answer` en lugar de la imagen en base64.
+"""
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from prevcad.models import MediaUpload, UserProfile
+
+
+def serialize_upload(upload):
+    return {
+        "upload_id": str(upload.id),
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": upload.received,
+        "status": upload.status,
+        "chunk_size": settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE,
+    }
+
+
+class MediaUploadCreateView(APIView):
+    def post(self, request):
+        user_profile = get_object_or_404(UserProfile, user=request.user)
+        filename = str(request.data.get("filename") or "").strip()
+        try:
+            size = int(request.data.get("size"))
+        except (TypeError, ValueError):
+            size = 0
+
+        if not filename or size <= 0:
+            return Response(
+                {"error": "Se requieren filename y size"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            return Response(
+                {"error": f"El archivo supera el máximo de {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        upload = MediaUpload.objects.create(
+            user=user_profile,
+            filename=filename[:255],
+            content_type=str(request.data.get("content_type") or "")[:100],
+            size=size,
+        )
+        return Response(serialize_upload(upload), status=status.HTTP_201_CREATED)
+
+
+class MediaUploadChunkView(APIView):
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(MediaUpload, id=upload_id, user__user=request.user)
+
+    def get(self, request, upload_id):
+        return Response(serialize_upload(self.get_upload(request, upload_id)))
+
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response(
+                {"error": "Header Upload-Offset inválido"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if length <= 0:
+            return Response(
+                {"error": "La parte está vacía"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE or offset + length > upload.size:
+            return Response(
+                {"error": "La parte excede el tamaño permitido"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        # El cuerpo se lee directamente del stream, sin pasar por los parsers de DRF
+        if not upload.append_chunk(request.stream, offset, length):
+            upload.refresh_from_db()
+            return Response(serialize_upload(upload), status=status.HTTP_409_CONFLICT)
+        return Response(serialize_upload(upload))
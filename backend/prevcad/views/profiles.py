@@ -9,9 +9,10 @@ from prevcad.models.user_profile import UserProfile
 from prevcad.serializers.user_profile_serializer import UserProfileSerializer, UserSerializer
 import os
 import logging
-from ..decorators import log_action
+from ..decorators import log_action, conditional_get
+from ..media_pipeline import enqueue_image, delete_derivatives
+from ..media_store import store_file, update_references, is_blob_path
 from django.conf import settings
-import uuid
 import base64
 from django.core.files.base import ContentFile
 
@@ -74,38 +75,27 @@ def uploadProfileImage(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Crear un archivo temporal
-        filename = f"{uuid.uuid4()}.{ext}"
-        upload_path = f'profile_images/{request.user.id}'
-        full_path = os.path.join(upload_path, filename)
-
-        # Crear el directorio si no existe
-        full_media_path = os.path.join(settings.MEDIA_ROOT, upload_path)
-        os.makedirs(full_media_path, exist_ok=True)
-
         # Guardar la imagen anterior
         profile = request.user.profile
-        old_image = profile.profile_image
+        old_image = str(profile.profile_image) if profile.profile_image else None
 
-        # Guardar la nueva imagen
-        absolute_path = os.path.join(settings.MEDIA_ROOT, full_path)
-        with open(absolute_path, 'wb') as f:
-            f.write(image_data)
-
-        # Verificar que el archivo se guardó correctamente
-        if not os.path.exists(absolute_path):
-            raise Exception("La imagen no se guardó correctamente")
+        # Guardar la nueva imagen (si el contenido ya existe no se vuelve a escribir)
+        full_path, created = store_file(ContentFile(image_data), ext)
+        if created:
+            enqueue_image(full_path)
 
         # Actualizar el perfil
         profile.profile_image = full_path
         profile.save()
+        update_references([old_image] if old_image else [], [full_path])
 
-        # Eliminar la imagen anterior si existe
-        if old_image:
+        # Eliminar la imagen anterior si existe y no está en el almacén de media
+        if old_image and not is_blob_path(old_image):
             try:
-                old_image_path = os.path.join(settings.MEDIA_ROOT, str(old_image))
+                old_image_path = os.path.join(settings.MEDIA_ROOT, old_image)
                 if os.path.exists(old_image_path):
                     os.remove(old_image_path)
+                    delete_derivatives(old_image)
                     logger.info(f"Imagen anterior eliminada: {old_image_path}")
             except Exception as e:
                 logger.error(f"Error al eliminar imagen anterior: {str(e)}")
@@ -124,8 +114,24 @@ def uploadProfileImage(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     
+def profile_version(request):
+    """
+    Versión del perfil: los campos serializados del usuario, del perfil y sus grupos,
+    leídos con consultas simples en lugar de ejecutar los serializers.
+    """
+    profile = UserProfile.objects.filter(user=request.user).values_list(
+        'id', 'phone', 'birth_date', 'profile_image', 'specialty'
+    ).first()
+    groups = tuple(request.user.groups.values_list('name', flat=True))
+    user = request.user
+    return (
+        user.username, user.email, user.first_name, user.last_name,
+        profile, groups,
+    )
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(profile_version)
 def getProfile(request):
     try:
         logger.info("="*50)
@@ -168,8 +174,13 @@ def deleteProfileImage(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Eliminar la imagen
-        profile.profile_image.delete(save=False)
+        # Eliminar la imagen y sus derivados (los blobs compartidos solo se liberan)
+        old_image = profile.profile_image.name
+        if is_blob_path(old_image):
+            update_references([old_image], [])
+        else:
+            delete_derivatives(old_image)
+            profile.profile_image.delete(save=False)
         profile.profile_image = None
         profile.save()
 
@@ -0,0 +1,209 @@
+"""
+Sincronización por lotes para la app en modo offline.
+
+POST prevcad/sync/ {"operations": [{"key": "<uuid>", "type": "...", "payload": {...}}, ...]}
+
+La app acumula sus operaciones mientras no tiene conexión y las envía en orden
+en un solo request. Se aplican dentro de una transacción, cada una en su propio
+savepoint: si una falla se informa en su ack y las demás continúan.
+
+Cada operación aplicada se guarda con la clave de idempotencia generada por la
+app (SyncOperation). Si la app reenvía una operación (por ejemplo, porque no
+recibió la respuesta) se devuelve el resultado original con "duplicate": true
+sin volver a aplicarla. Las operaciones con error no se guardan y pueden
+reintentarse.
+
+Tipos de operación y su payload:
+    activity_log          {"date": "2025-01-31", "actions": {"08:02:33": "login"}} (ver AppActivityLog.watermark)
+    download              {"content": <id>, "downloaded": true, "download_date": "..."}
+    recommendation_click  {"recommendation": <id>}
+    evaluation_responses  {"category_id": <id>, "responses": {...}}
+    evaluation_patch      {"category_id": <id>, "version": <n>, "responses": {node_id: valor | null}}
+"""
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from prevcad import recommendation_catalog
+from prevcad.models import (
+    AppActivityLog,
+    DownloadableContent,
+    DownloadByUser,
+    EvaluationFormConflict,
+    HealthCategory,
+    SyncOperation,
+    UserRecommendationInteraction,
+)
+from prevcad.views.health_categories import apply_responses_patch, process_image_responses
+
+logger = logging.getLogger(__name__)
+
+# Máximo de operaciones por request
+MAX_SYNC_OPERATIONS = 200
+
+
+class SyncOperationError(Exception):
+    """Operación inválida: se informa en su ack sin afectar al resto del lote"""
+
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+
+def get_user_category(request, payload):
+    try:
+        return HealthCategory.objects.select_related(
+            'template', 'evaluation_form', 'recommendation'
+        ).get(id=payload.get('category_id'), user__user=request.user)
+    except (HealthCategory.DoesNotExist, ValueError, TypeError):
+        raise SyncOperationError('Categoría no encontrada')
+
+
+def sync_activity_log(request, payload):
+    actions = payload.get('actions')
+    if not isinstance(actions, dict):
+        raise SyncOperationError('Se requieren acciones')
+    log = AppActivityLog.add_action_for_user(
+        request.user, payload.get('date') or timezone.now().date(), actions
+    )
+    return {'id': log.id, 'date': str(log.date), 'n_entries': log.n_entries, 'watermark': log.watermark}
+
+
+def sync_download(request, payload):
+    content_id = payload.get('content')
+    if not DownloadableContent.objects.filter(id=content_id).exists():
+        raise SyncOperationError('Contenido no encontrado')
+    download = DownloadByUser.register_download(
+        request.user,
+        content_id,
+        bool(payload.get('downloaded', False)),
+        payload.get('download_date'),
+    )
+    return {'id': download.id, 'downloaded': download.downloaded}
+
+
+def sync_recommendation_click(request, payload):
+    try:
+        recommendation_id = int(payload.get('recommendation'))
+    except (TypeError, ValueError):
+        raise SyncOperationError('Recomendación no encontrada')
+    if recommendation_id not in recommendation_catalog.get_catalog().fragments:
+        raise SyncOperationError('Recomendación no encontrada')
+    interaction = UserRecommendationInteraction.register_click(request.user, recommendation_id)
+    return {'recommendation': recommendation_id, 'clicks': interaction.clicks}
+
+
+def sync_evaluation_responses(request, payload):
+    category = get_user_category(request, payload)
+    responses = payload.get('responses')
+    if not isinstance(responses, dict):
+        raise SyncOperationError('Error en el formato de las respuestas')
+    HealthCategory.bulk_save_evaluation_responses([
+        (category, process_image_responses(request, category.id, responses))
+    ])
+    return {'category_id': category.id}
+
+
+def sync_evaluation_patch(request, payload):
+    category = get_user_category(request, payload)
+    responses = payload.get('responses')
+    if not isinstance(responses, dict) or not isinstance(payload.get('version'), int):
+        raise SyncOperationError('Se requieren version y cambios por nodo en responses')
+    try:
+        evaluation_form = apply_responses_patch(
+            request, category, {'responses': responses}, payload['version']
+        )
+    except EvaluationFormConflict as e:
+        raise SyncOperationError('El formulario fue modificado', code='conflict', version=e.current_version)
+    return {'category_id': category.id, 'version': evaluation_form.version}
+
+
+HANDLERS = {
+    'activity_log': sync_activity_log,
+    'download': sync_download,
+    'recommendation_click': sync_recommendation_click,
+    'evaluation_responses': sync_evaluation_responses,
+    'evaluation_patch': sync_evaluation_patch,
+}
+
+
+def apply_operation(request, key, op_type, payload):
+    """Aplica una operación en su savepoint y la registra con su clave; retorna el ack"""
+    ack = {'key': key, 'type': op_type}
+    try:
+        with transaction.atomic():
+            result = HANDLERS[op_type](request, payload)
+            SyncOperation.objects.create(user=request.user, key=key, op_type=op_type, result=result)
+    except IntegrityError as e:
+        # Otro request aplicó la misma clave entretanto
+        stored = SyncOperation.objects.filter(user=request.user, key=key).first()
+        if stored is None:
+            return {**ack, 'status': 'error', 'message': str(e)}
+        return {**ack, 'status': 'success', 'duplicate': True, 'result': stored.result}
+    except SyncOperationError as e:
+        return {**ack, 'status': 'error', 'message': str(e), **e.details}
+    except (ObjectDoesNotExist, ValidationError, ValueError, TypeError) as e:
+        return {**ack, 'status': 'error', 'message': str(e)}
+    except Exception as e:
+        logger.error(f"Error aplicando operación {op_type} ({key}): {str(e)}", exc_info=True)
+        return {**ack, 'status': 'error', 'message': 'Error interno'}
+    return {**ack, 'status': 'success', 'duplicate': False, 'result': result}
+
+
+class SyncView(APIView):
+    def post(self, request):
+        operations = request.data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return Response({
+                'status': 'error',
+                'message': 'Se requiere una lista de operaciones'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > MAX_SYNC_OPERATIONS:
+            return Response({
+                'status': 'error',
+                'message': f'Máximo {MAX_SYNC_OPERATIONS} operaciones por request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        keys = [
+            operation.get('key') for operation in operations
+            if isinstance(operation, dict) and isinstance(operation.get('key'), str)
+        ]
+        applied = {
+            stored.key: stored
+            for stored in SyncOperation.objects.filter(user=request.user, key__in=keys)
+        }
+
+        acks = []
+        with transaction.atomic():
+            for operation in operations:
+                operation = operation if isinstance(operation, dict) else {}
+                key, op_type = operation.get('key'), operation.get('type')
+                payload = operation.get('payload', {})
+
+                if not isinstance(key, str) or not key or len(key) > 100:
+                    acks.append({'key': key, 'type': op_type, 'status': 'error', 'message': 'Clave de idempotencia inválida'})
+                elif key in applied:
+                    acks.append({
+                        'key': key, 'type': applied[key].op_type, 'status': 'success',
+                        'duplicate': True, 'result': applied[key].result
+                    })
+                elif op_type not in HANDLERS:
+                    acks.append({'key': key, 'type': op_type, 'status': 'error', 'message': 'Tipo de operación desconocido'})
+                elif not isinstance(payload, dict):
+                    acks.append({'key': key, 'type': op_type, 'status': 'error', 'message': 'Payload inválido'})
+                else:
+                    ack = apply_operation(request, key, op_type, payload)
+                    if ack['status'] == 'success' and not ack['duplicate']:
+                        applied[key] = SyncOperation(key=key, op_type=op_type, result=ack['result'])
+                    acks.append(ack)
+
+        return Response({
+            'status': 'success',
+            'applied': sum(1 for ack in acks if ack['status'] == 'success' and not ack['duplicate']),
+            'acks': acks
+        })
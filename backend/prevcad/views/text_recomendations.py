@@ -1,7 +1,9 @@
 from rest_framework import viewsets, status
 from rest_framework.request import Request
 from rest_framework.response import Response
+from prevcad import recommendation_catalog
 from prevcad.models import (
+  RecommendationRotation,
   TextRecomendation,
   UserRecommendationInteraction,
 )
@@ -12,6 +14,8 @@ from django.db.models import F, Exists, OuterRef, Q, Count, Max, Case, When
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 import logging
+import random
+from collections import Counter
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models.functions import Coalesce
@@ -43,65 +47,41 @@ class TextRecomendationsView(viewsets.ModelViewSet):
     try:
         user = request.user
         logger.info(f"Getting recommendations for user {user.id}")
-        
-        # Obtener las últimas recomendaciones mostradas al usuario
-        recent_shown = request.session.get('last_shown_recommendations', [])
-        logger.info(f"Previously shown recommendations: {recent_shown}")
-        
-        # Obtener recomendaciones no vistas y no mostradas recientemente
-        recommendations = TextRecomendation.objects.exclude(
-            Q(id__in=UserRecommendationInteraction.objects.filter(
-                user=user,
-                last_clicked__gte=timezone.now() - timedelta(hours=24)
-            ).values_list('recommendation_id', flat=True)) |
-            Q(id__in=recent_shown)
-        ).order_by('?')[:10]
-        
-        if recommendations.count() < 10:
-            logger.info("Not enough fresh recommendations, adding older ones")
-            # Obtener recomendaciones vistas hace más tiempo, excluyendo las recientes
-            older_viewed = TextRecomendation.objects.filter(
-                userrecommendationinteraction__user=user
-            ).exclude(
-                id__in=recent_shown
-            ).annotate(
-                last_viewed=Max('userrecommendationinteraction__last_clicked')
-            ).order_by('last_viewed')
-            
-            # Agregar recomendaciones más antiguas hasta completar 10
-            needed = 10 - recommendations.count()
-            recommendations = list(recommendations) + list(older_viewed[:needed])
-        
-        # Guardar los IDs mostrados en la sesión
-        shown_ids = [rec.id for rec in recommendations]
-        request.session['last_shown_recommendations'] = shown_ids
-        logger.info(f"Storing shown recommendations: {shown_ids}")
-        
-        # Ordenar por categorías preferidas del usuario
-        favorite_categories = UserRecommendationInteraction.objects.filter(
+
+        # Una sola consulta de interacciones: clicks recientes y categorías preferidas
+        interactions = UserRecommendationInteraction.objects.filter(
             user=user
-        ).values('recommendation__category').annotate(
-            total_clicks=Count('id')
-        ).order_by('-total_clicks')
-        
+        ).values_list('recommendation_id', 'recommendation__category', 'last_clicked')
+        recent_limit = timezone.now() - timedelta(hours=24)
+        recently_clicked = set()
+        category_clicks = Counter()
+        for recommendation_id, category, last_clicked in interactions:
+            if last_clicked >= recent_limit:
+                recently_clicked.add(recommendation_id)
+            category_clicks[category] += 1
+
+        # Siguientes recomendaciones de la rotación del usuario (sin repetir las
+        # mostradas antes), saltando las vistas en las últimas 24 horas
+        catalog = recommendation_catalog.get_catalog()
+        ids = RecommendationRotation.next_batch(user, 10, exclude=recently_clicked, catalog=catalog)
+        recommendations = [catalog.fragments[i] for i in ids if i in catalog.fragments]
+
+        # Ordenar por categorías preferidas del usuario
         category_order = {
-            cat['recommendation__category']: index 
-            for index, cat in enumerate(favorite_categories)
+            category: index
+            for index, (category, _) in enumerate(category_clicks.most_common())
         }
-        
-        # Ordenar recomendaciones por categorías preferidas
         recommendations = sorted(
             recommendations,
-            key=lambda x: category_order.get(x.category, float('inf'))
+            key=lambda x: category_order.get(x['category'], float('inf'))
         )
-        
-        serializer = self.get_serializer(recommendations, many=True)
+
+        # Los fragmentos ya están serializados (ver prevcad.recommendation_catalog)
         return Response({
-            'recommendations': serializer.data,
+            'recommendations': recommendations,
             'count': len(recommendations),
-            'session_id': request.session.session_key  # Para debugging
         })
-        
+
     except Exception as e:
         logger.error(f"Error in list view: {str(e)}", exc_info=True)
         return Response(
@@ -113,54 +93,36 @@ class TextRecomendationsView(viewsets.ModelViewSet):
   def register_click(self, request, pk=None):
     try:
       user = request.user
-      recommendation = self.get_object()
-      category = recommendation.category
+      catalog = recommendation_catalog.get_catalog()
+      recommendation = catalog.fragments.get(int(pk))
+      if recommendation is None:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+      category = recommendation['category']
       
       # Registrar la interacción
-      interaction, created = UserRecommendationInteraction.objects.get_or_create(
-        user=user,
-        recommendation=recommendation,
-        defaults={'clicks': 1}
-      )
+      interaction = UserRecommendationInteraction.register_click(user, recommendation['id'])
       
-      if not created:
-        interaction.clicks = F('clicks') + 1
-        interaction.last_clicked = timezone.now()
-        interaction.save()
-        interaction.refresh_from_db()
-      
-      # Obtener recomendaciones relacionadas no vistas
-      viewed_ids = UserRecommendationInteraction.objects.filter(
-        user=user
-      ).values_list('recommendation_id', flat=True)
+      # Interacciones del usuario en la categoría (una consulta), más antiguas primero
+      viewed = UserRecommendationInteraction.objects.filter(
+        user=user,
+        recommendation_id__in=catalog.categories.get(category, ()),
+      ).order_by('last_clicked').values_list('recommendation_id', flat=True)
+      viewed = [i for i in viewed if i != recommendation['id']]
       
-      related_recommendations = TextRecomendation.objects.filter(
-        category=category
-      ).exclude(
-        id__in=viewed_ids
-      ).exclude(
-        id=recommendation.id
-      ).order_by('?')[:5]  # Máximo 5 recomendaciones relacionadas
+      # Recomendaciones relacionadas no vistas, desde el catálogo en memoria
+      unseen = sorted(catalog.categories.get(category, frozenset()) - set(viewed) - {recommendation['id']})
+      related_ids = random.sample(unseen, min(len(unseen), 5))  # Máximo 5 recomendaciones relacionadas
       
       # Si no hay suficientes no vistas, agregar algunas vistas hace tiempo
-      if related_recommendations.count() < 5:
-        viewed_related = TextRecomendation.objects.filter(
-          category=category,
-          id__in=viewed_ids
-        ).exclude(
-          id=recommendation.id
-        ).annotate(
-          last_viewed=Max('userrecommendationinteraction__last_clicked')
-        ).order_by('last_viewed')[:3]  # Agregar hasta 3 vistas
-        
-        related_recommendations = list(related_recommendations) + list(viewed_related)
+      if len(related_ids) < 5:
+        related_ids += viewed[:3]  # Agregar hasta 3 vistas
       
+      related_recommendations = [catalog.fragments[i] for i in related_ids]
       logger.info(f"Returning {len(related_recommendations)} related recommendations")
-      serializer = self.get_serializer(related_recommendations, many=True)
       
       return Response({
-        'clicked_recommendation': self.get_serializer(recommendation).data,
-        'more_recommendations': serializer.data,
+        'clicked_recommendation': recommendation,
+        'more_recommendations': related_recommendations,
         'category': category,
         'interaction': {
           'clicks': interaction.clicks,
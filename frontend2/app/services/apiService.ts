@@ -5,6 +5,9 @@ import { Category } from "../types/category";
 import { Platform } from "react-native";
 import * as FileSystem from "expo-file-system";
 
+// AsyncStorage key prefix of the unacknowledged activity of each day
+const ACTIVITY_PENDING_PREFIX = "activity_pending_";
+
 // Types
 interface ApiResponse<T> {
   data: T;
@@ -489,6 +492,39 @@ export class ApiClient {
       const timeStr = `${hour}:${minute}:${second}`;
       return [dateStr, timeStr];
     },
+    // Send the queued actions of one day (`activity_pending_<date>`) and drop
+    // what the server acknowledged: sent, not newer than its watermark and not
+    // still pending in its write-behind buffer. The key is removed once empty.
+    sendPending: async (key: string): Promise<ApiResponse<any>> => {
+      const date = key.slice(ACTIVITY_PENDING_PREFIX.length);
+      const pending: Record<string, string> = JSON.parse(
+        (await AsyncStorage.getItem(key)) || "{}"
+      );
+      const response = await this.activityLog.logActivity(date, pending);
+
+      const watermark: string | null = response.data?.watermark ?? null;
+      const buffered = new Set<string>(response.data?.pending ?? []);
+      if (watermark) {
+        const latest: Record<string, string> = JSON.parse(
+          (await AsyncStorage.getItem(key)) || "{}"
+        );
+        for (const [sentTime, sentTag] of Object.entries(pending)) {
+          if (
+            sentTime <= watermark &&
+            !buffered.has(sentTime) &&
+            latest[sentTime] === sentTag
+          ) {
+            delete latest[sentTime];
+          }
+        }
+        if (Object.keys(latest).length) {
+          await AsyncStorage.setItem(key, JSON.stringify(latest));
+        } else {
+          await AsyncStorage.removeItem(key);
+        }
+      }
+      return response;
+    },
     trackAction: async (
       tag: string,
       offset_seconds: number = 0
@@ -499,9 +535,30 @@ export class ApiClient {
         // const time = now.toTimeString().split(" ")[0]; // HH:MM:SS
         const [date, time] = this.activityLog.getLocalDateAndTimeStrings(now);
         console.log("[Tracking action]", `${date} ${time}`, "-", tag);
-        return await apiService.activityLog.logActivity(date, {
-          [time]: tag,
-        });
+
+        // Queue the action with the ones not yet acknowledged for the day and
+        // send only those (the server skips any it already stored)
+        const key = `${ACTIVITY_PENDING_PREFIX}${date}`;
+        const pending: Record<string, string> = JSON.parse(
+          (await AsyncStorage.getItem(key)) || "{}"
+        );
+        pending[time] = tag;
+        await AsyncStorage.setItem(key, JSON.stringify(pending));
+
+        // Resend earlier days left unacknowledged (offline or no ack at midnight)
+        const keys = (await AsyncStorage.getAllKeys())
+          .filter((k) => k.startsWith(ACTIVITY_PENDING_PREFIX) && k !== key)
+          .sort();
+        for (const pendingKey of keys) {
+          try {
+            await this.activityLog.sendPending(pendingKey);
+          } catch (error) {
+            console.error("Error reenviando actividad pendiente:", pendingKey, error);
+          }
+        }
+
+        const response = await this.activityLog.sendPending(key);
+        return response;
       } catch (error) {
         console.error("Error al trackear acción:", error);
         throw error;